@@ -0,0 +1,98 @@
+"""
+Benchmark baselines.
+
+Saves the timings of a benchmark to ``benchmarks/baselines/<name>.json`` and compares later runs to them, failing
+when a case got slower than the baseline by more than the tolerance. Timings depend on the machine: save the baseline
+again with ``--save`` before comparing runs on another machine.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from typing import Callable, Dict
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+DEFAULT_TOLERANCE = 1.25
+
+
+def measure(function: Callable[[], object], repeat: int, number: int) -> float:
+    """
+    Seconds per call of a function, the fastest of ``repeat`` runs of ``number`` calls.
+    """
+    timer = timeit.Timer(function)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def parse_args(description: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--save', action='store_true', help='save the timings as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='slowdown over the baseline that is reported as a regression (default: %(default)s)')
+    parser.add_argument('cases', nargs='*', help='only run the cases whose name starts with one of these')
+    return parser.parse_args()
+
+
+def _path(name: str) -> str:
+    return os.path.join(BASELINES, '{}.json'.format(name))
+
+
+def load(name: str) -> Dict[str, float]:
+    try:
+        with open(_path(name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save(name: str, timings: Dict[str, float]):
+    os.makedirs(BASELINES, exist_ok=True)
+    # Cases that were not run keep their previous baseline
+    baseline = load(name)
+    baseline.update(timings)
+    with open(_path(name), 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(name: str, timings: Dict[str, float], tolerance: float = DEFAULT_TOLERANCE) -> int:
+    """
+    Prints the timings next to their baseline, and returns the number of regressions.
+    """
+    baseline = load(name)
+    regressions = 0
+    for case, seconds in timings.items():
+        previous = baseline.get(case)
+        if previous is None:
+            print('{:<48} {:10.2f} us'.format(case, seconds * 1e6))
+            continue
+
+        ratio = seconds / previous
+        regression = ratio > tolerance
+        regressions += regression
+        print('{:<48} {:10.2f} us  (x{:.2f}){}'.format(
+            case, seconds * 1e6, ratio, '  REGRESSION' if regression else ''
+        ))
+    return regressions
+
+
+def run(name: str, description: str, cases: Dict[str, Callable[[], float]]):
+    """
+    Runs the cases of a benchmark, each returning its seconds per operation, and saves or compares the timings
+    according to the command line. Exits with status 1 if there are regressions.
+    """
+    args = parse_args(description)
+    timings = {
+        case: measure_case() for case, measure_case in cases.items()
+        if not args.cases or case.startswith(tuple(args.cases))
+    }
+
+    if args.save:
+        save(name, timings)
+        for case, seconds in timings.items():
+            print('{:<48} {:10.2f} us'.format(case, seconds * 1e6))
+        print('Saved baseline to {}'.format(_path(name)))
+        return
+
+    if compare(name, timings, args.tolerance):
+        sys.exit(1)
@@ -0,0 +1,50 @@
+"""
+Import time benchmark.
+
+Measures the cumulative import time of the entry points of the package, each in a new interpreter with
+``-X importtime``, and lists the slowest modules they import. Run with::
+
+    python -m benchmarks.imports
+"""
+import subprocess
+import sys
+
+MODULES = (
+    'sqs_mega_python_zwap',
+    'sqs_mega_python_zwap.match.evaluation',
+    'sqs_mega_python_zwap.match.pattern_set',
+    'sqs_mega_python_zwap.aws.encoding',
+    'sqs_mega_python_zwap.aws.sqs.publish',
+    'sqs_mega_python_zwap.aws.sqs.subscribe.listener',
+)
+REPEAT = 5
+SLOWEST = 3
+
+
+def _import_times(module):
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+        stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, universal_newlines=True, check=True
+    )
+
+    times = {}
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    for module in MODULES:
+        runs = [_import_times(module) for _ in range(REPEAT)]
+        fastest = min(runs, key=lambda times: times[module])
+        print('{:<50} {:8.1f} ms'.format(module, fastest[module] / 1000))
+
+        top_level = [name for name in fastest if '.' not in name and name != module.split('.')[0]]
+        for name in sorted(top_level, key=fastest.get, reverse=True)[:SLOWEST]:
+            print('    {:<46} {:8.1f} ms'.format(name, fastest[name] / 1000))
+
+
+if __name__ == '__main__':
+    main()
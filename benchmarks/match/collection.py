@@ -0,0 +1,78 @@
+"""
+Collection comparison benchmark.
+
+Compares collections of increasing size, in order to show how the cost of ``Collection.equal`` and
+``Collection.match`` grows with the number of items. Run with::
+
+    python -m benchmarks.match.collection
+"""
+import timeit
+
+from sqs_mega_python_zwap.match.functions import gt
+from sqs_mega_python_zwap.match.values import Collection
+
+SIZES = (125, 250, 500, 1000)
+REPEAT = 5
+NUMBER = 3
+
+
+def _scalars(size):
+    lhs = list(range(size))
+    rhs = list(reversed(lhs))
+    return lhs, rhs
+
+
+def _strings(size):
+    lhs = [str(i) for i in range(size)]
+    rhs = list(reversed(lhs))
+    return lhs, rhs
+
+
+def _nullable(size):
+    lhs = list(range(size)) + [None]
+    rhs = list(reversed(lhs))
+    return lhs, rhs
+
+
+def _mixed(size):
+    lhs = [str(i) for i in range(size)] + list(range(size))
+    rhs = list(reversed(range(size))) + ['{}'.format(i) for i in range(size)]
+    return lhs, rhs
+
+
+def _mappings(size):
+    lhs = [{'id': i} for i in range(size)]
+    rhs = [{'id': gt(size - 2)}, {'id': 0}]
+    return lhs, rhs
+
+
+CASES = [
+    ('equal, numbers', _scalars, Collection.equal),
+    ('match, numbers', _scalars, Collection.match),
+    ('equal, strings', _strings, Collection.equal),
+    ('equal, numbers and null', _nullable, Collection.equal),
+    ('equal, strings vs. numbers', _mixed, Collection.equal),
+    ('match, mappings (pairwise)', _mappings, Collection.match),
+]
+
+
+def _measure(method, lhs, rhs):
+    collection = Collection(rhs)
+    timer = timeit.Timer(lambda: method(collection, lhs))
+    return min(timer.repeat(repeat=REPEAT, number=NUMBER)) / NUMBER
+
+
+def main():
+    for name, build, method in CASES:
+        print(name)
+        previous = None
+        for size in SIZES:
+            lhs, rhs = build(size)
+            seconds = _measure(method, lhs, rhs)
+            growth = '' if previous is None else '  (x{:.1f})'.format(seconds / previous)
+            print('  {:>5} x {:<5} {:10.3f} ms{}'.format(len(lhs), len(rhs), seconds * 1000, growth))
+            previous = seconds
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Pattern node memory benchmark.
+
+Measures the memory allocated per pattern node, for the slotted node classes and for subclasses of them that have an
+instance ``__dict__``, like the nodes had before using ``__slots__``. Run with::
+
+    python -m benchmarks.match.memory
+"""
+import gc
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqs_mega_python_zwap.match.functions import Equal, In, Not, And
+from sqs_mega_python_zwap.match.values import String, Number, DateTime, Collection, Mapping
+
+COUNT = 10000
+
+
+def _strings():
+    return [('item.{}'.format(i),) for i in range(COUNT)]
+
+
+def _numbers():
+    return [(1000 + i,) for i in range(COUNT)]
+
+
+def _datetimes():
+    start = datetime(2020, 1, 1)
+    return [(start + timedelta(seconds=i),) for i in range(COUNT)]
+
+
+def _collections():
+    return [(('a{}'.format(i), 'b{}'.format(i)),) for i in range(COUNT)]
+
+
+def _mappings():
+    return [({'name': 'item.{}'.format(i)},) for i in range(COUNT)]
+
+
+def _string_values():
+    return [(String('item.{}'.format(i)),) for i in range(COUNT)]
+
+
+def _collection_values():
+    return [(Collection(('a{}'.format(i), 'b{}'.format(i))),) for i in range(COUNT)]
+
+
+def _functions():
+    return [(Equal('item.{}'.format(i)),) for i in range(COUNT)]
+
+
+def _function_pairs():
+    return [([Equal('a{}'.format(i)), Equal('b{}'.format(i))],) for i in range(COUNT)]
+
+
+CASES = [
+    ('String', String, _strings),
+    ('Number', Number, _numbers),
+    ('DateTime', DateTime, _datetimes),
+    ('Collection', Collection, _collections),
+    ('Mapping', Mapping, _mappings),
+    ('Equal', Equal, _string_values),
+    ('In', In, _collection_values),
+    ('Not', Not, _functions),
+    ('And', And, _function_pairs),
+]
+
+
+def _with_dict(cls):
+    # Subclasses that do not define __slots__ get an instance __dict__
+    return type(cls.__name__, (cls,), {})
+
+
+def _measure(cls, arguments):
+    nodes = [None] * len(arguments)
+    gc.collect()
+
+    tracemalloc.start()
+    for i, args in enumerate(arguments):
+        nodes[i] = cls(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return size / len(nodes)
+
+
+def main():
+    print('{:<12} {:>12} {:>12} {:>8}'.format('node', '__dict__', '__slots__', 'saving'))
+    for name, cls, build in CASES:
+        arguments = build()
+        before = _measure(_with_dict(cls), arguments)
+        after = _measure(cls, arguments)
+        print('{:<12} {:>10.0f} B {:>10.0f} B {:>7.0%}'.format(name, before, after, 1 - after / before))
+
+
+if __name__ == '__main__':
+    main()
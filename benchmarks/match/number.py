@@ -0,0 +1,56 @@
+"""
+Number comparison benchmark.
+
+Compares numbers of every supported left-hand side type to int, float and decimal right-hand sides, with the generic
+``Value`` and ``ComparableValue`` comparisons and with the ones of ``Number``. Run with::
+
+    python -m benchmarks.match.number
+"""
+import timeit
+from decimal import Decimal
+
+from sqs_mega_python_zwap.match.values import Number
+from sqs_mega_python_zwap.match.values.value import Value, ComparableValue
+
+REPEAT = 5
+NUMBER = 100000
+
+RHS = [
+    ('int', 1000),
+    ('float', 1000.5),
+    ('decimal', Decimal('1000.5')),
+]
+
+LHS = [
+    ('int', 999),
+    ('float', 999.5),
+    ('decimal', Decimal('999.5')),
+    ('string', '999'),
+]
+
+METHODS = [
+    ('equal', Value.equal, Number.equal),
+    ('greater_than', ComparableValue.greater_than, Number.greater_than),
+    ('less_than_or_equal', ComparableValue.less_than_or_equal, Number.less_than_or_equal),
+]
+
+
+def _measure(method, number, lhs):
+    timer = timeit.Timer(lambda: method(number, lhs))
+    return min(timer.repeat(repeat=REPEAT, number=NUMBER)) / NUMBER
+
+
+def main():
+    for method_name, generic, fast in METHODS:
+        print(method_name)
+        for rhs_name, rhs in RHS:
+            number = Number(rhs)
+            for lhs_name, lhs in LHS:
+                before = _measure(generic, number, lhs)
+                after = _measure(fast, number, lhs)
+                print('  {:>7} vs. {:<7} {:8.3f} us -> {:8.3f} us  (x{:.1f})'.format(
+                    lhs_name, rhs_name, before * 1e6, after * 1e6, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Parallel pattern evaluation benchmark.
+
+Matches raw JSON documents against a set of regular expression patterns, in the calling process with a ``PatternSet``
+and in pools of an increasing number of processes with a ``ParallelPatternSet``. Run with::
+
+    python -m benchmarks.match.parallel
+"""
+import json
+import os
+import time
+
+from sqs_mega_python_zwap.match.functions import match, one_of
+from sqs_mega_python_zwap.match.parallel import ParallelPatternSet
+from sqs_mega_python_zwap.match.pattern_set import PatternSet
+
+PATTERNS = 200
+EVENTS = 5000
+
+PATTERN_SET = {
+    i: {
+        'event': {'name': match(r'(item|cart)\.(added|removed)\.{}$'.format(i))},
+        'object': {'id': one_of(*range(i, i + 500))},
+    }
+    for i in range(PATTERNS)
+}
+
+DOCUMENTS = [
+    json.dumps({'event': {'name': 'item.added.{}'.format(i % PATTERNS)}, 'object': {'id': i % 1000}})
+    for i in range(EVENTS)
+]
+
+
+def _sequential():
+    patterns = PatternSet(PATTERN_SET)
+    return [patterns.matches(json.loads(document)) for document in DOCUMENTS]
+
+
+def _measure(evaluate):
+    start = time.perf_counter()
+    evaluate()
+    return time.perf_counter() - start
+
+
+def main():
+    _sequential()
+    baseline = _measure(_sequential)
+    print('{:<16} {:8.3f} s'.format('PatternSet', baseline))
+
+    processes = 1
+    while processes <= os.cpu_count():
+        with ParallelPatternSet(PATTERN_SET, processes=processes) as pool:
+            pool.matches(DOCUMENTS[:processes])
+            seconds = _measure(lambda: pool.matches(DOCUMENTS))
+        label = '{} process(es)'.format(processes)
+        print('{:<16} {:8.3f} s  (x{:.1f})'.format(label, seconds, baseline / seconds))
+        processes *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Publish, receive, match and dispatch benchmark.
+
+Measures the hot paths of a message on its way from a publisher to the callbacks of a listener, on representative
+payloads: payload serialization and decoding for every payload type, deserialization of received SQS messages with and
+without an embedded SNS notification, pattern evaluation, and dispatch to listeners of an increasing number of routes.
+The whole pipeline is then measured end to end, against the in-memory SQS and SNS of ``sqs_mega_python_zwap.aws.fake``,
+so that the benchmark runs offline. Timings are compared to the saved baseline (see ``benchmarks.baseline``). Run
+with::
+
+    python -m benchmarks.pipeline [--save] [--tolerance 1.25] [case prefix...]
+"""
+import functools
+
+from benchmarks.baseline import measure, run
+from sqs_mega_python_zwap.aws.encoding import decode_value
+from sqs_mega_python_zwap.aws.fake import FakeAws
+from sqs_mega_python_zwap.aws.payload import serialize_payload, deserialize_payload
+from sqs_mega_python_zwap.aws.sns.publish.api import SnsPublisher
+from sqs_mega_python_zwap.aws.sqs.publish.api import SqsPublisher
+from sqs_mega_python_zwap.aws.sqs.schema import deserialize_sqs_message
+from sqs_mega_python_zwap.aws.sqs.subscribe.api import SqsReceiver
+from sqs_mega_python_zwap.aws.sqs.subscribe.listener import SqsListener
+from sqs_mega_python_zwap.event import Payload, Event, ObjectData
+from sqs_mega_python_zwap.match.evaluation import evaluate
+from sqs_mega_python_zwap.match.functions import match, one_of, gte, not_
+
+NAME = 'pipeline'
+REPEAT = 5
+NUMBER = 2000
+ROUTES = (1, 10, 100)
+MESSAGES = 500
+
+MEGA = Payload(
+    event=Event(
+        name='order.paid',
+        domain='shop',
+        subject='987650',
+        publisher='checkout',
+        attributes={'channel': 'web', 'coupon': None, 'items': 3},
+    ),
+    object=ObjectData(
+        type='order',
+        id='987650',
+        current={
+            'id': 987650,
+            'status': 'paid',
+            'customer': {'id': 42, 'name': 'John Doe', 'email': 'john@example.com'},
+            'items': [{'sku': 'sku-{}'.format(i), 'quantity': i, 'price': 9.99 * i} for i in range(1, 4)],
+            'total': 59.94,
+            'tags': ['gift', 'express'],
+        },
+        previous={'status': 'pending'},
+    )
+)
+DATA = {
+    'order_id': 987650,
+    'status': 'paid',
+    'items': [{'sku': 'sku-{}'.format(i), 'quantity': i} for i in range(1, 4)],
+    'total': 59.94,
+}
+PLAINTEXT = 'Order 987650 has been paid'
+
+PAYLOADS = [
+    ('mega', MEGA, False),
+    ('json', DATA, False),
+    ('bson', DATA, True),
+    ('plaintext', PLAINTEXT, False),
+]
+
+PATTERNS = [
+    ('event_name', {'event': {'name': match(r'^order\.(paid|refunded)$')}}),
+    ('nested', {
+        'event': {'name': 'order.paid', 'domain': one_of('shop', 'marketplace')},
+        'object': {'current': {'total': gte(50), 'status': not_('cancelled'), 'customer': {'id': one_of(*range(100))}}},
+    }),
+    ('mismatch', {'event': {'name': 'order.created'}, 'object': {'current': {'status': 'pending'}}}),
+]
+
+
+def _ignore(_data):
+    pass
+
+
+def _setup_django():
+    # Received messages are deserialized according to the Django settings of the application, if any
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure()
+
+
+def _received_message(raw_message_delivery: bool) -> dict:
+    aws = FakeAws()
+    queue_url = aws.create_queue('queue')
+    topic_arn = aws.create_topic('topic')
+    aws.subscribe(topic_arn, queue_url, raw_message_delivery=raw_message_delivery)
+    SnsPublisher(topic_arn=topic_arn, client=aws.sns_client()).publish(MEGA)
+
+    return aws.sqs_client().receive_message(
+        QueueUrl=queue_url, AttributeNames=['MessageGroupId', 'ApproximateReceiveCount'], MessageAttributeNames=['All']
+    )['Messages'][0]
+
+
+def _listener(routes: int) -> SqsListener:
+    # The message matches the last route, after all the other ones have been tried
+    callbacks = {r'^order\.{}\.paid$'.format(i): _ignore for i in range(routes - 1)}
+    callbacks[r'^order\.paid$'] = _ignore
+    return SqsListener(callbacks)
+
+
+def _end_to_end() -> float:
+    aws = FakeAws()
+    queue_url = aws.create_queue('queue')
+    topic_arn = aws.create_topic('topic')
+    aws.subscribe(topic_arn, queue_url)
+
+    publisher = SnsPublisher(topic_arn=topic_arn, client=aws.sns_client())
+    receiver = SqsReceiver(queue_url=queue_url, max_number_of_messages=10, wait_time_seconds=0, visibility_timeout=30,
+                           client=aws.sqs_client())
+    listener = SqsListener({r'^order\.paid$': _ignore}, listener=receiver)
+
+    def pipeline():
+        for _ in range(MESSAGES):
+            publisher.publish(MEGA)
+        while True:
+            messages = receiver.receive_messages()
+            if not messages:
+                break
+            listener.process_batch(messages)
+
+    return measure(pipeline, REPEAT, 1) / MESSAGES
+
+
+def _batch_publish() -> float:
+    aws = FakeAws()
+    queue_url = aws.create_queue('queue')
+    publisher = SqsPublisher(queue_url=queue_url, client=aws.sqs_client())
+    bodies = [serialize_payload(MEGA)] * MESSAGES
+
+    def publish():
+        publisher.publish_raw_messages(bodies)
+        aws.sqs_client().purge_queue(QueueUrl=queue_url)
+
+    return measure(publish, REPEAT, 1) / MESSAGES
+
+
+def _cases():
+    cases = {}
+
+    for name, payload, binary_encoding in PAYLOADS:
+        serialized = serialize_payload(payload, binary_encoding=binary_encoding)
+        cases['serialize_payload/' + name] = functools.partial(
+            measure, lambda p=payload, b=binary_encoding: serialize_payload(p, binary_encoding=b), REPEAT, NUMBER
+        )
+        cases['deserialize_payload/' + name] = functools.partial(
+            measure, lambda s=serialized: deserialize_payload(s), REPEAT, NUMBER
+        )
+        cases['decode_value/' + name] = functools.partial(measure, lambda s=serialized: decode_value(s), REPEAT, NUMBER)
+
+    for name, raw_message_delivery in [('sqs', True), ('sns_envelope', False)]:
+        data = _received_message(raw_message_delivery)
+        cases['deserialize_sqs_message/' + name] = functools.partial(
+            measure, lambda d=data: deserialize_sqs_message(d), REPEAT, NUMBER
+        )
+
+    document = decode_value(serialize_payload(MEGA))
+    for name, pattern in PATTERNS:
+        cases['evaluate/' + name] = functools.partial(
+            measure, lambda p=pattern: evaluate(document, p), REPEAT, NUMBER
+        )
+
+    message = deserialize_sqs_message(_received_message(False))
+    for routes in ROUTES:
+        listener = _listener(routes)
+        cases['handle_message/{}_routes'.format(routes)] = functools.partial(
+            measure, lambda l=listener: l.handle_message(message), REPEAT, NUMBER
+        )
+
+    cases['publish_raw_messages/per_message'] = _batch_publish
+    cases['end_to_end/per_message'] = _end_to_end
+    return cases
+
+
+def main():
+    _setup_django()
+    run(NAME, 'Publish, receive, match and dispatch benchmark', _cases())
+
+
+if __name__ == '__main__':
+    main()
@@ -15,4 +15,9 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     package_dir={"sqs_mega_python_zwap": "./sqs_mega_python_zwap"},
     install_requires=requirements,
+    extras_require={
+        'batch': ['numpy'],
+        'prometheus': ['prometheus_client'],
+        'statsd': ['statsd'],
+    },
 )
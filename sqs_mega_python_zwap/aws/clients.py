@@ -0,0 +1,134 @@
+import threading
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # boto3 and botocore are slow to import, and are only imported when the first client is created
+    from botocore.client import BaseClient
+    from botocore.config import Config
+
+# The read timeout must be longer than the longest SQS long-polling wait (20 seconds)
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_MAX_ATTEMPTS = 5
+
+ClientKey = Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+def client_config(
+        max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        tcp_keepalive: bool = True
+) -> 'Config':
+    """
+    Builds the botocore configuration of shared clients: a connection pool large enough to be shared by many threads,
+    timeouts suitable for long polling, and retries with the standard retry mode.
+    """
+    from botocore.config import Config
+
+    options = dict(
+        max_pool_connections=max_pool_connections,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries={'max_attempts': max_attempts, 'mode': 'standard'},
+    )
+
+    try:
+        return Config(tcp_keepalive=tcp_keepalive, **options)
+    except TypeError:
+        # TCP keep-alive is only supported by recent botocore versions
+        return Config(**options)
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of boto3 clients, keyed by service, region, credentials and endpoint. Creating a client loads
+    the service model and resolves credentials, so clients are created once and shared: boto3 clients are thread-safe.
+
+    Clients are created with the registry configuration (see ``client_config``), from a session owned by the registry,
+    since sessions are not thread-safe. Preconfigured clients can be injected with ``register_client``.
+    """
+
+    def __init__(self, config: Optional['Config'] = None):
+        self._config = config
+        self._clients: Dict[ClientKey, 'BaseClient'] = {}
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> 'Config':
+        if self._config is None:
+            self._config = client_config()
+        return self._config
+
+    def get_client(
+            self,
+            service_name: str,
+            region_name: Optional[str] = None,
+            aws_access_key_id: Optional[str] = None,
+            aws_secret_access_key: Optional[str] = None,
+            endpoint_url: Optional[str] = None
+    ) -> 'BaseClient':
+        key = (service_name, region_name, aws_access_key_id, aws_secret_access_key, endpoint_url)
+
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = self._create_client(*key)
+            return client
+
+    def register_client(
+            self,
+            client: 'BaseClient',
+            service_name: str,
+            region_name: Optional[str] = None,
+            aws_access_key_id: Optional[str] = None,
+            aws_secret_access_key: Optional[str] = None,
+            endpoint_url: Optional[str] = None
+    ):
+        """
+        Registers a preconfigured client, returned instead of creating one for the same key.
+        """
+        key = (service_name, region_name, aws_access_key_id, aws_secret_access_key, endpoint_url)
+        with self._lock:
+            self._clients[key] = client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def _create_client(self, service_name, region_name, aws_access_key_id, aws_secret_access_key, endpoint_url):
+        if self._session is None:
+            import boto3.session
+            self._session = boto3.session.Session()
+
+        return self._session.client(
+            service_name,
+            region_name=region_name,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            endpoint_url=endpoint_url,
+            config=self.config
+        )
+
+
+clients = ClientRegistry()
+
+
+def get_client(
+        service_name: str,
+        region_name: Optional[str] = None,
+        aws_access_key_id: Optional[str] = None,
+        aws_secret_access_key: Optional[str] = None,
+        endpoint_url: Optional[str] = None
+) -> 'BaseClient':
+    """
+    Returns the shared client of the process-wide registry.
+    """
+    return clients.get_client(service_name, region_name, aws_access_key_id, aws_secret_access_key, endpoint_url)
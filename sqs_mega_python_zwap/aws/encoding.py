@@ -4,8 +4,6 @@ from base64 import b64decode, b64encode
 from logging import getLogger
 from typing import Optional, Tuple, Union
 
-import bson
-
 from sqs_mega_python_zwap.aws import LOGGER_NAME
 
 logger = getLogger(LOGGER_NAME)
@@ -19,6 +17,8 @@ def try_decode_base64(plaintext: str) -> Tuple[Optional[bytes], Optional[Excepti
 
 
 def try_decode_bson(blob: bytes) -> Tuple[Optional[dict], Optional[Exception]]:
+    import bson
+
     try:
         return bson.loads(blob), None
     except (IndexError, TypeError) as e:
@@ -69,6 +69,8 @@ def encode_json(data, sort_keys=True):
 
 
 def encode_bson(data):
+    import bson
+
     blob = bson.dumps(data)
     return encode_blob(blob)
 
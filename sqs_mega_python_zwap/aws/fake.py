@@ -0,0 +1,620 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sqs_mega_python_zwap.aws.clients import ClientRegistry
+
+#
+# In-process stand-in for SQS and SNS, for tests and benchmarks that need more than recorded responses: concurrent
+# consumers, batches, visibility timeouts, FIFO message groups and SNS fan-out. The clients have the methods of the
+# boto3 clients used by this package, with the same parameters and responses, and raise the same ``ClientError``s:
+#
+#     aws = FakeAws()
+#     queue_url = aws.create_queue('orders')
+#     topic_arn = aws.create_topic('events')
+#     aws.subscribe(topic_arn, queue_url)
+#
+#     publisher = SnsPublisher(topic_arn=topic_arn, client=aws.sns_client())
+#     receiver = SqsReceiver(queue_url=queue_url, client=aws.sqs_client())
+#
+# Unlike SQS, messages are received in the order they were sent, and each receive returns as many messages as possible.
+#
+DEFAULT_REGION = 'us-east-1'
+DEFAULT_ACCOUNT_ID = '000000000000'
+DEFAULT_VISIBILITY_TIMEOUT = 30
+DEDUPLICATION_INTERVAL = 5 * 60
+MAX_VISIBILITY_TIMEOUT = 12 * 60 * 60
+MAX_BATCH_SIZE = 10
+MAX_NUMBER_OF_MESSAGES = 10
+
+
+def _client_error(operation: str, code: str, message: str) -> Exception:
+    from botocore.exceptions import ClientError
+    return ClientError({'Error': {'Code': code, 'Message': message, 'Type': 'Sender'}}, operation)
+
+
+def _md5(value: str) -> str:
+    return hashlib.md5(value.encode('utf-8')).hexdigest()
+
+
+class _Message:
+    __slots__ = (
+        'message_id', 'body', 'message_attributes', 'group_id', 'deduplication_id', 'sequence_number', 'sent',
+        'visible_at', 'receive_count', 'first_received', 'receipt_handle'
+    )
+
+    def __init__(self, body, message_attributes, group_id, deduplication_id, sequence_number, sent, visible_at):
+        self.message_id = str(uuid.uuid4())
+        self.body = body
+        self.message_attributes = message_attributes or {}
+        self.group_id = group_id
+        self.deduplication_id = deduplication_id
+        self.sequence_number = sequence_number
+        self.sent = sent
+        self.visible_at = visible_at
+        self.receive_count = 0
+        self.first_received = None
+        self.receipt_handle = None
+
+
+class _Queue:
+
+    def __init__(self, name: str, url: str, arn: str, attributes: Dict[str, str]):
+        self.name = name
+        self.url = url
+        self.arn = arn
+        self.attributes = dict(attributes)
+        self.fifo = attributes.get('FifoQueue', 'false') == 'true'
+        self.messages: Dict[str, _Message] = OrderedDict()
+        self.deduplication: Dict[str, float] = {}
+        self.sequence = 0
+
+    @property
+    def visibility_timeout(self) -> int:
+        return int(self.attributes.get('VisibilityTimeout', DEFAULT_VISIBILITY_TIMEOUT))
+
+    @property
+    def redrive_policy(self) -> Optional[dict]:
+        policy = self.attributes.get('RedrivePolicy')
+        return json.loads(policy) if policy else None
+
+
+class _Subscription:
+
+    def __init__(self, arn: str, queue: _Queue, raw_message_delivery: bool):
+        self.arn = arn
+        self.queue = queue
+        self.raw_message_delivery = raw_message_delivery
+
+
+class _Topic:
+
+    def __init__(self, name: str, arn: str, attributes: Dict[str, str]):
+        self.name = name
+        self.arn = arn
+        self.attributes = dict(attributes)
+        self.fifo = attributes.get('FifoTopic', 'false') == 'true'
+        self.subscriptions: List[_Subscription] = []
+
+
+class FakeAws:
+    """
+    Queues and topics of a fake AWS account, shared by all the clients returned by ``sqs_client`` and ``sns_client``.
+    The backend is thread-safe, and long polling waits for messages like SQS does.
+    """
+
+    def __init__(self, region_name: str = DEFAULT_REGION, account_id: str = DEFAULT_ACCOUNT_ID,
+                 clock: Callable[[], float] = time.time):
+        self.region_name = region_name
+        self.account_id = account_id
+        self._clock = clock
+        self._queues: Dict[str, _Queue] = {}
+        self._topics: Dict[str, _Topic] = {}
+        self._condition = threading.Condition()
+
+    def sqs_client(self) -> 'FakeSqsClient':
+        return FakeSqsClient(self)
+
+    def sns_client(self) -> 'FakeSnsClient':
+        return FakeSnsClient(self)
+
+    def register(self, registry: 'ClientRegistry', region_name: Optional[str] = None,
+                 endpoint_url: Optional[str] = None):
+        """
+        Registers clients of this account in a registry (see ``sqs_mega_python_zwap.aws.clients``), so that publishers
+        and receivers created without ``client`` use them.
+        """
+        registry.register_client(self.sqs_client(), 'sqs', region_name=region_name, endpoint_url=endpoint_url)
+        registry.register_client(self.sns_client(), 'sns', region_name=region_name, endpoint_url=endpoint_url)
+
+    def create_queue(self, name: str, attributes: Optional[Dict[str, str]] = None) -> str:
+        attributes = dict(attributes or {})
+        if name.endswith('.fifo'):
+            attributes.setdefault('FifoQueue', 'true')
+        elif attributes.get('FifoQueue') == 'true':
+            raise _client_error('CreateQueue', 'InvalidParameterValue', 'The name of a FIFO queue must end in .fifo')
+
+        with self._condition:
+            for queue in self._queues.values():
+                if queue.name == name:
+                    return queue.url
+
+            url = 'https://sqs.{}.amazonaws.com/{}/{}'.format(self.region_name, self.account_id, name)
+            arn = 'arn:aws:sqs:{}:{}:{}'.format(self.region_name, self.account_id, name)
+            self._queues[url] = _Queue(name, url, arn, attributes)
+            return url
+
+    def create_topic(self, name: str, attributes: Optional[Dict[str, str]] = None) -> str:
+        attributes = dict(attributes or {})
+        if name.endswith('.fifo'):
+            attributes.setdefault('FifoTopic', 'true')
+
+        with self._condition:
+            arn = 'arn:aws:sns:{}:{}:{}'.format(self.region_name, self.account_id, name)
+            if arn not in self._topics:
+                self._topics[arn] = _Topic(name, arn, attributes)
+            return arn
+
+    def subscribe(self, topic_arn: str, queue_url_or_arn: str, raw_message_delivery: bool = False) -> str:
+        with self._condition:
+            topic = self._topic('Subscribe', topic_arn)
+            queue = self._queue('Subscribe', queue_url_or_arn)
+            if topic.fifo != queue.fifo:
+                raise _client_error('Subscribe', 'InvalidParameter', 'FIFO topics can only deliver to FIFO queues')
+
+            subscription = _Subscription('{}:{}'.format(topic_arn, uuid.uuid4()), queue, raw_message_delivery)
+            topic.subscriptions.append(subscription)
+            return subscription.arn
+
+    def messages(self, queue_url: str) -> List[str]:
+        """
+        Bodies of the messages of a queue that have not been deleted, including the messages in flight.
+        """
+        with self._condition:
+            return [message.body for message in self._queue('Messages', queue_url).messages.values()]
+
+    #
+    # SQS
+    #
+
+    def _queue(self, operation: str, url_or_arn: str) -> _Queue:
+        queue = self._queues.get(url_or_arn)
+        if queue is None:
+            queue = next((queue for queue in self._queues.values() if queue.arn == url_or_arn), None)
+        if queue is None:
+            raise _client_error(operation, 'AWS.SimpleQueueService.NonExistentQueue',
+                                'The specified queue does not exist: {}'.format(url_or_arn))
+        return queue
+
+    def _send(self, operation: str, queue: _Queue, body: str, message_attributes: Optional[dict] = None,
+              group_id: Optional[str] = None, deduplication_id: Optional[str] = None, delay: int = 0) -> _Message:
+        now = self._clock()
+
+        if queue.fifo:
+            if not group_id:
+                raise _client_error(operation, 'MissingParameter',
+                                    'The request must contain the parameter MessageGroupId.')
+            if deduplication_id is None:
+                if queue.attributes.get('ContentBasedDeduplication') != 'true':
+                    raise _client_error(
+                        operation, 'InvalidParameterValue',
+                        'The queue should either have ContentBasedDeduplication enabled or MessageDeduplicationId '
+                        'provided explicitly'
+                    )
+                deduplication_id = hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+            # Deduplication IDs expire in the order they were added
+            while queue.deduplication and next(iter(queue.deduplication.values())) <= now:
+                queue.deduplication.pop(next(iter(queue.deduplication)))
+
+            expiration = queue.deduplication.get(deduplication_id)
+            if expiration is not None and expiration > now:
+                # Duplicates are accepted, but not delivered
+                return next(
+                    (message for message in queue.messages.values() if message.deduplication_id == deduplication_id),
+                    _Message(body, message_attributes, group_id, deduplication_id, None, now, now)
+                )
+            queue.deduplication[deduplication_id] = now + DEDUPLICATION_INTERVAL
+
+        queue.sequence += 1
+        message = _Message(
+            body, message_attributes, group_id, deduplication_id,
+            str(queue.sequence).zfill(20) if queue.fifo else None, now, now + delay
+        )
+        queue.messages[message.message_id] = message
+        self._condition.notify_all()
+        return message
+
+    def _receive(self, queue: _Queue, max_number_of_messages: int, visibility_timeout: int) -> List[_Message]:
+        now = self._clock()
+        policy = queue.redrive_policy
+
+        # Messages of a FIFO group are not received while a previous message of the group is in flight
+        locked_groups = {
+            message.group_id for message in queue.messages.values() if message.visible_at > now
+        } if queue.fifo else set()
+
+        received = []
+        for message in list(queue.messages.values()):
+            if len(received) == max_number_of_messages:
+                break
+            if message.visible_at > now or message.group_id in locked_groups:
+                continue
+
+            if policy is not None and message.receive_count >= int(policy['maxReceiveCount']):
+                self._move_to_dead_letter_queue(queue, message, policy['deadLetterTargetArn'])
+                continue
+
+            message.receive_count += 1
+            message.first_received = message.first_received or now
+            message.visible_at = now + visibility_timeout
+            message.receipt_handle = '{}#{}'.format(message.message_id, uuid.uuid4())
+            received.append(message)
+
+        return received
+
+    def _move_to_dead_letter_queue(self, queue: _Queue, message: _Message, dead_letter_queue_arn: str):
+        del queue.messages[message.message_id]
+        dead_letter_queue = self._queue('ReceiveMessage', dead_letter_queue_arn)
+        dead_letter_queue.messages[message.message_id] = message
+        message.visible_at = self._clock()
+        message.receipt_handle = None
+
+    def _next_visible_at(self, queue: _Queue) -> Optional[float]:
+        now = self._clock()
+        return min((message.visible_at for message in queue.messages.values() if message.visible_at > now),
+                   default=None)
+
+    def _message_for_receipt(self, operation: str, queue: _Queue, receipt_handle: str) -> Optional[_Message]:
+        # Receipt handles are made of the ID of the message and of a random part
+        message_id, separator, _ = receipt_handle.partition('#')
+        if not separator:
+            raise _client_error(operation, 'ReceiptHandleIsInvalid',
+                                'The input receipt handle is invalid: {}'.format(receipt_handle))
+        return queue.messages.get(message_id)
+
+    def _delete(self, operation: str, queue: _Queue, receipt_handle: str):
+        message = self._message_for_receipt(operation, queue, receipt_handle)
+        # Like SQS, deleting a message that has already been deleted succeeds
+        if message is not None:
+            del queue.messages[message.message_id]
+            self._condition.notify_all()
+
+    def _change_visibility(self, operation: str, queue: _Queue, receipt_handle: str, visibility_timeout: int):
+        if not 0 <= visibility_timeout <= MAX_VISIBILITY_TIMEOUT:
+            raise _client_error(operation, 'InvalidParameterValue',
+                                'Invalid visibility timeout: {}'.format(visibility_timeout))
+
+        message = self._message_for_receipt(operation, queue, receipt_handle)
+        if message is None or message.receipt_handle != receipt_handle or message.visible_at <= self._clock():
+            raise _client_error(operation, 'MessageNotInflight', 'Message does not exist or is not available for '
+                                                                 'visibility timeout change')
+        message.visible_at = self._clock() + visibility_timeout
+        self._condition.notify_all()
+
+    def _message_response(self, message: _Message, attribute_names: List[str],
+                          message_attribute_names: List[str]) -> dict:
+        response = {
+            'MessageId': message.message_id,
+            'ReceiptHandle': message.receipt_handle,
+            'MD5OfBody': _md5(message.body),
+            'Body': message.body,
+        }
+
+        attributes = {
+            'SenderId': self.account_id,
+            'SentTimestamp': str(int(message.sent * 1000)),
+            'ApproximateReceiveCount': str(message.receive_count),
+            'ApproximateFirstReceiveTimestamp': str(int(message.first_received * 1000)),
+        }
+        if message.group_id is not None:
+            attributes['MessageGroupId'] = message.group_id
+        if message.deduplication_id is not None:
+            attributes['MessageDeduplicationId'] = message.deduplication_id
+        if message.sequence_number is not None:
+            attributes['SequenceNumber'] = message.sequence_number
+        if 'All' not in attribute_names:
+            attributes = {name: value for name, value in attributes.items() if name in attribute_names}
+        if attributes:
+            response['Attributes'] = attributes
+
+        message_attributes = {
+            name: value for name, value in message.message_attributes.items()
+            if 'All' in message_attribute_names or '.*' in message_attribute_names or name in message_attribute_names
+        }
+        if message_attributes:
+            response['MessageAttributes'] = message_attributes
+
+        return response
+
+    #
+    # SNS
+    #
+
+    def _topic(self, operation: str, topic_arn: str) -> _Topic:
+        topic = self._topics.get(topic_arn)
+        if topic is None:
+            raise _client_error(operation, 'NotFound', 'Topic does not exist: {}'.format(topic_arn))
+        return topic
+
+    def _publish(self, topic: _Topic, message: str, subject: Optional[str], message_attributes: Optional[dict],
+                 group_id: Optional[str], deduplication_id: Optional[str]) -> str:
+        if topic.fifo:
+            if not group_id:
+                raise _client_error('Publish', 'InvalidParameter',
+                                    'The MessageGroupId parameter is required for FIFO topics')
+            if deduplication_id is None:
+                if topic.attributes.get('ContentBasedDeduplication') != 'true':
+                    raise _client_error('Publish', 'InvalidParameter',
+                                        'The topic should either have ContentBasedDeduplication enabled or '
+                                        'MessageDeduplicationId provided explicitly')
+                deduplication_id = hashlib.sha256(message.encode('utf-8')).hexdigest()
+        else:
+            group_id = deduplication_id = None
+
+        message_id = str(uuid.uuid4())
+        for subscription in topic.subscriptions:
+            if subscription.raw_message_delivery:
+                body = message
+                attributes = message_attributes
+            else:
+                body = self._notification(topic, message_id, message, subject, message_attributes)
+                attributes = None
+            self._send('Publish', subscription.queue, body, attributes, group_id, deduplication_id)
+        return message_id
+
+    def _notification(self, topic: _Topic, message_id: str, message: str, subject: Optional[str],
+                      message_attributes: Optional[dict]) -> str:
+        timestamp = datetime.fromtimestamp(self._clock(), timezone.utc)
+        notification = {
+            'Type': 'Notification',
+            'MessageId': message_id,
+            'TopicArn': topic.arn,
+            'Message': message,
+            'Timestamp': timestamp.strftime('%Y-%m-%dT%H:%M:%S.') + '{:03d}Z'.format(timestamp.microsecond // 1000),
+            'SignatureVersion': '1',
+            'Signature': 'FAKE',
+            'SigningCertURL': 'https://sns.{}.amazonaws.com/fake.pem'.format(self.region_name),
+            'UnsubscribeURL': 'https://sns.{}.amazonaws.com/?Action=Unsubscribe'.format(self.region_name),
+        }
+        if subject is not None:
+            notification['Subject'] = subject
+        if message_attributes:
+            notification['MessageAttributes'] = {
+                name: {'Type': value['DataType'], 'Value': value.get('StringValue', value.get('BinaryValue'))}
+                for name, value in message_attributes.items()
+            }
+        return json.dumps(notification)
+
+
+class FakeSqsClient:
+    """
+    SQS client of a ``FakeAws`` account, with the methods and responses of the boto3 SQS client.
+    """
+
+    def __init__(self, aws: FakeAws):
+        self.aws = aws
+
+    def create_queue(self, QueueName: str, Attributes: Optional[Dict[str, str]] = None, **_kwargs) -> dict:
+        return {'QueueUrl': self.aws.create_queue(QueueName, Attributes)}
+
+    def get_queue_url(self, QueueName: str, **_kwargs) -> dict:
+        with self.aws._condition:
+            for queue in self.aws._queues.values():
+                if queue.name == QueueName:
+                    return {'QueueUrl': queue.url}
+        raise _client_error('GetQueueUrl', 'AWS.SimpleQueueService.NonExistentQueue',
+                            'The specified queue does not exist: {}'.format(QueueName))
+
+    def get_queue_attributes(self, QueueUrl: str, AttributeNames: Optional[List[str]] = None, **_kwargs) -> dict:
+        aws = self.aws
+        with aws._condition:
+            queue = aws._queue('GetQueueAttributes', QueueUrl)
+            now = aws._clock()
+            attributes = dict(queue.attributes)
+            attributes.update({
+                'QueueArn': queue.arn,
+                'VisibilityTimeout': str(queue.visibility_timeout),
+                'ApproximateNumberOfMessages': str(sum(
+                    1 for message in queue.messages.values() if message.visible_at <= now
+                )),
+                'ApproximateNumberOfMessagesNotVisible': str(sum(
+                    1 for message in queue.messages.values() if message.visible_at > now
+                )),
+            })
+
+        names = AttributeNames or ['All']
+        if 'All' not in names:
+            attributes = {name: value for name, value in attributes.items() if name in names}
+        return {'Attributes': attributes}
+
+    def purge_queue(self, QueueUrl: str, **_kwargs) -> dict:
+        with self.aws._condition:
+            queue = self.aws._queue('PurgeQueue', QueueUrl)
+            queue.messages.clear()
+        return {}
+
+    def send_message(self, QueueUrl: str, MessageBody: str, DelaySeconds: int = 0,
+                     MessageAttributes: Optional[dict] = None, MessageGroupId: Optional[str] = None,
+                     MessageDeduplicationId: Optional[str] = None, **_kwargs) -> dict:
+        aws = self.aws
+        with aws._condition:
+            queue = aws._queue('SendMessage', QueueUrl)
+            message = aws._send(
+                'SendMessage', queue, MessageBody, MessageAttributes, MessageGroupId, MessageDeduplicationId,
+                DelaySeconds
+            )
+        return self._sent(message)
+
+    def send_message_batch(self, QueueUrl: str, Entries: List[dict], **_kwargs) -> dict:
+        self._check_batch('SendMessageBatch', Entries)
+
+        aws = self.aws
+        successful, failed = [], []
+        with aws._condition:
+            queue = aws._queue('SendMessageBatch', QueueUrl)
+            for entry in Entries:
+                try:
+                    message = aws._send(
+                        'SendMessageBatch', queue, entry['MessageBody'], entry.get('MessageAttributes'),
+                        entry.get('MessageGroupId'), entry.get('MessageDeduplicationId'), entry.get('DelaySeconds', 0)
+                    )
+                except Exception as e:
+                    failed.append(self._failed(entry, e))
+                else:
+                    successful.append(dict(Id=entry['Id'], **self._sent(message)))
+        return self._batch_response(successful, failed)
+
+    def receive_message(self, QueueUrl: str, MaxNumberOfMessages: int = 1, WaitTimeSeconds: int = 0,
+                        VisibilityTimeout: Optional[int] = None, AttributeNames: Optional[List[str]] = None,
+                        MessageSystemAttributeNames: Optional[List[str]] = None,
+                        MessageAttributeNames: Optional[List[str]] = None, **_kwargs) -> dict:
+        if not 1 <= MaxNumberOfMessages <= MAX_NUMBER_OF_MESSAGES:
+            raise _client_error('ReceiveMessage', 'InvalidParameterValue',
+                                'Invalid MaxNumberOfMessages: {}'.format(MaxNumberOfMessages))
+
+        aws = self.aws
+        attribute_names = list(AttributeNames or []) + list(MessageSystemAttributeNames or [])
+        deadline = time.monotonic() + WaitTimeSeconds
+
+        with aws._condition:
+            queue = aws._queue('ReceiveMessage', QueueUrl)
+            visibility_timeout = queue.visibility_timeout if VisibilityTimeout is None else VisibilityTimeout
+
+            while True:
+                messages = aws._receive(queue, MaxNumberOfMessages, visibility_timeout)
+                remaining = deadline - time.monotonic()
+                if messages or remaining <= 0:
+                    break
+
+                # Wait for a new message, or for a message in flight to be visible again
+                next_visible_at = aws._next_visible_at(queue)
+                if next_visible_at is not None:
+                    remaining = min(remaining, max(next_visible_at - aws._clock(), 0.001))
+                aws._condition.wait(remaining)
+
+            responses = [
+                aws._message_response(message, attribute_names, MessageAttributeNames or [])
+                for message in messages
+            ]
+
+        return {'Messages': responses} if responses else {}
+
+    def delete_message(self, QueueUrl: str, ReceiptHandle: str, **_kwargs) -> dict:
+        with self.aws._condition:
+            self.aws._delete('DeleteMessage', self.aws._queue('DeleteMessage', QueueUrl), ReceiptHandle)
+        return {}
+
+    def delete_message_batch(self, QueueUrl: str, Entries: List[dict], **_kwargs) -> dict:
+        self._check_batch('DeleteMessageBatch', Entries)
+
+        aws = self.aws
+        successful, failed = [], []
+        with aws._condition:
+            queue = aws._queue('DeleteMessageBatch', QueueUrl)
+            for entry in Entries:
+                try:
+                    aws._delete('DeleteMessageBatch', queue, entry['ReceiptHandle'])
+                except Exception as e:
+                    failed.append(self._failed(entry, e))
+                else:
+                    successful.append({'Id': entry['Id']})
+        return self._batch_response(successful, failed)
+
+    def change_message_visibility(self, QueueUrl: str, ReceiptHandle: str, VisibilityTimeout: int, **_kwargs) -> dict:
+        aws = self.aws
+        with aws._condition:
+            queue = aws._queue('ChangeMessageVisibility', QueueUrl)
+            aws._change_visibility('ChangeMessageVisibility', queue, ReceiptHandle, VisibilityTimeout)
+        return {}
+
+    def change_message_visibility_batch(self, QueueUrl: str, Entries: List[dict], **_kwargs) -> dict:
+        self._check_batch('ChangeMessageVisibilityBatch', Entries)
+
+        aws = self.aws
+        successful, failed = [], []
+        with aws._condition:
+            queue = aws._queue('ChangeMessageVisibilityBatch', QueueUrl)
+            for entry in Entries:
+                try:
+                    aws._change_visibility(
+                        'ChangeMessageVisibilityBatch', queue, entry['ReceiptHandle'], entry['VisibilityTimeout']
+                    )
+                except Exception as e:
+                    failed.append(self._failed(entry, e))
+                else:
+                    successful.append({'Id': entry['Id']})
+        return self._batch_response(successful, failed)
+
+    @staticmethod
+    def _check_batch(operation: str, entries: List[dict]):
+        if not entries:
+            raise _client_error(operation, 'AWS.SimpleQueueService.EmptyBatchRequest',
+                                'There should be at least one entry in the request.')
+        if len(entries) > MAX_BATCH_SIZE:
+            raise _client_error(operation, 'AWS.SimpleQueueService.TooManyEntriesInBatchRequest',
+                                'Maximum number of entries per request are {}.'.format(MAX_BATCH_SIZE))
+        if len({entry['Id'] for entry in entries}) != len(entries):
+            raise _client_error(operation, 'AWS.SimpleQueueService.BatchEntryIdsNotDistinct',
+                                'Two or more batch entries in the request have the same Id.')
+
+    @staticmethod
+    def _sent(message: _Message) -> dict:
+        response = {'MessageId': message.message_id, 'MD5OfMessageBody': _md5(message.body)}
+        if message.sequence_number is not None:
+            response['SequenceNumber'] = message.sequence_number
+        return response
+
+    @staticmethod
+    def _failed(entry: dict, error: Any) -> dict:
+        details = getattr(error, 'response', {}).get('Error', {})
+        return {
+            'Id': entry['Id'],
+            'SenderFault': True,
+            'Code': details.get('Code', type(error).__name__),
+            'Message': details.get('Message', str(error)),
+        }
+
+    @staticmethod
+    def _batch_response(successful: List[dict], failed: List[dict]) -> dict:
+        response = {'Successful': successful}
+        if failed:
+            response['Failed'] = failed
+        return response
+
+
+class FakeSnsClient:
+    """
+    SNS client of a ``FakeAws`` account, with the methods and responses of the boto3 SNS client. Topics deliver to
+    the SQS queues of the account, with or without raw message delivery.
+    """
+
+    def __init__(self, aws: FakeAws):
+        self.aws = aws
+
+    def create_topic(self, Name: str, Attributes: Optional[Dict[str, str]] = None, **_kwargs) -> dict:
+        return {'TopicArn': self.aws.create_topic(Name, Attributes)}
+
+    def subscribe(self, TopicArn: str, Protocol: str, Endpoint: str, Attributes: Optional[Dict[str, str]] = None,
+                  **_kwargs) -> dict:
+        if Protocol != 'sqs':
+            raise _client_error('Subscribe', 'InvalidParameter', 'Unsupported protocol: {}'.format(Protocol))
+
+        raw_message_delivery = (Attributes or {}).get('RawMessageDelivery', 'false') == 'true'
+        return {'SubscriptionArn': self.aws.subscribe(TopicArn, Endpoint, raw_message_delivery)}
+
+    def publish(self, Message: str, TopicArn: Optional[str] = None, Subject: Optional[str] = None,
+                MessageAttributes: Optional[dict] = None, MessageGroupId: Optional[str] = None,
+                MessageDeduplicationId: Optional[str] = None, **_kwargs) -> dict:
+        aws = self.aws
+        with aws._condition:
+            topic = aws._topic('Publish', TopicArn)
+            message_id = aws._publish(topic, Message, Subject, MessageAttributes, MessageGroupId,
+                                      MessageDeduplicationId)
+        return {'MessageId': message_id}
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Callable, Optional
+
+import sqs_mega_python_zwap.event
+from sqs_mega_python_zwap.aws.payload import MessagePayload
+
+FIFO_SUFFIX = '.fifo'
+MAX_ID_LENGTH = 128
+
+# Returns the message group of a payload, or None if the payload doesn't belong to a group
+MessageGroupKey = Callable[[MessagePayload], Optional[str]]
+
+
+def is_fifo(queue_url_or_topic_arn: str) -> bool:
+    return queue_url_or_topic_arn.endswith(FIFO_SUFFIX)
+
+
+def object_message_group_id(payload: MessagePayload) -> Optional[str]:
+    """
+    Groups the messages of Mega payloads by object, so that the events of an object are delivered in order, and the
+    events of different objects in parallel. The group is the type and the ID of the object, or None if the payload has
+    no object ID.
+    """
+    if not isinstance(payload, sqs_mega_python_zwap.event.Payload) or payload.object is None:
+        return None
+
+    object_id = payload.object.id
+    if object_id is None:
+        return None
+
+    group_id = str(object_id) if payload.object.type is None else '{}:{}'.format(payload.object.type, object_id)
+    return _fit_id(group_id)
+
+
+def content_deduplication_id(body: str) -> str:
+    """
+    Deduplication ID derived from the message body, like the content-based deduplication of FIFO queues and topics
+    (a SHA-256 hash of the body), so that it can be used with queues and topics where it is not enabled.
+    """
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def _fit_id(value: str) -> str:
+    # Group and deduplication IDs are limited to 128 characters
+    if len(value) <= MAX_ID_LENGTH:
+        return value
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
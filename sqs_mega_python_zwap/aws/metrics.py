@@ -0,0 +1,192 @@
+import re
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Tuple
+
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+GAUGE = 'gauge'
+
+SECONDS = 'seconds'
+MESSAGES = 'messages'
+REQUESTS = 'requests'
+ERRORS_UNIT = 'errors'
+
+DEFAULT_NAMESPACE = 'sqs_mega'
+
+# Histogram buckets of batch sizes, up to the largest SQS batch
+BATCH_SIZE_BUCKETS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+
+
+class Metric:
+    """
+    A metric emitted by the receivers, publishers and listeners, with the names of its labels. Label values are given
+    in the same order when emitting the metric.
+    """
+
+    __slots__ = ('name', 'type', 'unit', 'description', 'labels', 'buckets')
+
+    def __init__(self, name: str, type: str, unit: str, description: str, labels: Tuple[str, ...] = (),
+                 buckets: Optional[Sequence[float]] = None):
+        self.name = name
+        self.type = type
+        self.unit = unit
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+
+    def __repr__(self):
+        return 'Metric({})'.format(self.name)
+
+
+RECEIVE_SECONDS = Metric(
+    'receive_seconds', HISTOGRAM, SECONDS, 'Duration of the SQS receive requests', ('queue',)
+)
+RECEIVED_MESSAGES = Metric(
+    'received_messages', HISTOGRAM, MESSAGES, 'Messages returned by each SQS receive request', ('queue',),
+    BATCH_SIZE_BUCKETS
+)
+# The empty-poll ratio is the number of empty receives over the number of receives (the count of RECEIVE_SECONDS)
+EMPTY_RECEIVES = Metric(
+    'empty_receives', COUNTER, REQUESTS, 'SQS receive requests that returned no message', ('queue',)
+)
+DECODE_SECONDS = Metric(
+    'decode_seconds', HISTOGRAM, SECONDS, 'Duration of the deserialization of received messages', ('payload_type',)
+)
+HANDLER_SECONDS = Metric(
+    'handler_seconds', HISTOGRAM, SECONDS, 'Duration of the listener callbacks', ('route',)
+)
+DELETE_BATCH_SIZE = Metric(
+    'delete_batch_size', HISTOGRAM, MESSAGES, 'Messages deleted by each SQS delete request', ('queue',),
+    BATCH_SIZE_BUCKETS
+)
+PUBLISH_BATCH_SIZE = Metric(
+    'publish_batch_size', HISTOGRAM, MESSAGES, 'Messages sent by each SQS or SNS publish request', ('destination',),
+    BATCH_SIZE_BUCKETS
+)
+IN_FLIGHT_MESSAGES = Metric(
+    'in_flight_messages', GAUGE, MESSAGES, 'Messages being handled by the listeners'
+)
+ERRORS = Metric(
+    'errors', COUNTER, ERRORS_UNIT, 'Failed requests and callbacks, by operation', ('operation',)
+)
+
+METRICS = (
+    RECEIVE_SECONDS,
+    RECEIVED_MESSAGES,
+    EMPTY_RECEIVES,
+    DECODE_SECONDS,
+    HANDLER_SECONDS,
+    DELETE_BATCH_SIZE,
+    PUBLISH_BATCH_SIZE,
+    IN_FLIGHT_MESSAGES,
+    ERRORS,
+)
+
+# Operations of the ERRORS metric
+RECEIVE = ('receive',)
+DELETE = ('delete',)
+PUBLISH = ('publish',)
+HANDLE = ('handle',)
+
+
+class Metrics:
+    """
+    Hook of the metrics emitted by the receivers, publishers and listeners (see ``METRICS``). Metrics are ignored by
+    default: subclasses send them to a monitoring system, like ``PrometheusMetrics`` and ``StatsdMetrics``. Methods are
+    called on the hot path, and should be cheap.
+    """
+
+    def increment(self, metric: Metric, labels: Tuple[str, ...] = (), value: float = 1):
+        """
+        Increments a counter.
+        """
+
+    def observe(self, metric: Metric, value: float, labels: Tuple[str, ...] = ()):
+        """
+        Records a value of a histogram.
+        """
+
+    def add(self, metric: Metric, value: float, labels: Tuple[str, ...] = ()):
+        """
+        Adds a value, possibly negative, to a gauge.
+        """
+
+
+NULL_METRICS = Metrics()
+
+
+def payload_type_label(message: Any) -> str:
+    payload_type = getattr(message, 'payload_type', None)
+    return payload_type.name.lower() if payload_type is not None else 'unknown'
+
+
+class PrometheusMetrics(Metrics):
+    """
+    Metrics of a Prometheus ``registry``, the default registry of ``prometheus_client`` by default, named after the
+    ``namespace``.
+    """
+
+    def __init__(self, registry: Optional[Any] = None, namespace: str = DEFAULT_NAMESPACE):
+        import prometheus_client
+
+        types = {
+            COUNTER: prometheus_client.Counter,
+            HISTOGRAM: prometheus_client.Histogram,
+            GAUGE: prometheus_client.Gauge,
+        }
+        registry = registry if registry is not None else prometheus_client.REGISTRY
+
+        self._collectors = {}
+        for metric in METRICS:
+            kwargs = {'buckets': metric.buckets} if metric.buckets is not None else {}
+            self._collectors[metric] = types[metric.type](
+                metric.name, metric.description, metric.labels, namespace=namespace, registry=registry, **kwargs
+            )
+
+    def _collector(self, metric: Metric, labels: Tuple[str, ...]):
+        collector = self._collectors[metric]
+        return collector.labels(*labels) if labels else collector
+
+    def increment(self, metric: Metric, labels: Tuple[str, ...] = (), value: float = 1):
+        self._collector(metric, labels).inc(value)
+
+    def observe(self, metric: Metric, value: float, labels: Tuple[str, ...] = ()):
+        self._collector(metric, labels).observe(value)
+
+    def add(self, metric: Metric, value: float, labels: Tuple[str, ...] = ()):
+        self._collector(metric, labels).inc(value)
+
+
+_INVALID_STATSD_CHARACTERS = re.compile(r'[^A-Za-z0-9_\-]+')
+
+
+@lru_cache(maxsize=1024)
+def _statsd_name(prefix: Optional[str], name: str, labels: Tuple[str, ...]) -> str:
+    # StatsD has no labels: their values are appended to the name of the metric
+    parts = (prefix, name) if prefix else (name,)
+    return '.'.join(parts + tuple(_INVALID_STATSD_CHARACTERS.sub('_', label) for label in labels))
+
+
+class StatsdMetrics(Metrics):
+    """
+    Metrics sent with a StatsD ``client``, any client with the interface of ``statsd.StatsClient`` (``incr``,
+    ``timing`` and ``gauge`` with ``delta``), so that StatsD is not a dependency. The values of the labels are appended
+    to the names of the metrics, after the ``prefix`` if any. Histograms are sent as timers, in milliseconds for
+    durations.
+    """
+
+    def __init__(self, client: Any, prefix: Optional[str] = DEFAULT_NAMESPACE):
+        self.client = client
+        self.prefix = prefix
+
+    def _name(self, metric: Metric, labels: Tuple[str, ...]) -> str:
+        return _statsd_name(self.prefix, metric.name, labels)
+
+    def increment(self, metric: Metric, labels: Tuple[str, ...] = (), value: float = 1):
+        self.client.incr(self._name(metric, labels), value)
+
+    def observe(self, metric: Metric, value: float, labels: Tuple[str, ...] = ()):
+        self.client.timing(self._name(metric, labels), value * 1000 if metric.unit == SECONDS else value)
+
+    def add(self, metric: Metric, value: float, labels: Tuple[str, ...] = ()):
+        self.client.gauge(self._name(metric, labels), value, delta=True)
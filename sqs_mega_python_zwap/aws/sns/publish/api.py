@@ -1,13 +1,17 @@
 import logging
 import uuid
 
-from typing import Optional
-
-import boto3
+from typing import Optional, TYPE_CHECKING
 
+from sqs_mega_python_zwap.aws.clients import get_client
+from sqs_mega_python_zwap.aws.fifo import MessageGroupKey, object_message_group_id, content_deduplication_id
+from sqs_mega_python_zwap.aws.metrics import Metrics, NULL_METRICS, PUBLISH_BATCH_SIZE, ERRORS, PUBLISH
 from sqs_mega_python_zwap.aws.payload import MessagePayload, serialize_payload
 from sqs_mega_python_zwap.aws.publish import Publisher
 
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
 logger = logging.getLogger('mega.aws.sns')
 
 
@@ -18,15 +22,38 @@ class SnsPublisher(Publisher):
             aws_access_key_id: Optional[str] = None,
             aws_secret_access_key: Optional[str] = None,
             region_name: Optional[str] = None,
-            topic_arn: Optional[str] = None
+            topic_arn: Optional[str] = None,
+            endpoint_url: Optional[str] = None,
+            client: Optional['BaseClient'] = None,
+            message_group_key: Optional[MessageGroupKey] = object_message_group_id,
+            content_based_deduplication: bool = True,
+            metrics: Optional[Metrics] = None
     ):
-        self._client = boto3.client(
+        """
+        The SNS client is shared by all the publishers with the same region, credentials and endpoint (see
+        ``sqs_mega_python_zwap.aws.clients``), unless a preconfigured ``client`` is given.
+
+        Payloads are published to the message group returned by ``message_group_key``, by default the object of Mega
+        payloads, so that the messages of a group are delivered in order. Messages without a group are published to a
+        group of their own. The deduplication ID of messages is a hash of their body, so that publishing again a message
+        (when retrying a failed publish, for instance) doesn't deliver it twice, unless ``content_based_deduplication``
+        is unset: it is then a random ID. An ``idempotency_key`` can be given instead, to deduplicate messages whose
+        body differs, like events of the same operation with different timestamps.
+
+        Metrics of the requests are emitted to ``metrics`` (see ``sqs_mega_python_zwap.aws.metrics``), and ignored by
+        default.
+        """
+        self._client = client or get_client(
             'sns',
+            region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name,
+            endpoint_url=endpoint_url
         )
         self._topic_arn = topic_arn
+        self._message_group_key = message_group_key
+        self._content_based_deduplication = content_based_deduplication
+        self._metrics = metrics or NULL_METRICS
 
     @property
     def topic_arn(self):
@@ -34,28 +61,47 @@ class SnsPublisher(Publisher):
 
     def publish(
             self, payload: MessagePayload,
-            binary_encoding=False, topic_arn: Optional[str] = None
+            binary_encoding=False, topic_arn: Optional[str] = None,
+            message_group_id: Optional[str] = None, idempotency_key: Optional[str] = None
     ) -> str:
         serialized = serialize_payload(payload, binary_encoding=binary_encoding)
-        return self.publish_raw_message(serialized, topic_arn=topic_arn, **{
-            "event_name": payload.event.name
-        })
+        deduplication_id = None if idempotency_key is None else content_deduplication_id(idempotency_key)
+        if message_group_id is None and self._message_group_key is not None:
+            message_group_id = self._message_group_key(payload)
 
-    def publish_raw_message(self, message: str, topic_arn: Optional[str] = None, **_kwargs) -> str:
+        return self.publish_raw_message(
+            serialized, topic_arn=topic_arn, message_group_id=message_group_id, deduplication_id=deduplication_id, **{
+                "event_name": payload.event.name
+            }
+        )
+
+    def publish_raw_message(
+            self, message: str, topic_arn: Optional[str] = None,
+            message_group_id: Optional[str] = None, deduplication_id: Optional[str] = None, **_kwargs
+    ) -> str:
         topic_arn = self._get_topic_arn(topic_arn)
         event_name = _kwargs.get("event_name", None)
-        response = self._client.publish(
-            TopicArn=topic_arn,
-            Message=message,
-            MessageAttributes={
-                "event_name": {
-                    "DataType": "String",
-                    "StringValue": event_name
-                }
-            },
-            MessageGroupId=str(uuid.uuid4()),
-            MessageDeduplicationId=str(uuid.uuid4())
-        )
+        if deduplication_id is None:
+            deduplication_id = content_deduplication_id(message) if self._content_based_deduplication \
+                else str(uuid.uuid4())
+
+        try:
+            response = self._client.publish(
+                TopicArn=topic_arn,
+                Message=message,
+                MessageAttributes={
+                    "event_name": {
+                        "DataType": "String",
+                        "StringValue": event_name
+                    }
+                },
+                MessageGroupId=message_group_id or str(uuid.uuid4()),
+                MessageDeduplicationId=deduplication_id
+            )
+        except Exception:
+            self._metrics.increment(ERRORS, PUBLISH)
+            raise
+        self._metrics.observe(PUBLISH_BATCH_SIZE, 1, (topic_arn,))
 
         message_id = response.get('MessageId')
         logger.info('[{0}][{1}] Published SNS message'.format(topic_arn, message_id))
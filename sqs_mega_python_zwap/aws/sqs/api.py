@@ -1,8 +1,12 @@
 import logging
 from abc import ABC
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-import boto3
+from sqs_mega_python_zwap.aws.clients import get_client
+from sqs_mega_python_zwap.aws.metrics import Metrics, NULL_METRICS
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
 
 logger = logging.getLogger('mega.aws.sqs')
 
@@ -14,15 +18,25 @@ class BaseSqsApi(ABC):
             aws_access_key_id: Optional[str] = None,
             aws_secret_access_key: Optional[str] = None,
             region_name: Optional[str] = None,
-            queue_url: Optional[str] = None
+            queue_url: Optional[str] = None,
+            endpoint_url: Optional[str] = None,
+            client: Optional['BaseClient'] = None,
+            metrics: Optional[Metrics] = None
     ):
-        self._client = boto3.client(
+        """
+        The SQS client is shared by all the instances with the same region, credentials and endpoint (see
+        ``sqs_mega_python_zwap.aws.clients``), unless a preconfigured ``client`` is given. Metrics of the requests are
+        emitted to ``metrics`` (see ``sqs_mega_python_zwap.aws.metrics``), and ignored by default.
+        """
+        self._client = client or get_client(
             'sqs',
+            region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name
+            endpoint_url=endpoint_url
         )
         self._queue_url = queue_url
+        self._metrics = metrics or NULL_METRICS
 
     @property
     def queue_url(self):
@@ -10,13 +10,19 @@ class SqsMessage(Message):
             receipt_handle: str,
             payload: Optional[MessagePayload],
             payload_type: PayloadType,
-            embedded_message: Optional[Message] = None
+            embedded_message: Optional[Message] = None,
+            message_group_id: Optional[str] = None,
+            body: Optional[str] = None,
+            receive_count: Optional[int] = None
     ):
         self._message_id = message_id
         self._receipt_handle = receipt_handle
         self._payload = payload
         self._payload_type = payload_type
         self._embedded_message = embedded_message
+        self._message_group_id = message_group_id
+        self._body = body
+        self._receive_count = receive_count
 
     @property
     def message_id(self) -> str:
@@ -41,3 +47,24 @@ class SqsMessage(Message):
     @property
     def receipt_handle(self) -> str:
         return self._receipt_handle
+
+    @property
+    def message_group_id(self) -> Optional[str]:
+        """
+        Message group of messages received from FIFO queues
+        """
+        return self._message_group_id
+
+    @property
+    def body(self) -> Optional[str]:
+        """
+        Body of the message as received, before decoding
+        """
+        return self._body
+
+    @property
+    def receive_count(self) -> Optional[int]:
+        """
+        Number of times the message has been received, including this one
+        """
+        return self._receive_count
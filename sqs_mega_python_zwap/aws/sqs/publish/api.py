@@ -1,33 +1,146 @@
-from logging import INFO, DEBUG
-from typing import Optional
+import uuid
+from logging import INFO, DEBUG, WARNING
+from typing import List, Optional, TYPE_CHECKING
 
+from sqs_mega_python_zwap.aws.fifo import MessageGroupKey, object_message_group_id, content_deduplication_id, is_fifo
+from sqs_mega_python_zwap.aws.metrics import Metrics, PUBLISH_BATCH_SIZE, ERRORS, PUBLISH
 from sqs_mega_python_zwap.aws.payload import MessagePayload, serialize_payload
 from sqs_mega_python_zwap.aws.publish import Publisher
 from sqs_mega_python_zwap.aws.sqs.api import BaseSqsApi
 
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+# Largest number of entries of SQS batch requests
+MAX_BATCH_SIZE = 10
+
 
 class SqsPublisher(BaseSqsApi, Publisher):
 
+    def __init__(
+            self,
+            aws_access_key_id: Optional[str] = None,
+            aws_secret_access_key: Optional[str] = None,
+            region_name: Optional[str] = None,
+            queue_url: Optional[str] = None,
+            endpoint_url: Optional[str] = None,
+            client: Optional['BaseClient'] = None,
+            message_group_key: Optional[MessageGroupKey] = object_message_group_id,
+            content_based_deduplication: bool = True,
+            metrics: Optional[Metrics] = None
+    ):
+        """
+        Messages sent to FIFO queues are sent to the message group returned by ``message_group_key``, by default the
+        object of Mega payloads, so that the messages of a group are received in order. Messages without a group are
+        sent to a group of their own. The deduplication ID of messages sent to FIFO queues is a hash of their body, or
+        of the ``idempotency_key`` given when publishing, so that publishing again a message doesn't deliver it twice.
+        If ``content_based_deduplication`` is unset, messages published without an idempotency key are left to the
+        content-based deduplication of the queue.
+        """
+        super().__init__(
+            aws_access_key_id,
+            aws_secret_access_key,
+            region_name,
+            queue_url,
+            endpoint_url,
+            client,
+            metrics
+        )
+
+        self._message_group_key = message_group_key
+        self._content_based_deduplication = content_based_deduplication
+
     def publish(
             self, payload: MessagePayload,
             binary_encoding=False,
-            queue_url: Optional[str] = None, **_kwargs
+            queue_url: Optional[str] = None,
+            message_group_id: Optional[str] = None,
+            idempotency_key: Optional[str] = None, **_kwargs
     ) -> str:
         serialized = serialize_payload(payload, binary_encoding=binary_encoding)
+        deduplication_id = None
+
+        if is_fifo(self._get_queue_url(queue_url)):
+            if message_group_id is None and self._message_group_key is not None:
+                message_group_id = self._message_group_key(payload)
+            if idempotency_key is not None:
+                deduplication_id = content_deduplication_id(idempotency_key)
+
         return self.publish_raw_message(serialized,
-                                        queue_url=queue_url)
+                                        queue_url=queue_url,
+                                        message_group_id=message_group_id,
+                                        deduplication_id=deduplication_id)
 
     def publish_raw_message(self, body: str,
                             queue_url: Optional[str] = None,
+                            message_group_id: Optional[str] = None,
+                            deduplication_id: Optional[str] = None,
                             **_kwargs) -> str:
+        """
+        Message group and deduplication IDs are only sent to FIFO queues, unless given explicitly.
+        """
         queue_url = self._get_queue_url(queue_url)
 
-        response = self._client.send_message(
-            QueueUrl=queue_url,
-            MessageBody=body,
-        )
+        try:
+            response = self._client.send_message(
+                QueueUrl=queue_url,
+                MessageBody=body,
+                **self._fifo_parameters(queue_url, body, message_group_id, deduplication_id)
+            )
+        except Exception:
+            self._metrics.increment(ERRORS, PUBLISH)
+            raise
+        self._metrics.observe(PUBLISH_BATCH_SIZE, 1, (queue_url,))
 
         message_id = response.get('MessageId')
         self._log_message(INFO, queue_url, message_id, 'Sent SQS message')
         self._log_message(DEBUG, queue_url, message_id, body)
         return message_id
+
+    def publish_raw_messages(self, bodies: List[str], queue_url: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Sends many messages with as few requests as possible. Returns the IDs of the messages, in the order of the
+        bodies, with None for the messages that could not be sent.
+        """
+        queue_url = self._get_queue_url(queue_url)
+
+        message_ids = [None] * len(bodies)
+        for start in range(0, len(bodies), MAX_BATCH_SIZE):
+            entries = [
+                dict(Id=str(index), MessageBody=body, **self._fifo_parameters(queue_url, body, None, None))
+                for index, body in enumerate(bodies[start:start + MAX_BATCH_SIZE], start)
+            ]
+            try:
+                response = self._client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+            except Exception:
+                self._metrics.increment(ERRORS, PUBLISH)
+                raise
+            self._metrics.observe(PUBLISH_BATCH_SIZE, len(entries), (queue_url,))
+
+            for entry in response.get('Successful', []):
+                index = int(entry['Id'])
+                message_ids[index] = entry['MessageId']
+                self._log_message(INFO, queue_url, entry['MessageId'], 'Sent SQS message')
+                self._log_message(DEBUG, queue_url, entry['MessageId'], bodies[index])
+            for entry in response.get('Failed', []):
+                self._log(
+                    WARNING, queue_url,
+                    'Could not send message. {}: {}'.format(entry.get('Code'), entry.get('Message'))
+                )
+            if 'Failed' in response:
+                self._metrics.increment(ERRORS, PUBLISH, len(response['Failed']))
+
+        return message_ids
+
+    def _fifo_parameters(self, queue_url: str, body: str, message_group_id: Optional[str],
+                         deduplication_id: Optional[str]) -> dict:
+        parameters = {}
+        if is_fifo(queue_url):
+            parameters['MessageGroupId'] = message_group_id or str(uuid.uuid4())
+            if deduplication_id is None and self._content_based_deduplication:
+                deduplication_id = content_deduplication_id(body)
+        elif message_group_id is not None:
+            parameters['MessageGroupId'] = message_group_id
+        if deduplication_id is not None:
+            parameters['MessageDeduplicationId'] = deduplication_id
+        return parameters
@@ -16,6 +16,7 @@ class SqsMessageSchema(Schema):
     message_id = fields.String(data_key='MessageId', required=True, allow_none=False)
     receipt_handle = fields.String(data_key='ReceiptHandle', required=True, allow_none=False)
     body = fields.String(data_key='Body', required=True, allow_none=False)
+    attributes = fields.Dict(data_key='Attributes', keys=fields.String(), values=fields.String(), required=False)
 
     @post_load
     def build_object(self, data, **kwargs):
@@ -32,7 +33,8 @@ class SqsMessageSchema(Schema):
             receipt_handle=data['receipt_handle'],
             payload=sns_message.payload,
             payload_type=sns_message.payload_type,
-            embedded_message=sns_message
+            embedded_message=sns_message,
+            **_attributes(data)
         )
 
     @staticmethod
@@ -42,13 +44,24 @@ class SqsMessageSchema(Schema):
             receipt_handle=data['receipt_handle'],
             payload=payload,
             payload_type=payload_type,
-            embedded_message=None
+            embedded_message=None,
+            **_attributes(data)
         )
 
     def handle_error(self, exc, data, **kwargs):
         raise SqsSchemaError('Could not deserialize SQS message: {0}'.format(exc))
 
 
+def _attributes(data: dict) -> dict:
+    attributes = data.get('attributes', {})
+    receive_count = attributes.get('ApproximateReceiveCount')
+    return dict(
+        message_group_id=attributes.get('MessageGroupId'),
+        body=data['body'],
+        receive_count=int(receive_count) if receive_count is not None else None
+    )
+
+
 def deserialize_sqs_message(data: dict) -> SqsMessage:
     from django.conf import settings
 
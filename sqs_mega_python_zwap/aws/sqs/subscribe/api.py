@@ -1,9 +1,28 @@
-from logging import DEBUG, INFO
-from typing import List, Optional
+from logging import DEBUG, INFO, WARNING
+from time import perf_counter
+from typing import List, Optional, TYPE_CHECKING
 
+from sqs_mega_python_zwap.aws.encoding import decode_value
+from sqs_mega_python_zwap.aws.metrics import Metrics, RECEIVE_SECONDS, RECEIVED_MESSAGES, EMPTY_RECEIVES, \
+    DECODE_SECONDS, DELETE_BATCH_SIZE, ERRORS, RECEIVE, DELETE, payload_type_label
+from sqs_mega_python_zwap.aws.sns.message import SnsMessageType
 from sqs_mega_python_zwap.aws.sqs.api import BaseSqsApi
 from sqs_mega_python_zwap.aws.sqs.message import SqsMessage
 from sqs_mega_python_zwap.aws.sqs.schema import deserialize_sqs_message
+from sqs_mega_python_zwap.match.evaluation import evaluate_result
+from sqs_mega_python_zwap.match.raw_json import JsonMatcher, extract_fields
+from sqs_mega_python_zwap.match.types import RightHandSideType, MatchResult
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+SNS_MESSAGE_KEYS = ('MessageId', 'TopicArn', 'Type', 'Timestamp', 'Message')
+
+# Longest visibility timeout accepted by SQS (12 hours)
+MAX_VISIBILITY_TIMEOUT = 12 * 60 * 60
+
+# Largest number of entries of SQS batch requests
+MAX_BATCH_SIZE = 10
 
 
 class SqsReceiver(BaseSqsApi):
@@ -16,18 +35,35 @@ class SqsReceiver(BaseSqsApi):
             queue_url: Optional[str] = None,
             max_number_of_messages: int = 1,
             wait_time_seconds: int = 1,
-            visibility_timeout: int = 1
+            visibility_timeout: int = 1,
+            message_filter: Optional[RightHandSideType] = None,
+            delete_filtered_messages: bool = True,
+            endpoint_url: Optional[str] = None,
+            client: Optional['BaseClient'] = None,
+            metrics: Optional[Metrics] = None
     ):
+        """
+        If a ``message_filter`` pattern is given, only the messages whose payload matches it are returned. The pattern
+        is evaluated against the decoded JSON payload (for SNS notifications, the payload of the notification). JSON
+        payloads are matched on the raw message body, so filtered out messages are never fully decoded nor
+        deserialized. Filtered out messages are deleted, unless ``delete_filtered_messages`` is unset.
+        """
         super().__init__(
             aws_access_key_id,
             aws_secret_access_key,
             region_name,
-            queue_url
+            queue_url,
+            endpoint_url,
+            client,
+            metrics
         )
 
         self._max_number_of_messages = max_number_of_messages
         self._wait_time_seconds = wait_time_seconds
         self._visibility_timeout = visibility_timeout
+        self._message_filter = message_filter
+        self._message_matcher = JsonMatcher(message_filter) if message_filter is not None else None
+        self._delete_filtered_messages = delete_filtered_messages
 
     @property
     def max_number_of_messages(self) -> int:
@@ -41,6 +77,10 @@ class SqsReceiver(BaseSqsApi):
     def visibility_timeout(self) -> int:
         return self._visibility_timeout
 
+    @property
+    def message_filter(self) -> Optional[RightHandSideType]:
+        return self._message_filter
+
     def receive_messages(
             self,
             queue_url: Optional[str] = None,
@@ -69,25 +109,77 @@ class SqsReceiver(BaseSqsApi):
                 max_number_of_messages, wait_time_seconds, visibility_timeout
             )
         )
-        response = self._client.receive_message(
-            QueueUrl=queue_url,
-            MaxNumberOfMessages=max_number_of_messages,
-            WaitTimeSeconds=wait_time_seconds,
-            VisibilityTimeout=visibility_timeout,
-            MessageAttributeNames=[
-                'All'
-            ]
-        )
+        labels = (queue_url,)
+        start = perf_counter()
+        try:
+            response = self._client.receive_message(
+                QueueUrl=queue_url,
+                MaxNumberOfMessages=max_number_of_messages,
+                WaitTimeSeconds=wait_time_seconds,
+                VisibilityTimeout=visibility_timeout,
+                AttributeNames=[
+                    'MessageGroupId',
+                    'ApproximateReceiveCount'
+                ],
+                MessageAttributeNames=[
+                    'All'
+                ]
+            )
+        except Exception:
+            self._metrics.increment(ERRORS, RECEIVE)
+            raise
+
+        received = len(response.get('Messages', ()))
+        self._metrics.observe(RECEIVE_SECONDS, perf_counter() - start, labels)
+        self._metrics.observe(RECEIVED_MESSAGES, received, labels)
+        if not received:
+            self._metrics.increment(EMPTY_RECEIVES, labels)
         return response
 
     def __extract_messages(self, queue_url, response):
         messages = []
         for data in response['Messages']:
             self.__log_message_data(queue_url, data)
+            if self._message_matcher is not None and not self.__matches_filter(data.get('Body')):
+                self.__filter_out_message(queue_url, data)
+                continue
+            start = perf_counter()
             sqs_message = deserialize_sqs_message(data)
+            self._metrics.observe(DECODE_SECONDS, perf_counter() - start, (payload_type_label(sqs_message),))
             messages.append(sqs_message)
         return messages
 
+    def __matches_filter(self, body) -> bool:
+        if not body:
+            return self.__evaluate_filter(body)
+
+        envelope = extract_fields(body, SNS_MESSAGE_KEYS)
+        if envelope is not None and len(envelope) == len(SNS_MESSAGE_KEYS):
+            if envelope['Type'] != SnsMessageType.NOTIFICATION.value or not isinstance(envelope['Message'], str):
+                # Subscription confirmations are not filtered, and invalid messages are left to the deserialization
+                return True
+            body = envelope['Message']
+
+        matched = self._message_matcher.matches(body)
+        if matched is None:
+            return self.__evaluate_filter(body)
+        return matched
+
+    def __evaluate_filter(self, body) -> bool:
+        # Payloads that are not JSON objects must be decoded first
+        return evaluate_result(decode_value(body), self._message_filter) is MatchResult.MATCH
+
+    def __filter_out_message(self, queue_url, data):
+        message_id = data.get('MessageId')
+        self._log_message(INFO, queue_url, message_id, 'Filtered out message')
+
+        if self._delete_filtered_messages:
+            self._client.delete_message(
+                QueueUrl=queue_url,
+                ReceiptHandle=data['ReceiptHandle']
+            )
+            self._log_message(INFO, queue_url, message_id, 'Deleted message')
+
     def __log_message_data(self, queue_url, data):
         message_id = data.get('MessageId')
         self._log_message(INFO, queue_url, message_id, 'Received message')
@@ -96,10 +188,70 @@ class SqsReceiver(BaseSqsApi):
     def delete_message(self, message: SqsMessage, queue_url: Optional[str] = None):
         queue_url = self._get_queue_url(queue_url)
 
-        self._client.delete_message(
-            QueueUrl=queue_url,
-            ReceiptHandle=message.receipt_handle
-        )
+        try:
+            self._client.delete_message(
+                QueueUrl=queue_url,
+                ReceiptHandle=message.receipt_handle
+            )
+        except Exception:
+            self._metrics.increment(ERRORS, DELETE)
+            raise
+        self._metrics.observe(DELETE_BATCH_SIZE, 1, (queue_url,))
 
         self._log_message(INFO, queue_url, message.message_id, 'Deleted message')
         self._log_message(DEBUG, queue_url, message.message_id, 'ReceiptHandle={}'.format(message.receipt_handle))
+
+    def delete_messages(self, messages: List[SqsMessage], queue_url: Optional[str] = None) -> List[SqsMessage]:
+        """
+        Deletes messages with as few requests as possible, returning the messages that could not be deleted.
+        """
+        queue_url = self._get_queue_url(queue_url)
+
+        failed = []
+        for start in range(0, len(messages), MAX_BATCH_SIZE):
+            batch = messages[start:start + MAX_BATCH_SIZE]
+            try:
+                response = self._client.delete_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[
+                        {'Id': str(index), 'ReceiptHandle': message.receipt_handle}
+                        for index, message in enumerate(batch)
+                    ]
+                )
+            except Exception:
+                self._metrics.increment(ERRORS, DELETE)
+                raise
+            self._metrics.observe(DELETE_BATCH_SIZE, len(batch), (queue_url,))
+
+            for entry in response.get('Successful', []):
+                self._log_message(INFO, queue_url, batch[int(entry['Id'])].message_id, 'Deleted message')
+            for entry in response.get('Failed', []):
+                message = batch[int(entry['Id'])]
+                self._log_message(
+                    WARNING, queue_url, message.message_id,
+                    'Could not delete message. {}: {}'.format(entry.get('Code'), entry.get('Message'))
+                )
+                failed.append(message)
+            if 'Failed' in response:
+                self._metrics.increment(ERRORS, DELETE, len(response['Failed']))
+
+        return failed
+
+    def change_message_visibility(self, message: SqsMessage, visibility_timeout: int, queue_url: Optional[str] = None):
+        """
+        Makes a received message invisible for ``visibility_timeout`` seconds from now, up to the 12 hours limit of SQS.
+        """
+        queue_url = self._get_queue_url(queue_url)
+        visibility_timeout = max(0, min(int(visibility_timeout), MAX_VISIBILITY_TIMEOUT))
+
+        self._client.change_message_visibility(
+            QueueUrl=queue_url,
+            ReceiptHandle=message.receipt_handle,
+            VisibilityTimeout=visibility_timeout
+        )
+
+        self._log_message(
+            DEBUG, queue_url, message.message_id, 'Changed message visibility. VisibilityTimeout={}'.format(
+                visibility_timeout
+            )
+        )
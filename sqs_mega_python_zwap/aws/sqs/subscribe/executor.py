@@ -0,0 +1,68 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Hashable, Optional, Tuple
+
+_Task = Tuple[Future, Callable, tuple, dict]
+
+
+class KeyedExecutor:
+    """
+    Description: Runs tasks in a pool of threads, one at a time and in order for tasks with the same key
+
+    Tasks with different keys, and tasks without a key, run in parallel. Tasks with the same key run one after the
+    other, in the order they were submitted, like the messages of a message group of a FIFO queue. The next task of a
+    key runs in the thread of the previous one, so a key never occupies more than one thread.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, thread_name_prefix: str = ''):
+        self.__executor = ThreadPoolExecutor(max_workers, thread_name_prefix=thread_name_prefix)
+        self.__pending: Dict[Hashable, Deque[_Task]] = {}
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def submit(self, key: Optional[Hashable], fn: Callable, *args, **kwargs) -> Future:
+        if key is None:
+            return self.__executor.submit(fn, *args, **kwargs)
+
+        task = (Future(), fn, args, kwargs)
+        with self.__lock:
+            pending = self.__pending.get(key)
+            if pending is not None:
+                # A task of the key is running, and runs this one once done
+                pending.append(task)
+                return task[0]
+            self.__pending[key] = deque()
+
+        self.__executor.submit(self.__run, key, task)
+        return task[0]
+
+    def shutdown(self, wait: bool = True):
+        """
+        Description: Stops the threads once all the submitted tasks have run, including the pending tasks of keys
+        """
+        self.__executor.shutdown(wait)
+
+    def __run(self, key: Hashable, task: _Task):
+        while task is not None:
+            future, fn, args, kwargs = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+
+            with self.__lock:
+                pending = self.__pending[key]
+                if pending:
+                    task = pending.popleft()
+                else:
+                    del self.__pending[key]
+                    task = None
@@ -0,0 +1,89 @@
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+from sqs_mega_python_zwap.aws.sqs.api import logger
+from sqs_mega_python_zwap.aws.sqs.message import SqsMessage
+
+if TYPE_CHECKING:
+    from sqs_mega_python_zwap.aws.sqs.publish.api import SqsPublisher
+    from sqs_mega_python_zwap.aws.sqs.subscribe.api import SqsReceiver
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 5
+DEFAULT_MAX_DELAY = 15 * 60
+
+Failure = Tuple[SqsMessage, Exception]
+
+
+class FailurePolicy:
+    """
+    Description: What happens to the messages whose callbacks fail
+
+    A failed message is made visible again after an exponential backoff: ``base_delay`` seconds after its first
+    attempt, twice as long after the second one, and so on up to ``max_delay``, based on the number of times it has
+    been received. Once a message has failed ``max_attempts`` times, it is sent to the ``dead_letter_queue`` if any,
+    and deleted. Without dead-letter queue, it keeps being retried, which leaves the redrive policy of the queue (if
+    any) in charge.
+    """
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, dead_letter_queue: Optional['SqsPublisher'] = None):
+
+        if max_attempts < 1:
+            raise ValueError('Max attempts must be positive: {}'.format(max_attempts))
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dead_letter_queue = dead_letter_queue
+
+    def backoff(self, receive_count: Optional[int]) -> int:
+        """
+        Description: Visibility timeout of a message that failed, given the number of times it has been received
+        """
+
+        attempts = max(receive_count or 1, 1)
+        # Capping the exponent keeps the delay finite for messages received many times
+        return int(min(self.max_delay, self.base_delay * 2 ** min(attempts - 1, 32)))
+
+    def is_exhausted(self, message: SqsMessage) -> bool:
+
+        return (message.receive_count or 1) >= self.max_attempts
+
+    def handle_failures(self, failures: List[Failure], receiver: 'SqsReceiver'):
+        """
+        Description: Delays the retry of failed messages, and forwards the exhausted ones to the dead-letter queue
+        """
+
+        retried = []
+        exhausted = []
+        for message, error in failures:
+            if self.dead_letter_queue is not None and self.is_exhausted(message):
+                exhausted.append(message)
+            else:
+                retried.append(message)
+
+        for message in retried:
+            try:
+                receiver.change_message_visibility(message, self.backoff(message.receive_count))
+            except Exception:
+                logger.exception('[{}] Failed to delay the retry of message'.format(message.message_id))
+
+        if exhausted:
+            self.__forward(exhausted, receiver)
+
+    def __forward(self, messages: List[SqsMessage], receiver: 'SqsReceiver'):
+
+        try:
+            message_ids = self.dead_letter_queue.publish_raw_messages([message.body for message in messages])
+        except Exception:
+            logger.exception('Failed to forward {} messages to the dead-letter queue'.format(len(messages)))
+            return
+
+        # Messages that could not be forwarded are left to their visibility timeout, and retried
+        forwarded = [message for message, message_id in zip(messages, message_ids) if message_id is not None]
+        for message in forwarded:
+            logger.warning('[{}] Forwarded message to the dead-letter queue after {} attempts'.format(
+                message.message_id, message.receive_count
+            ))
+        if forwarded:
+            receiver.delete_messages(forwarded)
@@ -0,0 +1,143 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Union
+
+from sqs_mega_python_zwap.aws.sqs.message import SqsMessage
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_SIZE = 100000
+DEFAULT_REDIS_PREFIX = 'mega:processed:'
+
+
+def idempotency_key(message: Union[SqsMessage, dict]) -> Optional[str]:
+    """
+    Description: Key identifying a message across redeliveries: the ID of the SNS notification embedded in the message
+    if any, since a notification can be delivered to a queue more than once, and the SQS message ID otherwise
+    """
+
+    if isinstance(message, dict):
+        return message.get("message_id", None)
+
+    embedded_message = message.embedded_message
+    if embedded_message is not None:
+        return embedded_message.message_id
+    return message.message_id
+
+
+class IdempotencyStore(ABC):
+    """
+    Description: Keys of the messages that have already been processed, remembered for ``ttl`` seconds
+
+    Stores are shared by the threads of a listener, and must be thread-safe.
+    """
+
+    @abstractmethod
+    def is_processed(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def mark_processed(self, key: str):
+        pass
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    Description: Store of the keys processed by the current process, keeping at most ``max_size`` keys: the least
+    recently processed keys are forgotten first
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE,
+                 clock: Callable[[], float] = time.monotonic):
+
+        if max_size < 1:
+            raise ValueError('Max size must be positive: {}'.format(max_size))
+
+        self.ttl = ttl
+        self.max_size = max_size
+        self.__clock = clock
+        self.__expirations = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__expirations)
+
+    def is_processed(self, key: str) -> bool:
+        with self.__lock:
+            expiration = self.__expirations.get(key)
+            if expiration is None:
+                return False
+            if expiration <= self.__clock():
+                del self.__expirations[key]
+                return False
+            return True
+
+    def mark_processed(self, key: str):
+        with self.__lock:
+            self.__expirations[key] = self.__clock() + self.ttl
+            self.__expirations.move_to_end(key)
+
+            # Keys are ordered by expiration, since they all have the same TTL
+            now = self.__clock()
+            while self.__expirations and (
+                    len(self.__expirations) > self.max_size or next(iter(self.__expirations.values())) <= now):
+                self.__expirations.popitem(last=False)
+
+
+class SqliteIdempotencyStore(IdempotencyStore):
+    """
+    Description: Store of processed keys in a SQLite database, shared by the processes of a host and kept across
+    restarts. The default in-memory database is a local stand-in for a shared store
+    """
+
+    def __init__(self, path: str = ':memory:', ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS processed_messages (key TEXT PRIMARY KEY, expiration REAL NOT NULL)'
+        )
+        # Expired keys are deleted every time a key is marked as processed
+        self.__connection.execute(
+            'CREATE INDEX IF NOT EXISTS processed_messages_expiration ON processed_messages (expiration)'
+        )
+
+    def is_processed(self, key: str) -> bool:
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT 1 FROM processed_messages WHERE key = ? AND expiration > ?', (key, self.__clock())
+            ).fetchone()
+        return row is not None
+
+    def mark_processed(self, key: str):
+        now = self.__clock()
+        with self.__lock:
+            self.__connection.execute(
+                'INSERT OR REPLACE INTO processed_messages (key, expiration) VALUES (?, ?)', (key, now + self.ttl)
+            )
+            self.__connection.execute('DELETE FROM processed_messages WHERE expiration <= ?', (now,))
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """
+    Description: Store of processed keys in Redis, shared by all the consumers. The ``client`` is any client with the
+    interface of ``redis.Redis`` (``exists`` and ``set`` with an expiration), so that Redis is not a dependency
+    """
+
+    def __init__(self, client: Any, ttl: int = DEFAULT_TTL, prefix: str = DEFAULT_REDIS_PREFIX):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def is_processed(self, key: str) -> bool:
+        return bool(self.client.exists(self.prefix + key))
+
+    def mark_processed(self, key: str):
+        self.client.set(self.prefix + key, 1, ex=int(self.ttl))
@@ -1,12 +1,41 @@
 # IMPORTING STANDARD PACKAGES
-import re
-
-from typing import Dict, Union, Optional
-from django.conf import settings
+import math
+from time import perf_counter
+from typing import Dict, Union, Optional, List, Set, Tuple
 
 # IMPORTING LOCAL PACKAGES
+from sqs_mega_python_zwap.aws.metrics import Metrics, NULL_METRICS, HANDLER_SECONDS, IN_FLIGHT_MESSAGES, ERRORS, \
+    HANDLE
+from sqs_mega_python_zwap.aws.sqs.api import logger
 from sqs_mega_python_zwap.aws.sqs.message import SqsMessage
 from sqs_mega_python_zwap.aws.sqs.subscribe.api import SqsReceiver
+from sqs_mega_python_zwap.aws.sqs.subscribe.executor import KeyedExecutor
+from sqs_mega_python_zwap.aws.sqs.subscribe.failures import FailurePolicy, Failure
+from sqs_mega_python_zwap.aws.sqs.subscribe.idempotency import IdempotencyStore, idempotency_key
+from sqs_mega_python_zwap.aws.sqs.subscribe.routing import RoutingTable
+from sqs_mega_python_zwap.aws.sqs.subscribe.throttling import RouteLimit, DEFAULT_WAIT_STEP
+from sqs_mega_python_zwap.match.parallel import ParallelPatternSet
+
+_HANDLED = object()
+_SKIPPED = object()
+_UNSET = object()
+
+# Data passed to the callbacks of a message and keys of its routes, or the error raised while extracting them
+Routing = Union[Tuple[dict, List[str]], Exception]
+
+
+class BatchResult:
+    """
+    Description: Outcome of the messages of a batch: handled, failed with the error raised by their callbacks, or
+    skipped because a previous message of their message group failed
+    """
+
+    __slots__ = ('handled', 'failed', 'skipped')
+
+    def __init__(self):
+        self.handled: List[Union[SqsMessage, dict]] = []
+        self.failed: List[Failure] = []
+        self.skipped: List[Union[SqsMessage, dict]] = []
 
 
 class SqsListener:
@@ -15,26 +44,232 @@ class SqsListener:
     """
 
     __listener: Optional[SqsReceiver]
-    __topic_callbacks: Dict[str, callable]
-    __all_topics: bool
+    __routes: RoutingTable
+    __executor: Optional[KeyedExecutor]
+    __idempotency_store: Optional[IdempotencyStore]
+    __route_limits: Dict[str, RouteLimit]
+    __failure_policy: FailurePolicy
+    __metrics: Metrics
+    __is_gcloud: Union[bool, object]
 
     def __init__(self, topic_callbacks: Dict[str, callable], all_topics: bool = False,
-                 listener: SqsReceiver = None):
+                 listener: SqsReceiver = None, pattern_pool: ParallelPatternSet = None,
+                 executor: KeyedExecutor = None, idempotency_store: IdempotencyStore = None,
+                 route_limits: Dict[str, RouteLimit] = None, wait_step: float = DEFAULT_WAIT_STEP,
+                 failure_policy: FailurePolicy = None, metrics: Metrics = None):
+        """
+        If a ``pattern_pool`` is given, messages are dispatched to the callbacks whose key is the key of a matching
+        pattern of the pool, instead of matching the keys against the event name. The patterns are evaluated against
+        the data passed to the callbacks, for all the received messages at once, in the processes of the pool.
+
+        Routes can be replaced while the listener is running, with ``swap_routes``.
+
+        If an ``executor`` is given, the messages of each batch are handled in its threads (see ``handle_batch``): in
+        order within a message group, and in parallel otherwise.
+
+        If an ``idempotency_store`` is given, the callbacks are not called for messages that have already been
+        processed (see ``idempotency_key``), so that redelivered messages are only deleted.
+
+        ``route_limits`` limit the rate and the concurrency of the callbacks of the given keys. A message of a route
+        over its limits waits until it can be handled, with its visibility timeout extended meanwhile, so that it is
+        neither received again by another consumer nor handled after it became visible. Since waiting messages hold
+        their thread, the listener stops receiving messages when all its threads are waiting.
+
+        A message whose callbacks fail doesn't prevent the other messages of its batch from being handled and deleted.
+        It is retried, or forwarded to a dead-letter queue, according to the ``failure_policy`` (see
+        ``FailurePolicy``).
+
+        The latency of the callbacks of each route, the number of messages being handled and the failures of the
+        callbacks are emitted to ``metrics`` (see ``sqs_mega_python_zwap.aws.metrics``), and ignored by default.
+        """
 
         self.__listener = listener
-        self.__topic_callbacks = topic_callbacks
-        self.__all_topics = all_topics
+        self.__routes = RoutingTable(topic_callbacks, all_topics, pattern_pool)
+        self.__executor = executor
+        self.__idempotency_store = idempotency_store
+        self.__route_limits = dict(route_limits or {})
+        self.__wait_step = wait_step
+        self.__failure_policy = failure_policy or FailurePolicy()
+        self.__metrics = metrics or NULL_METRICS
+        self.__is_gcloud = _UNSET
+
+    @property
+    def routes(self) -> RoutingTable:
+        return self.__routes
+
+    def swap_routes(self, routes: RoutingTable) -> RoutingTable:
+        """
+        Description: Replaces the routing table, returning the previous one. Messages that are being handled keep the
+        table they started with, and the next ones are routed with the new table
+        """
+
+        previous, self.__routes = self.__routes, routes
+        return previous
 
     @property
     def is_gcloud(self) -> bool:
+        """
+        Description: Whether the listener runs on Google Cloud, according to the Django settings. The settings are read
+        once, the first time the listener needs them, since this is checked for every message
+        """
+
+        if self.__is_gcloud is _UNSET:
+            try:
+                # Django is only needed by listeners running on Google Cloud
+                from django.conf import settings
+                self.__is_gcloud = settings.IS_GCLOUD
+            except Exception as e:
+                self.__is_gcloud = False
+        return self.__is_gcloud
+
+    def handle_message(self, message: Union[SqsMessage, dict]):
+
+        routes = self.__routes
+        data = self.message_data(message)
+        self.__dispatch(message, data, routes, routes.route_keys(data), self.__listener)
+
+    def handle_batch(self, messages: List[Union[SqsMessage, dict]], receiver: SqsReceiver = None,
+                     failed_groups: Set[str] = None) -> BatchResult:
+        """
+        Description: Handles a batch of messages, isolating the failures of each message: a message whose data can't
+        be extracted or routed, or whose callbacks raise an error, fails without failing the rest of its batch. The
+        whole batch is routed with the routing table in use when it started. If there are patterns, the patterns of all
+        the messages are evaluated at once beforehand.
+
+        The messages are handled in the executor if any, and one by one otherwise. The messages of a message group are
+        handled one by one, in order, and the messages of different groups (or without a group) in parallel. Once a
+        message of a group fails, the next messages of the group are skipped, so that they are received again in order.
+        The ``failed_groups`` of a received batch can be shared by many calls, if its messages are handled separately.
+        The visibility of throttled messages is extended with the ``receiver`` they were received with, the receiver of
+        the listener by default
+        """
+
+        routes = self.__routes
+        receiver = receiver or self.__listener
+        failed_groups = set() if failed_groups is None else failed_groups
+
+        arguments = [
+            (message, routing, routes, receiver, failed_groups)
+            for message, routing in zip(messages, self.__route_batch(messages, routes))
+        ]
+        if self.__executor is None:
+            outcomes = [self.__try_dispatch(*args) for args in arguments]
+        else:
+            futures = [
+                self.__executor.submit(message_group_id(args[0]), self.__try_dispatch, *args)
+                for args in arguments
+            ]
+            outcomes = [future.result() for future in futures]
+
+        result = BatchResult()
+        for message, outcome in zip(messages, outcomes):
+            if outcome is _HANDLED:
+                result.handled.append(message)
+            elif outcome is _SKIPPED:
+                result.skipped.append(message)
+            else:
+                result.failed.append((message, outcome))
+        return result
+
+    def __route_batch(self, messages: List[Union[SqsMessage, dict]], routes: RoutingTable) -> List[Routing]:
+
+        extracted = []
+        for message in messages:
+            try:
+                extracted.append(self.message_data(message))
+            except Exception as e:
+                extracted.append(e)
+
+        data = [message_data for message_data in extracted if not isinstance(message_data, Exception)]
+        try:
+            all_keys = iter(routes.route_all_keys(data))
+        except Exception:
+            # The message that can't be routed fails on its own, instead of failing the whole batch
+            logger.exception('Failed to route a batch of {} messages, routing them one by one'.format(len(data)))
+            all_keys = None
+
+        routings = []
+        for message_data in extracted:
+            if isinstance(message_data, Exception):
+                routings.append(message_data)
+            elif all_keys is not None:
+                routings.append((message_data, next(all_keys)))
+            else:
+                try:
+                    routings.append((message_data, routes.route_keys(message_data)))
+                except Exception as e:
+                    routings.append(e)
+        return routings
+
+    def __try_dispatch(self, message: Union[SqsMessage, dict], routing: Routing, routes: RoutingTable,
+                       receiver: Optional[SqsReceiver], failed_groups: Set[str]):
+
+        group_id = message_group_id(message)
+        if group_id is not None and group_id in failed_groups:
+            return _SKIPPED
 
         try:
-            return settings.IS_GCLOUD
+            if isinstance(routing, Exception):
+                raise routing
+            data, keys = routing
+            self.__dispatch(message, data, routes, keys, receiver)
         except Exception as e:
-            pass
-        return False
+            logger.exception('[{}] Failed to handle message'.format(getattr(message, 'message_id', None)))
+            if group_id is not None:
+                failed_groups.add(group_id)
+            return e
+        return _HANDLED
 
-    def handle_message(self, message: Union[SqsMessage, dict]):
+    def __dispatch(self, message: Union[SqsMessage, dict], data: dict, routes: RoutingTable, keys: List[str],
+                   receiver: Optional[SqsReceiver]):
+
+        store = self.__idempotency_store
+        key = idempotency_key(message) if store is not None else None
+        if key is not None and store.is_processed(key):
+            logger.info('[{}] Skipped already processed message'.format(key))
+            return
+
+        # Limits are acquired in the same order by all the threads, so that they can't wait for each other
+        limits = [self.__route_limits[route] for route in sorted(keys) if route in self.__route_limits]
+        acquired = []
+        metrics = self.__metrics
+        metrics.add(IN_FLIGHT_MESSAGES, 1)
+        try:
+            for limit in limits:
+                limit.acquire(lambda delay: self.__extend_visibility(message, receiver, delay), self.__wait_step)
+                acquired.append(limit)
+
+            for route, callback in zip(keys, routes.callbacks(keys)):
+                start = perf_counter()
+                try:
+                    callback(data)
+                except Exception:
+                    metrics.increment(ERRORS, HANDLE)
+                    raise
+                finally:
+                    metrics.observe(HANDLER_SECONDS, perf_counter() - start, (route,))
+        finally:
+            for limit in acquired:
+                limit.release()
+            metrics.add(IN_FLIGHT_MESSAGES, -1)
+
+        if key is not None:
+            store.mark_processed(key)
+
+    @staticmethod
+    def __extend_visibility(message: Union[SqsMessage, dict], receiver: Optional[SqsReceiver], delay: float):
+
+        if receiver is None or isinstance(message, dict):
+            return
+
+        # The message stays invisible while it waits, and then for as long as if it had just been received
+        visibility_timeout = math.ceil(delay) + receiver.visibility_timeout
+        try:
+            receiver.change_message_visibility(message, visibility_timeout)
+        except Exception:
+            logger.exception('[{}] Failed to extend the visibility of throttled message'.format(message.message_id))
+
+    def message_data(self, message: Union[SqsMessage, dict]) -> dict:
 
         if self.is_gcloud:
             event_name = message.get("event_name", None)
@@ -44,20 +279,11 @@ class SqsListener:
             event_name = message.payload.event.name
             event_data = message.payload.event.attributes
             publisher = message.payload.event.publisher
-        data = {
+        return {
             "event_data": event_data,
             "publisher": publisher,
             "event_name": event_name
         }
-        if self.__all_topics:
-            self.__topic_callbacks["*"](data)
-        else:
-            if event_name is not None:
-                keys = self.__topic_callbacks.keys()
-                for key in keys:
-                    check = re.search(key, event_name) is not None
-                    if check:
-                        self.__topic_callbacks[key](data)
 
     def listener(self) -> None:
         """
@@ -67,6 +293,28 @@ class SqsListener:
         if self.is_gcloud is False:
             while True:
                 messages = self.__listener.receive_messages()
-                for message in messages:
-                    self.handle_message(message)
-                    self.__listener.delete_message(message)
+                if messages:
+                    self.process_batch(messages)
+
+    def process_batch(self, messages: List[SqsMessage]) -> BatchResult:
+        """
+        Description: Handles a batch of received messages, deletes the handled ones at once, and applies the failure
+        policy to the failed ones
+        """
+
+        result = self.handle_batch(messages)
+        if result.handled:
+            self.__listener.delete_messages(result.handled)
+        if result.failed:
+            self.__failure_policy.handle_failures(result.failed, self.__listener)
+        return result
+
+
+def message_group_id(message: Union[SqsMessage, dict]) -> Optional[str]:
+    """
+    Description: Message group of a message received from a FIFO queue, or None
+    """
+
+    if isinstance(message, dict):
+        return message.get("message_group_id", None)
+    return getattr(message, "message_group_id", None)
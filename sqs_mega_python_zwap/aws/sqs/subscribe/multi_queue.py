@@ -0,0 +1,279 @@
+# IMPORTING STANDARD PACKAGES
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# IMPORTING LOCAL PACKAGES
+from sqs_mega_python_zwap.aws.metrics import Metrics
+from sqs_mega_python_zwap.aws.sqs.api import logger
+from sqs_mega_python_zwap.aws.sqs.message import SqsMessage
+from sqs_mega_python_zwap.aws.sqs.subscribe.api import SqsReceiver
+from sqs_mega_python_zwap.aws.sqs.subscribe.executor import KeyedExecutor
+from sqs_mega_python_zwap.aws.sqs.subscribe.failures import FailurePolicy
+from sqs_mega_python_zwap.aws.sqs.subscribe.idempotency import IdempotencyStore
+from sqs_mega_python_zwap.aws.sqs.subscribe.listener import SqsListener, message_group_id
+from sqs_mega_python_zwap.aws.sqs.subscribe.routing import RoutingTable
+from sqs_mega_python_zwap.aws.sqs.subscribe.throttling import RouteLimit
+from sqs_mega_python_zwap.match.parallel import ParallelPatternSet
+
+DEFAULT_MAX_WORKERS = 10
+RECEIVE_ERROR_DELAY = 1
+
+# A received message, with the message groups of its batch whose messages failed
+ReceivedMessage = Tuple[SqsMessage, Set[str]]
+
+
+class QueueSource:
+    """
+    Description: A queue consumed by a ``MultiQueueListener``, with its scheduling parameters
+
+    Messages of queues with a higher ``priority`` are always handled first. Queues with the same priority share the
+    workers in proportion to their ``weight``. At most ``max_concurrency`` messages of the queue are handled at the
+    same time, if set.
+    """
+
+    __slots__ = ('receiver', 'weight', 'priority', 'max_concurrency', 'name')
+
+    def __init__(self, receiver: SqsReceiver, weight: float = 1, priority: int = 0,
+                 max_concurrency: Optional[int] = None, name: Optional[str] = None):
+
+        if weight <= 0:
+            raise ValueError('Weight must be positive: {}'.format(weight))
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError('Max concurrency must be positive: {}'.format(max_concurrency))
+
+        self.receiver = receiver
+        self.weight = weight
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+        self.name = name or receiver.queue_url
+
+
+class _QueueState:
+    __slots__ = ('source', 'pending', 'in_flight', 'finish')
+
+    def __init__(self, source: QueueSource):
+        self.source = source
+        self.pending = deque()
+        self.in_flight = 0
+        # Virtual time at which the next message of the queue is due
+        self.finish = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.pending) and (
+            self.source.max_concurrency is None or self.in_flight < self.source.max_concurrency
+        )
+
+
+class QueueScheduler:
+    """
+    Description: Picks the next message to handle among the messages received from many queues
+
+    Queues are scheduled by priority first. Queues with the same priority are scheduled with stride scheduling: each
+    handled message moves the virtual time of its queue forward by the inverse of the queue weight, and the queue with
+    the earliest virtual time goes next. A queue which had no pending messages starts again at the current virtual
+    time, so that idle queues don't build up credit.
+
+    The scheduler is not thread-safe: ``MultiQueueListener`` calls it while holding its lock.
+    """
+
+    def __init__(self, sources: Iterable[QueueSource]):
+        self.__states: Dict[QueueSource, _QueueState] = {source: _QueueState(source) for source in sources}
+        self.__virtual_time = 0.0
+
+    def pending(self, source: QueueSource) -> int:
+        return len(self.__states[source].pending)
+
+    def in_flight(self, source: QueueSource) -> int:
+        return self.__states[source].in_flight
+
+    @property
+    def ready(self) -> bool:
+        """
+        Description: Whether a message can be handled, given the concurrency limits of the queues
+        """
+        return any(state.ready for state in self.__states.values())
+
+    def can_receive(self, source: QueueSource) -> bool:
+        """
+        Description: Whether more messages should be received from a queue: the messages received before have all been
+        scheduled, and the queue is below its concurrency limit
+        """
+        state = self.__states[source]
+        return not state.pending and (source.max_concurrency is None or state.in_flight < source.max_concurrency)
+
+    def push(self, source: QueueSource, messages: List[ReceivedMessage]):
+        state = self.__states[source]
+        if not state.pending:
+            state.finish = max(state.finish, self.__virtual_time)
+        state.pending.extend(messages)
+
+    def pop(self) -> Optional[Tuple[QueueSource, ReceivedMessage]]:
+        """
+        Description: Returns the next message to handle with its queue, or None if no message can be handled
+        """
+        selected = None
+        for state in self.__states.values():
+            if not state.ready:
+                continue
+            if selected is None or state.source.priority > selected.source.priority or (
+                    state.source.priority == selected.source.priority and state.finish < selected.finish):
+                selected = state
+
+        if selected is None:
+            return None
+
+        self.__virtual_time = selected.finish
+        selected.finish += 1 / selected.source.weight
+        selected.in_flight += 1
+        return selected.source, selected.pending.popleft()
+
+    def done(self, source: QueueSource):
+        self.__states[source].in_flight -= 1
+
+
+class MultiQueueListener:
+    """
+    Description: Listener of many queues in a single process, sharing a pool of workers
+
+    Each queue is long-polled by its own thread, which receives more messages once the previous ones have all been
+    scheduled and a worker is free. Received messages are handled by the workers in the order chosen by a
+    ``QueueScheduler``: by priority, then by weight. Messages are dispatched to the callbacks like ``SqsListener``
+    does, and are deleted once handled. Messages of the same message group of a FIFO queue are handled one by one, in
+    order (see ``KeyedExecutor``). Once a message of a group fails, the next messages of the group received with it are
+    skipped, and left to their visibility timeout.
+
+    A message whose callbacks raise an error is retried or forwarded to a dead-letter queue according to the
+    ``failure_policy`` (see ``FailurePolicy``). Messages received but not yet handled when the listener stops are left
+    to their visibility timeout.
+
+    ``route_limits`` limit the rate and the concurrency of routes, like for ``SqsListener``: throttled messages wait in
+    their worker, with their visibility extended, so that polling stops once all the workers are throttled. Metrics of
+    the callbacks are emitted to ``metrics`` like for ``SqsListener``; the metrics of the requests are emitted by the
+    receivers of the queues.
+    """
+
+    __sources: Tuple[QueueSource, ...]
+    __dispatcher: SqsListener
+
+    def __init__(self, queues: Iterable[QueueSource], topic_callbacks: Dict[str, callable], all_topics: bool = False,
+                 max_workers: int = DEFAULT_MAX_WORKERS, pattern_pool: ParallelPatternSet = None,
+                 idempotency_store: IdempotencyStore = None, route_limits: Dict[str, RouteLimit] = None,
+                 failure_policy: FailurePolicy = None, metrics: Metrics = None):
+
+        if max_workers < 1:
+            raise ValueError('Max workers must be positive: {}'.format(max_workers))
+
+        self.__sources = tuple(queues)
+        self.__dispatcher = SqsListener(
+            topic_callbacks, all_topics, pattern_pool=pattern_pool, idempotency_store=idempotency_store,
+            route_limits=route_limits, metrics=metrics
+        )
+        self.__scheduler = QueueScheduler(self.__sources)
+        self.__failure_policy = failure_policy or FailurePolicy()
+        self.__max_workers = max_workers
+        self.__free_workers = max_workers
+        self.__condition = threading.Condition()
+        self.__stopped = False
+
+    @property
+    def queues(self) -> Tuple[QueueSource, ...]:
+        return self.__sources
+
+    @property
+    def routes(self) -> RoutingTable:
+        return self.__dispatcher.routes
+
+    def swap_routes(self, routes: RoutingTable) -> RoutingTable:
+        """
+        Description: Replaces the routing table of all the queues, returning the previous one
+        """
+        return self.__dispatcher.swap_routes(routes)
+
+    def listener(self) -> None:
+        """
+        Description: Listens to all the queues until ``stop`` is called, from another thread or from a callback
+        """
+
+        if self.__dispatcher.is_gcloud:
+            return
+
+        with self.__condition:
+            self.__stopped = False
+
+        pollers = [
+            threading.Thread(target=self.__poll, args=(source,), name='sqs-poller-{}'.format(source.name), daemon=True)
+            for source in self.__sources
+        ]
+        for poller in pollers:
+            poller.start()
+
+        with KeyedExecutor(self.__max_workers, thread_name_prefix='sqs-worker') as executor:
+            while True:
+                with self.__condition:
+                    self.__condition.wait_for(lambda: self.__stopped or (
+                        self.__free_workers > 0 and self.__scheduler.ready
+                    ))
+                    if self.__stopped:
+                        break
+                    source, (message, failed_groups) = self.__scheduler.pop()
+                    self.__free_workers -= 1
+                group_id = message_group_id(message)
+                executor.submit(
+                    None if group_id is None else (source, group_id), self.__handle, source, message, failed_groups
+                )
+
+        for poller in pollers:
+            poller.join()
+
+    def stop(self) -> None:
+        """
+        Description: Stops the listener. Messages being handled are handled until the end, and pollers stop after their
+        current long poll
+        """
+
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+
+    def __poll(self, source: QueueSource):
+
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(lambda: self.__stopped or (
+                    self.__free_workers > 0 and self.__scheduler.can_receive(source)
+                ))
+                if self.__stopped:
+                    return
+
+            try:
+                messages = source.receiver.receive_messages()
+            except Exception:
+                logger.exception('[{}] Failed to receive messages'.format(source.name))
+                with self.__condition:
+                    self.__condition.wait_for(lambda: self.__stopped, timeout=RECEIVE_ERROR_DELAY)
+                continue
+
+            if messages:
+                # Once a message of a group fails, the next messages of the group in the batch are skipped
+                failed_groups = set()
+                with self.__condition:
+                    self.__scheduler.push(source, [(message, failed_groups) for message in messages])
+                    self.__condition.notify_all()
+
+    def __handle(self, source: QueueSource, message: SqsMessage, failed_groups: Set[str]):
+
+        try:
+            result = self.__dispatcher.handle_batch([message], source.receiver, failed_groups)
+            for handled in result.handled:
+                source.receiver.delete_message(handled)
+            if result.failed:
+                self.__failure_policy.handle_failures(result.failed, source.receiver)
+        except Exception:
+            logger.exception('[{}] Failed to handle message'.format(source.name))
+        finally:
+            with self.__condition:
+                self.__scheduler.done(source)
+                self.__free_workers += 1
+                self.__condition.notify_all()
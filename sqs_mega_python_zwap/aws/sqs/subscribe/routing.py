@@ -0,0 +1,120 @@
+import re
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Union
+
+from sqs_mega_python_zwap.match.parallel import ParallelPatternSet
+from sqs_mega_python_zwap.match.pattern_set import PatternSet
+
+Patterns = Union[PatternSet, ParallelPatternSet]
+
+_UNCHANGED = object()
+
+
+class RoutingTable:
+    """
+    Description: Immutable routes of a listener, from topics or patterns to callbacks
+
+    Topics are regular expressions searched in the event name, and are compiled when the table is built. If there are
+    patterns, messages are routed to the callbacks whose key is the key of a matching pattern instead. Tables are never
+    modified: changes build a new table, which can be swapped into a running listener (see
+    ``SqsListener.swap_routes``), so that routes are built off the polling loop.
+    """
+
+    __slots__ = ('topic_callbacks', 'all_topics', 'patterns', '_topics')
+
+    def __init__(self, topic_callbacks: Dict[str, callable], all_topics: bool = False,
+                 patterns: Optional[Patterns] = None):
+
+        self.topic_callbacks = MappingProxyType(dict(topic_callbacks))
+        self.all_topics = all_topics
+        self.patterns = patterns
+        self._topics = tuple(
+            (key, re.compile(key))
+            for key in self.topic_callbacks
+        ) if not all_topics and patterns is None else ()
+
+    def replace(self, topic_callbacks: Dict[str, callable] = None, all_topics: bool = None,
+                patterns: Optional[Patterns] = _UNCHANGED) -> 'RoutingTable':
+        """
+        Description: Returns a copy of the table, with the given routes replaced
+        """
+
+        return RoutingTable(
+            self.topic_callbacks if topic_callbacks is None else topic_callbacks,
+            self.all_topics if all_topics is None else all_topics,
+            self.patterns if patterns is _UNCHANGED else patterns
+        )
+
+    def with_callbacks(self, topic_callbacks: Dict[str, callable]) -> 'RoutingTable':
+        """
+        Description: Returns a copy of the table, with the given callbacks added or replaced
+        """
+
+        return self.replace(topic_callbacks={**self.topic_callbacks, **topic_callbacks})
+
+    def without_callbacks(self, keys: Iterable[str]) -> 'RoutingTable':
+        """
+        Description: Returns a copy of the table, without the callbacks of the given keys
+        """
+
+        keys = set(keys)
+        return self.replace(topic_callbacks={
+            key: callback
+            for key, callback in self.topic_callbacks.items()
+            if key not in keys
+        })
+
+    def route(self, data: dict) -> List[callable]:
+        """
+        Description: Returns the callbacks of a message, given the data passed to the callbacks
+        """
+
+        return self.callbacks(self.route_keys(data))
+
+    def route_all(self, data: List[dict]) -> List[List[callable]]:
+        """
+        Description: Returns the callbacks of many messages, evaluating the patterns of all of them at once
+        """
+
+        return [self.callbacks(keys) for keys in self.route_all_keys(data)]
+
+    def route_keys(self, data: dict) -> List[str]:
+        """
+        Description: Returns the keys of the callbacks of a message, given the data passed to the callbacks
+        """
+
+        if self.all_topics:
+            return ["*"]
+        if self.patterns is not None:
+            return self.route_all_keys([data])[0]
+
+        event_name = data["event_name"]
+        if event_name is None:
+            return []
+        return [
+            key
+            for key, topic in self._topics
+            if topic.search(event_name) is not None
+        ]
+
+    def route_all_keys(self, data: List[dict]) -> List[List[str]]:
+        """
+        Description: Returns the keys of the callbacks of many messages, evaluating the patterns of all of them at once
+        """
+
+        if self.patterns is None:
+            return [self.route_keys(message_data) for message_data in data]
+
+        if isinstance(self.patterns, ParallelPatternSet):
+            matches = self.patterns.matches(data)
+        else:
+            matches = [self.patterns.matches(message_data) for message_data in data]
+
+        return [
+            [key for key in keys if key in self.topic_callbacks]
+            for keys in matches
+        ]
+
+    def callbacks(self, keys: List[str]) -> List[callable]:
+
+        return [self.topic_callbacks[key] for key in keys]
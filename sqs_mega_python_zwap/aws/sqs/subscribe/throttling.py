@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Callable, Optional
+
+DEFAULT_WAIT_STEP = 5
+
+
+class TokenBucket:
+    """
+    Description: Token bucket refilled with ``rate`` tokens per second, holding at most ``burst`` tokens
+
+    Tokens are reserved rather than waited for: a reservation always takes a token, and returns how long to wait
+    before using it. Concurrent callers are served in the order of their reservations.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+
+        if rate <= 0:
+            raise ValueError('Rate must be positive: {}'.format(rate))
+
+        self.rate = rate
+        self.burst = max(rate, 1) if burst is None else burst
+        if self.burst < 1:
+            raise ValueError('Burst must be at least 1: {}'.format(burst))
+
+        self.__clock = clock
+        self.__tokens = self.burst
+        self.__updated = clock()
+        self.__lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Description: Takes a token, returning the number of seconds to wait before it is available
+        """
+
+        with self.__lock:
+            now = self.__clock()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            self.__tokens -= 1
+            return 0.0 if self.__tokens >= 0 else -self.__tokens / self.rate
+
+
+class RouteLimit:
+    """
+    Description: Limits of the messages handled by a route: at most ``rate`` messages per second (with bursts of
+    ``burst`` messages), and at most ``max_concurrency`` messages at the same time
+
+    Limits are shared by all the threads of a listener, and can be shared by many listeners.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None,
+                 max_concurrency: Optional[int] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError('Max concurrency must be positive: {}'.format(max_concurrency))
+
+        self.bucket = None if rate is None else TokenBucket(rate, burst, clock)
+        self.max_concurrency = max_concurrency
+        self.__slots = None if max_concurrency is None else threading.BoundedSemaphore(max_concurrency)
+        self.__sleep = sleep
+
+    def acquire(self, on_wait: Callable[[float], None], wait_step: float = DEFAULT_WAIT_STEP):
+        """
+        Description: Waits until a message can be handled. ``on_wait`` is called with the expected waiting time before
+        each wait, so that the message can be kept invisible meanwhile. Waiting for a free slot is expected to take
+        ``wait_step`` seconds at a time
+        """
+
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+            if delay > 0:
+                on_wait(delay)
+                self.__sleep(delay)
+
+        if self.__slots is not None and not self.__slots.acquire(blocking=False):
+            on_wait(wait_step)
+            while not self.__slots.acquire(timeout=wait_step):
+                on_wait(wait_step)
+
+    def release(self):
+
+        if self.__slots is not None:
+            self.__slots.release()
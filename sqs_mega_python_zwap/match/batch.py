@@ -0,0 +1,296 @@
+from datetime import datetime
+from typing import Sequence, List, Optional
+
+import numpy
+
+from sqs_mega_python_zwap.match.functions.and_ import And
+from sqs_mega_python_zwap.match.functions.eq import Equal
+from sqs_mega_python_zwap.match.functions.gt import GreaterThan
+from sqs_mega_python_zwap.match.functions.gte import GreaterThanOrEqual
+from sqs_mega_python_zwap.match.functions.identity import identity
+from sqs_mega_python_zwap.match.functions.in_ import In
+from sqs_mega_python_zwap.match.functions.lt import LessThan
+from sqs_mega_python_zwap.match.functions.lte import LessThanOrEqual
+from sqs_mega_python_zwap.match.functions.match import Match
+from sqs_mega_python_zwap.match.functions.not_ import Not
+from sqs_mega_python_zwap.match.functions.or_ import Or
+from sqs_mega_python_zwap.match.functions.value import ValueFunction
+from sqs_mega_python_zwap.match.types import ValueType, RightHandSideType, RightHandSideFunction, is_string, \
+    is_mapping
+from sqs_mega_python_zwap.match.values import Mapping, Number, DateTime, String, Boolean, Null, Collection
+from sqs_mega_python_zwap.match.values.datetime import UTC, parse_iso_string
+
+# Integers beyond this magnitude can't be represented exactly as 64-bit floats
+MAX_EXACT_INTEGER = 2 ** 53
+
+
+def evaluate_batch(lhs_values: Sequence[ValueType], rhs: RightHandSideType, indices: bool = False) -> numpy.ndarray:
+    """
+    Evaluates a pattern against many left-hand side values at once, with the same result as evaluating each value on
+    its own. Mappings are evaluated key by key, over columns holding the values of each key. Equality, comparisons,
+    ``in_``, ``and_``, ``or_`` and ``not_`` are computed as vectorized masks over those columns. Lambdas, regular
+    expressions and values that need casting are evaluated row by row.
+
+    Returns a boolean mask with one item per left-hand side value, or the indices of the matching values if
+    ``indices`` is set.
+    """
+    column = list(lhs_values)
+    mask = _evaluate_column(column, identity(rhs))
+    return numpy.flatnonzero(mask) if indices else mask
+
+
+def _evaluate_column(column: List[ValueType], function: RightHandSideFunction) -> numpy.ndarray:
+    if not column:
+        return numpy.zeros(0, dtype=bool)
+
+    if isinstance(function, And):
+        return _evaluate_and(column, function.rhs)
+
+    if isinstance(function, Or):
+        return _evaluate_or(column, function.rhs)
+
+    if isinstance(function, Not):
+        return ~_evaluate_column(column, function.rhs)
+
+    if isinstance(function, ValueFunction):
+        mask = _evaluate_value_function(column, function)
+        if mask is not None:
+            return mask
+
+    return _evaluate_rows(column, function)
+
+
+def _evaluate_rows(column: List[ValueType], function: RightHandSideFunction) -> numpy.ndarray:
+    return numpy.fromiter(
+        (function.evaluate(lhs) for lhs in column),
+        dtype=bool, count=len(column)
+    )
+
+
+def _take(column: List[ValueType], rows: numpy.ndarray) -> List[ValueType]:
+    if len(rows) == len(column):
+        return column
+    return [column[i] for i in rows]
+
+
+def _evaluate_and(column: List[ValueType], functions: List[RightHandSideFunction]) -> numpy.ndarray:
+    # Each function is only evaluated on the rows that passed the previous ones, like a short-circuit evaluation would
+    mask = numpy.ones(len(column), dtype=bool)
+    rows = numpy.arange(len(column))
+
+    for function in functions:
+        result = _evaluate_column(_take(column, rows), function)
+        mask[rows[~result]] = False
+        rows = rows[result]
+        if not len(rows):
+            break
+
+    return mask
+
+
+def _evaluate_or(column: List[ValueType], functions: List[RightHandSideFunction]) -> numpy.ndarray:
+    mask = numpy.zeros(len(column), dtype=bool)
+    rows = numpy.arange(len(column))
+
+    for function in functions:
+        result = _evaluate_column(_take(column, rows), function)
+        mask[rows[result]] = True
+        rows = rows[~result]
+        if not len(rows):
+            break
+
+    return mask
+
+
+def _evaluate_value_function(column: List[ValueType], function: ValueFunction) -> Optional[numpy.ndarray]:
+    value = function.rhs
+    value_type = type(value)
+    function_type = type(function)
+
+    if value_type is Mapping and function_type in (Equal, Match):
+        return _evaluate_mapping(column, value)
+    if value_type is Number:
+        return _evaluate_number(column, function)
+    if value_type is DateTime:
+        return _evaluate_datetime(column, function)
+    if value_type in (String, Boolean, Null) and function_type is Equal:
+        return _evaluate_scalar_equal(column, value)
+    if value_type is Collection and function_type is In:
+        return _evaluate_contains(column, value)
+
+    return None
+
+
+def _evaluate_mapping(column: List[ValueType], value: Mapping) -> Optional[numpy.ndarray]:
+    mask = numpy.ones(len(column), dtype=bool)
+    rows = []
+
+    for i, lhs in enumerate(column):
+        if lhs is None:
+            mask[i] = not value.rhs
+        elif is_mapping(lhs):
+            rows.append(i)
+        else:
+            return None
+
+    rows = numpy.array(rows, dtype=int)
+
+    for key, item in value.rhs.items():
+        if not len(rows):
+            break
+
+        has_key = numpy.fromiter((key in column[i] for i in rows), dtype=bool, count=len(rows))
+        present = rows[has_key]
+        if not len(present):
+            continue
+
+        result = _evaluate_column([column[i][key] for i in present], identity(item))
+        mask[present[~result]] = False
+
+        keep = numpy.ones(len(rows), dtype=bool)
+        keep[numpy.flatnonzero(has_key)[~result]] = False
+        rows = rows[keep]
+
+    return mask
+
+
+def _compare(lhs: numpy.ndarray, rhs, function: ValueFunction) -> Optional[numpy.ndarray]:
+    # Mirrors ComparableValue, so that NaN values compare the same way
+    function_type = type(function)
+
+    if function_type in (Equal, Match):
+        return lhs == rhs
+    if function_type is LessThan:
+        return lhs < rhs
+    if function_type is LessThanOrEqual:
+        return (lhs < rhs) | (lhs == rhs)
+    if function_type is GreaterThan:
+        return ~((lhs < rhs) | (lhs == rhs))
+    if function_type is GreaterThanOrEqual:
+        return ~(lhs < rhs)
+
+    return None
+
+
+def _is_exact_float(number) -> bool:
+    number_type = type(number)
+    return number_type is float or (number_type is int and -MAX_EXACT_INTEGER <= number <= MAX_EXACT_INTEGER)
+
+
+def _compare_with_nulls(
+        values: numpy.ndarray, nulls: numpy.ndarray, rhs, function: ValueFunction
+) -> Optional[numpy.ndarray]:
+    if nulls.any():
+        # Null left-hand sides are only accepted by equal/match, and never equal to a number or datetime
+        if type(function) not in (Equal, Match):
+            return None
+        return _compare(values, rhs, function) & ~nulls
+
+    return _compare(values, rhs, function)
+
+
+def _evaluate_number(column: List[ValueType], function: ValueFunction) -> Optional[numpy.ndarray]:
+    rhs = function.rhs.rhs
+    if not _is_exact_float(rhs):
+        return None
+
+    values = numpy.zeros(len(column), dtype=float)
+    nulls = numpy.zeros(len(column), dtype=bool)
+
+    for i, lhs in enumerate(column):
+        if lhs is None:
+            nulls[i] = True
+        elif _is_exact_float(lhs):
+            values[i] = lhs
+        else:
+            return None
+
+    return _compare_with_nulls(values, nulls, rhs, function)
+
+
+def _timestamp(dt: datetime) -> float:
+    return dt.replace(microsecond=0, tzinfo=dt.tzinfo or UTC).timestamp()
+
+
+def _evaluate_datetime(column: List[ValueType], function: ValueFunction) -> Optional[numpy.ndarray]:
+    rhs = function.rhs.rhs
+    if type(rhs) is not datetime:
+        return None
+
+    values = numpy.zeros(len(column), dtype=float)
+    nulls = numpy.zeros(len(column), dtype=bool)
+
+    for i, lhs in enumerate(column):
+        if lhs is None:
+            nulls[i] = True
+            continue
+
+        if is_string(lhs):
+            lhs = parse_iso_string(lhs)
+        if type(lhs) is not datetime:
+            # Dates are compared by their date component only
+            return None
+
+        values[i] = _timestamp(lhs)
+
+    return _compare_with_nulls(values, nulls, _timestamp(rhs), function)
+
+
+def _object_array(column: List[ValueType]) -> numpy.ndarray:
+    array = numpy.empty(len(column), dtype=object)
+    array[:] = column
+    return array
+
+
+def _evaluate_scalar_equal(column: List[ValueType], value) -> Optional[numpy.ndarray]:
+    if type(value) is Null:
+        return numpy.fromiter((lhs is None for lhs in column), dtype=bool, count=len(column))
+
+    accepts_rhs = type(value).accepts_rhs
+    nulls = numpy.zeros(len(column), dtype=bool)
+
+    for i, lhs in enumerate(column):
+        if lhs is None:
+            nulls[i] = True
+        elif not accepts_rhs(lhs):
+            return None
+
+    mask = numpy.asarray(_object_array(column) == value.rhs, dtype=bool)
+    if nulls.any():
+        # A null left-hand side is equal to an empty string, but never to a boolean
+        mask[nulls] = type(value) is String and not value.rhs
+
+    return mask
+
+
+def _evaluate_contains(column: List[ValueType], value: Collection) -> Optional[numpy.ndarray]:
+    scalars = value.scalars
+    if value.has_patterns or scalars.booleans:
+        return None
+
+    nulls = numpy.zeros(len(column), dtype=bool)
+
+    if scalars.strings and not scalars.numbers:
+        for i, lhs in enumerate(column):
+            if lhs is None:
+                nulls[i] = True
+            elif not is_string(lhs):
+                return None
+        mask = numpy.fromiter((lhs in scalars.strings for lhs in column), dtype=bool, count=len(column))
+
+    elif scalars.numbers and not scalars.strings and all(_is_exact_float(i) for i in scalars.numbers):
+        values = numpy.zeros(len(column), dtype=float)
+        for i, lhs in enumerate(column):
+            if lhs is None:
+                nulls[i] = True
+            elif _is_exact_float(lhs):
+                values[i] = lhs
+            else:
+                return None
+        mask = numpy.isin(values, list(scalars.numbers))
+
+    else:
+        return None
+
+    mask[nulls] = scalars.has_null or '' in scalars.strings
+    return mask
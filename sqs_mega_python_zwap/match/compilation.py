@@ -0,0 +1,82 @@
+from sqs_mega_python_zwap.match.functions.adaptive import AdaptiveAnd, AdaptiveOr
+from sqs_mega_python_zwap.match.functions.and_ import And
+from sqs_mega_python_zwap.match.functions.identity import identity
+from sqs_mega_python_zwap.match.functions.instrumented import InstrumentedFunction
+from sqs_mega_python_zwap.match.functions.not_ import Not
+from sqs_mega_python_zwap.match.functions.or_ import Or
+from sqs_mega_python_zwap.match.functions.value import ValueFunction
+from sqs_mega_python_zwap.match.types import RightHandSideType, RightHandSideFunction, is_scalar
+from sqs_mega_python_zwap.match.values import Collection, Mapping
+
+
+def compile_pattern(rhs: RightHandSideType, instrument: bool = False) -> RightHandSideFunction:
+    """
+    Builds an optimized copy of a pattern, to be evaluated many times. Nested ``and_``/``or_`` functions are flattened,
+    and replaced by adaptive functions that evaluate the cheapest and most selective functions first. Patterns nested
+    inside mappings and collections are compiled too.
+
+    The functions of a compiled pattern may not be evaluated in declaration order, so they should be free of side
+    effects.
+
+    If ``instrument`` is set, every function of the compiled pattern is wrapped by an ``InstrumentedFunction`` that
+    records evaluation statistics. See ``sqs_mega_python_zwap.match.instrumentation`` for reports.
+    """
+    return _Compiler(instrument).compile(identity(rhs))
+
+
+class _Compiler:
+    def __init__(self, instrument: bool):
+        self.instrument = instrument
+
+    def compile(self, function: RightHandSideFunction) -> RightHandSideFunction:
+        compiled = self._compile(function)
+        if self.instrument:
+            return InstrumentedFunction(compiled)
+        return compiled
+
+    def _compile(self, function: RightHandSideFunction) -> RightHandSideFunction:
+        if isinstance(function, And):
+            return AdaptiveAnd([self.compile(i) for i in _flatten(function, And)])
+
+        if isinstance(function, Or):
+            return AdaptiveOr([self.compile(i) for i in _flatten(function, Or)])
+
+        if isinstance(function, Not):
+            return Not(self.compile(function.rhs))
+
+        if isinstance(function, ValueFunction):
+            return self._compile_value_function(function)
+
+        return function
+
+    def _compile_value_function(self, function: ValueFunction) -> ValueFunction:
+        value = function.rhs
+
+        if type(value) is Mapping:
+            return type(function)(Mapping({
+                key: self.compile(identity(item))
+                for key, item in value.rhs.items()
+            }))
+
+        if type(value) is Collection and value.has_patterns:
+            return type(function)(Collection([
+                self._compile_item(item)
+                for item in value.rhs
+            ]))
+
+        return function
+
+    def _compile_item(self, rhs: RightHandSideType) -> RightHandSideType:
+        # Plain scalars are kept as they are, so that collections can still look them up in hash sets
+        if is_scalar(rhs):
+            return rhs
+        return self.compile(identity(rhs))
+
+
+def _flatten(function, function_type):
+    for i in function.rhs:
+        if isinstance(i, function_type):
+            yield from _flatten(i, function_type)
+        else:
+            yield i
+
@@ -4,3 +4,11 @@ from sqs_mega_python_zwap.match.types import ValueType, RightHandSideType
 
 def evaluate(lhs: ValueType, rhs: RightHandSideType) -> bool:
     return identity(rhs).evaluate(lhs)
+
+
+def evaluate_result(lhs: ValueType, rhs: RightHandSideType) -> str:
+    """
+    Evaluates without raising on incompatible types. Returns one of ``MatchResult.MATCH``, ``MatchResult.NO_MATCH`` or
+    ``MatchResult.TYPE_MISMATCH``; ``evaluate`` can then be used to validate the pattern and get a detailed error.
+    """
+    return identity(rhs).evaluate_result(lhs)
@@ -0,0 +1,81 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Hashable, Optional
+
+from sqs_mega_python_zwap.match.functions.higher_order import CombinedFunction, HigherOrderFunction
+from sqs_mega_python_zwap.match.functions.value import ValueFunction
+from sqs_mega_python_zwap.match.paths import MISSING, NULL, NOT_MAPPING
+from sqs_mega_python_zwap.match.types import RightHandSideType, RightHandSideFunction, RightHandSideValue, \
+    ValueType, is_function
+from sqs_mega_python_zwap.match.values import Collection, Mapping
+
+_SCALAR_TYPES = (str, int, float, Decimal, bool, type(None))
+_MARKERS = (MISSING, NULL, NOT_MAPPING)
+
+
+class _Unhashable(Exception):
+    pass
+
+
+def fingerprint(lhs: ValueType) -> Optional[Hashable]:
+    """
+    Returns a hashable key of a left-hand side value, such that values with equal keys are evaluated the same way by
+    any pattern. Types are part of the key, since equal values of different types (like ``1`` and ``True``) are not
+    evaluated the same way. Returns None if the value is not made of JSON types, dates and datetimes.
+    """
+    try:
+        return _fingerprint(lhs)
+    except _Unhashable:
+        return None
+
+
+def _fingerprint(lhs) -> Hashable:
+    lhs_type = type(lhs)
+
+    if lhs_type in _SCALAR_TYPES:
+        return lhs_type, lhs
+    if lhs_type is datetime or lhs_type is date:
+        # Equal datetimes in different timezones don't have the same date
+        return lhs_type, lhs.isoformat()
+    if lhs_type is dict:
+        return dict, frozenset((_fingerprint(key), _fingerprint(item)) for key, item in lhs.items())
+    if lhs_type is list or lhs_type is tuple:
+        return lhs_type, tuple(_fingerprint(item) for item in lhs)
+    if lhs in _MARKERS:
+        return lhs
+
+    raise _Unhashable
+
+
+def is_deterministic(rhs: RightHandSideType) -> bool:
+    """
+    Whether the result of a pattern only depends on the evaluated value. Patterns containing lambdas, or functions that
+    are not part of the pattern language, may not be.
+    """
+    if isinstance(rhs, RightHandSideFunction):
+        return _is_deterministic_function(rhs)
+    if isinstance(rhs, RightHandSideValue):
+        return _is_deterministic_value(rhs)
+    if is_function(rhs):
+        return False
+    if type(rhs) is dict:
+        return all(is_deterministic(item) for item in rhs.values())
+    if type(rhs) in (list, tuple, set):
+        return all(is_deterministic(item) for item in rhs)
+    return True
+
+
+def _is_deterministic_function(function: RightHandSideFunction) -> bool:
+    if isinstance(function, ValueFunction):
+        return _is_deterministic_value(function.rhs)
+    if isinstance(function, CombinedFunction):
+        return all(_is_deterministic_function(i) for i in function.rhs)
+    if isinstance(function, HigherOrderFunction):
+        return _is_deterministic_function(function.rhs)
+    return False
+
+
+def _is_deterministic_value(value: RightHandSideValue) -> bool:
+    if type(value) is Mapping or type(value) is Collection:
+        return is_deterministic(value.rhs)
+    return True
@@ -0,0 +1,125 @@
+from abc import ABC, abstractmethod
+from typing import Collection
+
+from sqs_mega_python_zwap.match.functions.and_ import And
+from sqs_mega_python_zwap.match.functions.cost import estimate_cost
+from sqs_mega_python_zwap.match.functions.higher_order import CombinedFunction
+from sqs_mega_python_zwap.match.functions.or_ import Or
+from sqs_mega_python_zwap.match.types import ValueType, RightHandSideFunctionType, MatchResult
+
+DEFAULT_REORDER_INTERVAL = 256
+
+
+class AdaptiveCombinedFunction(CombinedFunction, ABC):
+    """
+    Evaluates the combined functions in the order that is expected to short-circuit first at the lowest cost. The
+    initial order is given by the estimated cost of each function, and is adjusted every ``reorder_interval``
+    evaluations using the observed pass rates.
+
+    Functions must be free of side effects, since they are not evaluated in declaration order, and may be evaluated
+    twice: once a function raises or returns ``MatchResult.TYPE_MISMATCH``, the functions are evaluated again in
+    declaration order, like ``and_`` and ``or_`` do. Whenever ``and_`` and ``or_`` would evaluate without raising or
+    mismatching, the result is the same. Otherwise, a result may still be returned where declaration order would have
+    raised or mismatched at a function that was skipped.
+
+    The statistics are updated without locking, so that a function can be shared by threads at no cost: concurrent
+    updates may be lost, which only delays or skews reordering.
+    """
+
+    __slots__ = ('reorder_interval', 'costs', 'evaluations', 'passes', '_calls', '_order')
+
+    def __init__(
+            self,
+            rhs: Collection[RightHandSideFunctionType],
+            reorder_interval: int = DEFAULT_REORDER_INTERVAL
+    ):
+        super().__init__(rhs)
+        self.reorder_interval = reorder_interval
+        self.costs = [estimate_cost(i) for i in self.rhs]
+        self.evaluations = [0] * len(self.rhs)
+        self.passes = [0] * len(self.rhs)
+        self._calls = 0
+        self._order = tuple(sorted(range(len(self.rhs)), key=lambda i: self.costs[i]))
+
+    @property
+    def order(self) -> tuple:
+        return self._order
+
+    @abstractmethod
+    def _short_circuit_rate(self, evaluations: int, passes: int) -> float:
+        pass
+
+    def _reorder(self):
+        def expected_cost(i):
+            # Passes are capped, since a lost update may leave more passes than evaluations. Laplace smoothing, so
+            # that functions that have not been evaluated yet are not discarded, and no rate is zero.
+            evaluations = self.evaluations[i]
+            passes = min(self.passes[i], evaluations)
+            rate = self._short_circuit_rate(evaluations + 2, passes + 1)
+            return self.costs[i] / rate
+
+        self._order = tuple(sorted(self._order, key=expected_cost))
+
+    def _next_order(self) -> tuple:
+        self._calls += 1
+        if self._calls % self.reorder_interval == 0:
+            self._reorder()
+        return self._order
+
+
+class AdaptiveAnd(AdaptiveCombinedFunction, And):
+    __slots__ = ()
+
+    def _short_circuit_rate(self, evaluations: int, passes: int) -> float:
+        return (evaluations - passes) / evaluations
+
+    def evaluate(self, lhs: ValueType) -> bool:
+        try:
+            for i in self._next_order():
+                self.evaluations[i] += 1
+                if not self.rhs[i].evaluate(lhs):
+                    return False
+                self.passes[i] += 1
+            return True
+        except Exception:
+            return super().evaluate(lhs)
+
+    def evaluate_result(self, lhs: ValueType) -> str:
+        for i in self._next_order():
+            self.evaluations[i] += 1
+            result = self.rhs[i].evaluate_result(lhs)
+            if result is MatchResult.TYPE_MISMATCH:
+                return super().evaluate_result(lhs)
+            if result is not MatchResult.MATCH:
+                return result
+            self.passes[i] += 1
+        return MatchResult.MATCH
+
+
+class AdaptiveOr(AdaptiveCombinedFunction, Or):
+    __slots__ = ()
+
+    def _short_circuit_rate(self, evaluations: int, passes: int) -> float:
+        return passes / evaluations
+
+    def evaluate(self, lhs: ValueType) -> bool:
+        try:
+            for i in self._next_order():
+                self.evaluations[i] += 1
+                if self.rhs[i].evaluate(lhs):
+                    self.passes[i] += 1
+                    return True
+            return False
+        except Exception:
+            return super().evaluate(lhs)
+
+    def evaluate_result(self, lhs: ValueType) -> str:
+        for i in self._next_order():
+            self.evaluations[i] += 1
+            result = self.rhs[i].evaluate_result(lhs)
+            if result is MatchResult.TYPE_MISMATCH:
+                return super().evaluate_result(lhs)
+            if result is MatchResult.MATCH:
+                self.passes[i] += 1
+                return result
+        return MatchResult.NO_MATCH
@@ -1,14 +1,23 @@
 from sqs_mega_python_zwap.match.functions.higher_order import CombinedFunction
-from sqs_mega_python_zwap.match.types import ValueType
+from sqs_mega_python_zwap.match.types import ValueType, MatchResult
 
 
 class And(CombinedFunction):
+    __slots__ = ()
+
     def evaluate(self, lhs: ValueType) -> bool:
         return all(
             i.evaluate(lhs)
             for i in self.rhs
         )
 
+    def evaluate_result(self, lhs: ValueType) -> str:
+        for i in self.rhs:
+            result = i.evaluate_result(lhs)
+            if result is not MatchResult.MATCH:
+                return result
+        return MatchResult.MATCH
+
 
 def and_(*rhs) -> And:
     return And(rhs)
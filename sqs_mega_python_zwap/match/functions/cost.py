@@ -0,0 +1,48 @@
+from sqs_mega_python_zwap.match.functions.higher_order import CombinedFunction, HigherOrderFunction
+from sqs_mega_python_zwap.match.functions.lambda_ import Lambda
+from sqs_mega_python_zwap.match.functions.match import Match
+from sqs_mega_python_zwap.match.functions.value import ValueFunction, CollectionFunction
+from sqs_mega_python_zwap.match.types import RightHandSideFunction
+from sqs_mega_python_zwap.match.values import String, DateTime, Collection, Mapping
+
+#
+# Relative cost estimates, in units of a plain scalar comparison
+#
+SCALAR_COST = 1.0
+CONTAINS_COST = 1.5
+REGEX_COST = 4.0
+DATETIME_COST = 4.0
+LAMBDA_COST = 8.0
+NESTED_COST = 10.0
+
+
+def estimate_cost(function: RightHandSideFunction) -> float:
+    if isinstance(function, CombinedFunction):
+        return sum(estimate_cost(i) for i in function.rhs)
+
+    if isinstance(function, HigherOrderFunction):
+        return estimate_cost(function.rhs)
+
+    if isinstance(function, Lambda):
+        return LAMBDA_COST
+
+    if isinstance(function, ValueFunction):
+        return _estimate_value_function_cost(function)
+
+    return SCALAR_COST
+
+
+def _estimate_value_function_cost(function: ValueFunction) -> float:
+    value = function.rhs
+
+    if isinstance(function, CollectionFunction):
+        # Plain scalar items are looked up by value, so only the patterns add to the cost
+        return CONTAINS_COST + len(value.rhs) * value.has_patterns
+    if isinstance(value, (Collection, Mapping)):
+        return NESTED_COST + len(value.rhs)
+    if isinstance(value, DateTime):
+        return DATETIME_COST
+    if isinstance(value, String) and isinstance(function, Match):
+        return REGEX_COST
+
+    return SCALAR_COST
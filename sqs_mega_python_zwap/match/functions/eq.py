@@ -1,8 +1,13 @@
 from sqs_mega_python_zwap.match.functions.value import ValueFunction
 from sqs_mega_python_zwap.match.types import ValueType
+from sqs_mega_python_zwap.match.values.value import Value
 
 
 class Equal(ValueFunction):
+    __slots__ = ()
+
+    function_type = Value.FunctionType.EQUAL
+
     def evaluate(self, lhs: ValueType) -> bool:
         return self.rhs.equal(lhs)
 
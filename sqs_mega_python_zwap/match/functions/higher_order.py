@@ -16,6 +16,8 @@ def function(rhs):
 
 
 class CombinedFunction(RightHandSideFunction, ABC):
+    __slots__ = ('rhs',)
+
     def __init__(self, rhs: Collection[RightHandSideFunctionType]):
         if len(rhs) < 2:
             raise ValueError
@@ -27,5 +29,7 @@ class CombinedFunction(RightHandSideFunction, ABC):
 
 
 class HigherOrderFunction(RightHandSideFunction, ABC):
+    __slots__ = ('rhs',)
+
     def __init__(self, rhs: RightHandSideFunctionType):
         self.rhs = function(rhs)
@@ -1,8 +1,13 @@
 from sqs_mega_python_zwap.match.functions.value import CollectionFunction
 from sqs_mega_python_zwap.match.types import ValueType
+from sqs_mega_python_zwap.match.values.collection import Collection
 
 
 class In(CollectionFunction):
+    __slots__ = ()
+
+    function_type = Collection.FunctionType.CONTAINS
+
     def evaluate(self, lhs: ValueType) -> bool:
         return self.rhs.contains(lhs)
 
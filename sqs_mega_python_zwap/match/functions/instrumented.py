@@ -0,0 +1,70 @@
+import time
+
+from sqs_mega_python_zwap.match.functions.higher_order import HigherOrderFunction
+from sqs_mega_python_zwap.match.types import ValueType, RightHandSideFunctionType, MatchResult
+from sqs_mega_python_zwap.match.values.value import LeftHandSideTypeError
+
+
+class FunctionStats:
+    __slots__ = ('calls', 'hits', 'misses', 'errors', 'seconds')
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.calls if self.calls else 0.0
+
+
+class InstrumentedFunction(HigherOrderFunction):
+    """
+    Evaluates the wrapped function, recording the number of evaluations, their results, the incompatible left-hand side
+    errors, and the cumulative time spent in the function (including nested functions).
+    """
+
+    __slots__ = ('stats',)
+
+    def __init__(self, rhs: RightHandSideFunctionType):
+        super().__init__(rhs)
+        self.stats = FunctionStats()
+
+    def evaluate(self, lhs: ValueType) -> bool:
+        stats = self.stats
+        stats.calls += 1
+        start = time.perf_counter()
+
+        try:
+            result = self.rhs.evaluate(lhs)
+        except LeftHandSideTypeError:
+            stats.errors += 1
+            raise
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+        if result:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+        return result
+
+    def evaluate_result(self, lhs: ValueType) -> str:
+        stats = self.stats
+        stats.calls += 1
+        start = time.perf_counter()
+
+        try:
+            result = self.rhs.evaluate_result(lhs)
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+        if result is MatchResult.MATCH:
+            stats.hits += 1
+        elif result is MatchResult.NO_MATCH:
+            stats.misses += 1
+        else:
+            stats.errors += 1
+        return result
@@ -2,6 +2,8 @@ from sqs_mega_python_zwap.match.types import ValueType, FunctionType, is_functio
 
 
 class Lambda(RightHandSideFunction):
+    __slots__ = ('rhs',)
+
     def __init__(self, rhs: FunctionType):
         if not is_function(rhs):
             raise TypeError('Right-hand side is not a user-defined function: {}'.format(type(rhs).__name__))
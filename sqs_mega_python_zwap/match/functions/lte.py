@@ -1,8 +1,13 @@
 from sqs_mega_python_zwap.match.functions.value import ComparisonFunction
 from sqs_mega_python_zwap.match.types import ValueType
+from sqs_mega_python_zwap.match.values.value import ComparableValue
 
 
 class LessThanOrEqual(ComparisonFunction):
+    __slots__ = ()
+
+    function_type = ComparableValue.FunctionType.LESS_THAN_OR_EQUAL
+
     def evaluate(self, lhs: ValueType) -> bool:
         return self.rhs.less_than_or_equal(lhs)
 
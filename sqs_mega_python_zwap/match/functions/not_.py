@@ -1,9 +1,10 @@
 from sqs_mega_python_zwap.match.functions.higher_order import HigherOrderFunction
 from sqs_mega_python_zwap.match.functions.identity import identity
-from sqs_mega_python_zwap.match.types import ValueType, RightHandSideType
+from sqs_mega_python_zwap.match.types import ValueType, RightHandSideType, MatchResult
 
 
 class Not(HigherOrderFunction):
+    __slots__ = ()
 
     def __init__(self, rhs: RightHandSideType):
         super().__init__(identity(rhs))
@@ -11,6 +12,12 @@ class Not(HigherOrderFunction):
     def evaluate(self, lhs: ValueType) -> bool:
         return not self.rhs.evaluate(lhs)
 
+    def evaluate_result(self, lhs: ValueType) -> str:
+        result = self.rhs.evaluate_result(lhs)
+        if result is MatchResult.TYPE_MISMATCH:
+            return result
+        return MatchResult.of(result is MatchResult.NO_MATCH)
+
 
 def not_(rhs) -> Not:
     return Not(rhs)
@@ -1,14 +1,23 @@
 from sqs_mega_python_zwap.match.functions import CombinedFunction
-from sqs_mega_python_zwap.match.types import ValueType
+from sqs_mega_python_zwap.match.types import ValueType, MatchResult
 
 
 class Or(CombinedFunction):
+    __slots__ = ()
+
     def evaluate(self, lhs: ValueType) -> bool:
         return any(
             i.evaluate(lhs)
             for i in self.rhs
         )
 
+    def evaluate_result(self, lhs: ValueType) -> str:
+        for i in self.rhs:
+            result = i.evaluate_result(lhs)
+            if result is not MatchResult.NO_MATCH:
+                return result
+        return MatchResult.NO_MATCH
+
 
 def or_(*rhs) -> Or:
     return Or(rhs)
@@ -1,22 +1,34 @@
 from abc import ABC
 
 from sqs_mega_python_zwap.match.types import RightHandSideValueType, ComparableRightHandSideValueType, CollectionRightHandSideValueType, \
-    RightHandSideFunction
+    RightHandSideFunction, ValueType
 from sqs_mega_python_zwap.match.values.build import value, comparable_value, collection_value
 
 
 class ValueFunction(RightHandSideFunction, ABC):
+    __slots__ = ('rhs',)
+
+    # Name of the right-hand side value method applied by the function
+    function_type = None
+
     def __init__(self, rhs: RightHandSideValueType):
         self.rhs = value(rhs)
 
+    def evaluate_result(self, lhs: ValueType) -> str:
+        return self.rhs.evaluate_result(lhs, self.function_type)
+
 
 class ComparisonFunction(ValueFunction, ABC):
+    __slots__ = ()
+
     def __init__(self, rhs: ComparableRightHandSideValueType):
         super().__init__(rhs)
         self.rhs = comparable_value(self.rhs)
 
 
 class CollectionFunction(ValueFunction, ABC):
+    __slots__ = ()
+
     def __init__(self, rhs: CollectionRightHandSideValueType):
         super().__init__(rhs)
         self.rhs = collection_value(self.rhs)
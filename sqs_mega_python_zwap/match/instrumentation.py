@@ -0,0 +1,130 @@
+from typing import Iterator, List, Tuple, Optional, Dict
+
+from sqs_mega_python_zwap.match.functions.higher_order import CombinedFunction, HigherOrderFunction
+from sqs_mega_python_zwap.match.functions.instrumented import InstrumentedFunction, FunctionStats
+from sqs_mega_python_zwap.match.functions.lambda_ import Lambda
+from sqs_mega_python_zwap.match.functions.value import ValueFunction
+from sqs_mega_python_zwap.match.types import RightHandSideFunction, is_scalar
+from sqs_mega_python_zwap.match.values import Collection, Mapping
+
+DEFAULT_METRIC_PREFIX = 'sqs_mega_match'
+
+_METRICS = (
+    ('calls_total', 'Number of evaluations of the pattern node', lambda s: s.calls),
+    ('hits_total', 'Number of evaluations that returned true', lambda s: s.hits),
+    ('misses_total', 'Number of evaluations that returned false', lambda s: s.misses),
+    ('errors_total', 'Number of evaluations that raised an incompatible left-hand side error', lambda s: s.errors),
+    ('seconds_total', 'Cumulative time spent evaluating the pattern node', lambda s: s.seconds),
+)
+
+
+class InstrumentedNode:
+    def __init__(self, path: str, depth: int, label: str, stats: FunctionStats):
+        self.path = path
+        self.depth = depth
+        self.label = label
+        self.stats = stats
+
+
+def instrumented_nodes(pattern: RightHandSideFunction) -> List[InstrumentedNode]:
+    """
+    Lists the instrumented functions of a pattern compiled with ``compile_pattern(rhs, instrument=True)``, depth-first.
+    """
+    return list(_walk(pattern, path='', depth=0))
+
+
+def _walk(function, path: str, depth: int) -> Iterator[InstrumentedNode]:
+    if isinstance(function, InstrumentedFunction):
+        yield InstrumentedNode(path or '/', depth, _describe(function.rhs), function.stats)
+        depth += 1
+        function = function.rhs
+
+    for name, child in _children(function):
+        yield from _walk(child, '{}/{}'.format(path, name), depth)
+
+
+def _children(function) -> List[Tuple[str, RightHandSideFunction]]:
+    if isinstance(function, CombinedFunction):
+        return [(str(i), child) for i, child in enumerate(function.rhs)]
+
+    if isinstance(function, HigherOrderFunction):
+        return [('not', function.rhs)]
+
+    if isinstance(function, ValueFunction):
+        value = function.rhs
+        if isinstance(value, Mapping):
+            return list(value.rhs.items())
+        if isinstance(value, Collection):
+            return [(str(i), item) for i, item in enumerate(value.rhs) if not is_scalar(item)]
+
+    return []
+
+
+def _describe(function: RightHandSideFunction) -> str:
+    name = type(function).__name__
+
+    if isinstance(function, Lambda):
+        return '{}({})'.format(name, function.rhs.__name__)
+
+    if isinstance(function, ValueFunction):
+        value = function.rhs
+        if isinstance(value, (Collection, Mapping)):
+            return '{}({}[{}])'.format(name, type(value).__name__, len(value.rhs))
+        return '{}({} {!r})'.format(name, type(value).__name__, value.rhs)
+
+    return name
+
+
+def report(pattern: RightHandSideFunction) -> str:
+    """
+    Formats the statistics of an instrumented pattern as an indented tree, one line per function.
+    """
+    lines = []
+    for node in instrumented_nodes(pattern):
+        stats = node.stats
+        lines.append(
+            '{indent}{path} {label}: calls={calls} hits={hits} ({ratio:.1%}) errors={errors} time={ms:.3f}ms'.format(
+                indent='  ' * node.depth,
+                path=node.path,
+                label=node.label,
+                calls=stats.calls,
+                hits=stats.hits,
+                ratio=stats.hit_ratio,
+                errors=stats.errors,
+                ms=stats.seconds * 1000
+            )
+        )
+    return '\n'.join(lines)
+
+
+def prometheus_metrics(
+        pattern: RightHandSideFunction,
+        prefix: str = DEFAULT_METRIC_PREFIX,
+        labels: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Formats the statistics of an instrumented pattern in the Prometheus text exposition format. Every function is
+    identified by its ``node`` label, which holds its path in the pattern tree. Extra ``labels`` (e.g. the name of the
+    subscription) are added to every sample.
+    """
+    nodes = instrumented_nodes(pattern)
+    extra_labels = ''.join(
+        '{}="{}",'.format(key, _escape_label_value(value))
+        for key, value in sorted((labels or {}).items())
+    )
+
+    lines = []
+    for suffix, description, read in _METRICS:
+        metric = '{}_{}'.format(prefix, suffix)
+        lines.append('# HELP {} {}'.format(metric, description))
+        lines.append('# TYPE {} counter'.format(metric))
+        for node in nodes:
+            lines.append('{}{{{}node="{}"}} {}'.format(
+                metric, extra_labels, _escape_label_value(node.path), read(node.stats)
+            ))
+
+    return '\n'.join(lines) + '\n'
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,108 @@
+import json
+import pickle
+from multiprocessing import Pool
+from typing import Any, Callable, Hashable, Iterable, List, Optional, Sequence, Union
+
+from sqs_mega_python_zwap.match.pattern_set import PatternSet, Patterns
+from sqs_mega_python_zwap.match.types import ValueType
+
+DEFAULT_BATCH_SIZE = 64
+
+Event = Union[str, bytes, ValueType]
+
+# State of each worker process, set once by _initialize_worker
+_worker_patterns: Optional[PatternSet] = None
+_worker_decoder: Optional[Callable[[Union[str, bytes]], Any]] = None
+
+
+def _initialize_worker(pickled_patterns: bytes, decoder: Callable[[Union[str, bytes]], Any]):
+    global _worker_patterns, _worker_decoder
+    _worker_patterns = pickle.loads(pickled_patterns)
+    _worker_decoder = decoder
+
+
+def _match_event(event: Event) -> List[Hashable]:
+    if isinstance(event, (str, bytes)):
+        try:
+            event = _worker_decoder(event)
+        except ValueError:
+            # Documents that can't be decoded don't match any pattern
+            return []
+
+    return _worker_patterns.matches(event)
+
+
+def _match_batch(events: Sequence[Event]) -> List[List[Hashable]]:
+    return [_match_event(event) for event in events]
+
+
+def _batches(events: Sequence[Event], batch_size: int) -> List[Sequence[Event]]:
+    return [events[i:i + batch_size] for i in range(0, len(events), batch_size)]
+
+
+class ParallelPatternSet:
+    """
+    Evaluates a ``PatternSet`` in a pool of worker processes, so that CPU-bound patterns (regular expressions, large
+    ``in_`` collections, deep mappings) are not serialized by the GIL.
+
+    The pattern set is pickled once, and loaded once by each worker when it starts. Events are sent to the workers in
+    batches. Events given as raw JSON documents (``str`` or ``bytes``) are decoded by the workers, with ``decoder``, so
+    that the document is decoded only once and outside of the calling process. Other events are pickled as they are.
+
+    Results are the keys of the matching patterns of each event, as returned by ``PatternSet.matches``. Patterns must be
+    picklable, so they can't contain lambdas.
+    """
+
+    def __init__(
+            self,
+            patterns: Union[PatternSet, Patterns],
+            processes: Optional[int] = None,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            decoder: Callable[[Union[str, bytes]], Any] = json.loads
+    ):
+        if batch_size < 1:
+            raise ValueError('Batch size must be positive: {}'.format(batch_size))
+
+        self.pattern_set = patterns if isinstance(patterns, PatternSet) else PatternSet(patterns)
+        self.batch_size = batch_size
+        self._pool = Pool(
+            processes,
+            initializer=_initialize_worker,
+            initargs=(pickle.dumps(self.pattern_set, pickle.HIGHEST_PROTOCOL), decoder)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.pattern_set)
+
+    def matches(self, events: Iterable[Event]) -> List[List[Hashable]]:
+        """
+        Returns the keys of the patterns matching each event, in the order of the events.
+        """
+        events = list(events)
+        if not events:
+            return []
+
+        results = []
+        for batch in self._pool.imap(_match_batch, _batches(events, self.batch_size)):
+            results.extend(batch)
+        return results
+
+    def close(self):
+        """
+        Stops the worker processes, once they have evaluated all the pending batches.
+        """
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        """
+        Stops the worker processes immediately.
+        """
+        self._pool.terminate()
+        self._pool.join()
@@ -0,0 +1,95 @@
+from typing import List, Tuple, Hashable
+
+from sqs_mega_python_zwap.match.functions.eq import Equal
+from sqs_mega_python_zwap.match.functions.identity import identity
+from sqs_mega_python_zwap.match.functions.match import Match
+from sqs_mega_python_zwap.match.types import RightHandSideType, RightHandSideFunction, ValueType, MatchResult
+from sqs_mega_python_zwap.match.values import Mapping
+
+FieldPath = Tuple[Hashable, ...]
+
+
+class _Marker:
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+    def __reduce__(self):
+        # Markers are compared by identity, so they must be unpickled as the module-level instances
+        return self.name
+
+
+#
+# Returned by accessors instead of a value:
+#   MISSING: a key of the path is not in the mapping. The leaf does not apply, like a missing key of a mapping pattern.
+#   NULL: a mapping along the path is None. A non-empty mapping pattern never matches a None value.
+#   NOT_MAPPING: a value along the path is not a mapping, which is a type mismatch for a mapping pattern.
+#
+MISSING = _Marker('MISSING')
+NULL = _Marker('NULL')
+NOT_MAPPING = _Marker('NOT_MAPPING')
+
+
+class FieldAccessor:
+    """
+    Extracts the value at a path of nested mappings through chained ``dict.get`` calls. Returns ``MISSING``, ``NULL``
+    or ``NOT_MAPPING`` instead of a value when the path can't be followed.
+    """
+
+    __slots__ = ('path',)
+
+    def __init__(self, path: FieldPath):
+        self.path = tuple(path)
+
+    def __call__(self, lhs: ValueType):
+        for key in self.path:
+            if not isinstance(lhs, dict):
+                return NULL if lhs is None else NOT_MAPPING
+            lhs = lhs.get(key, MISSING)
+            if lhs is MISSING:
+                return MISSING
+        return lhs
+
+
+def flatten_pattern(rhs: RightHandSideType) -> List[Tuple[FieldPath, RightHandSideFunction]]:
+    """
+    Flattens nested mapping patterns into (path, leaf function) pairs, in evaluation order. A pattern that is not a
+    mapping is a single leaf with an empty path. For example ``{'event': {'name': 'foo', 'version': gt(1)}}`` becomes
+    ``[(('event', 'name'), eq('foo')), (('event', 'version'), gt(1))]``.
+    """
+    return list(_flatten(identity(rhs), ()))
+
+
+def _flatten(function: RightHandSideFunction, path: FieldPath):
+    items = _mapping_items(function)
+    if not items:
+        yield path, function
+        return
+
+    for key, item in items.items():
+        yield from _flatten(identity(item), path + (key,))
+
+
+def _mapping_items(function: RightHandSideFunction):
+    # Empty mappings are kept as leaves, since they only check the type of the left-hand side
+    if type(function) in (Equal, Match) and type(function.rhs) is Mapping:
+        return function.rhs.rhs
+    return None
+
+
+def leaf_result(value, leaf: RightHandSideFunction) -> str:
+    """
+    Evaluates a leaf function against a value extracted by a ``FieldAccessor``, with the same result as the mapping
+    pattern it was flattened from.
+    """
+    if value is MISSING:
+        return MatchResult.MATCH
+    if value is NULL:
+        return MatchResult.NO_MATCH
+    if value is NOT_MAPPING:
+        return MatchResult.TYPE_MISMATCH
+    return leaf.evaluate_result(value)
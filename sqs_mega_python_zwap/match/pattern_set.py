@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Tuple, Union, Iterable, Mapping as MappingType
+
+from sqs_mega_python_zwap.match.compilation import compile_pattern
+from sqs_mega_python_zwap.match.fingerprint import fingerprint, is_deterministic
+from sqs_mega_python_zwap.match.paths import FieldAccessor, FieldPath, flatten_pattern, leaf_result
+from sqs_mega_python_zwap.match.types import RightHandSideType, ValueType, MatchResult
+
+Patterns = Union[MappingType[Hashable, RightHandSideType], Iterable[Tuple[Hashable, RightHandSideType]]]
+
+_UNSET = object()
+
+
+class CacheStats:
+    __slots__ = ('hits', 'misses', 'skipped')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class PatternSet:
+    """
+    A set of patterns, identified by keys (e.g. the ids of the handlers of a subscription), evaluated together against
+    each event.
+
+    Every pattern is flattened into (path, leaf function) pairs, and leaf functions are compiled. Each distinct path is
+    read by a single ``FieldAccessor`` shared by all the patterns, so a field tested by many patterns is extracted only
+    once per event. Evaluation never raises on incompatible types: patterns that would raise a
+    ``LeftHandSideTypeError`` evaluate to ``MatchResult.TYPE_MISMATCH``, and don't match.
+
+    If ``cache_size`` is set, ``matches`` caches the keys of the matching patterns in a LRU cache, keyed on a
+    fingerprint of the fields read by the patterns (see ``fingerprint``). Events that only differ in other fields are
+    not evaluated again. Patterns containing lambdas are not cached, and are evaluated for every event.
+    """
+
+    def __init__(self, patterns: Patterns, cache_size: int = 0):
+        if hasattr(patterns, 'items'):
+            patterns = patterns.items()
+
+        self.patterns = {}
+        self.accessors = []
+        self.cache_size = cache_size
+        self.cache_stats = CacheStats()
+        self._cache = OrderedDict()
+        self._leaves = []
+        accessor_indices = {}
+        cached_accessors = set()
+
+        for key, pattern in patterns:
+            self.patterns[key] = pattern
+            cached = cache_size > 0 and is_deterministic(pattern)
+
+            leaves = []
+            for path, leaf in flatten_pattern(pattern):
+                if path not in accessor_indices:
+                    accessor_indices[path] = len(self.accessors)
+                    self.accessors.append(FieldAccessor(path))
+                leaves.append((accessor_indices[path], compile_pattern(leaf)))
+                if cached:
+                    cached_accessors.add(accessor_indices[path])
+
+            self._leaves.append((key, tuple(leaves), cached))
+
+        self._cached_accessors = sorted(cached_accessors)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    @property
+    def paths(self) -> List[FieldPath]:
+        return [i.path for i in self.accessors]
+
+    def evaluate(self, lhs: ValueType) -> Dict[Hashable, str]:
+        """
+        Evaluates all the patterns, returning the ``MatchResult`` of each pattern by key.
+        """
+        values = [_UNSET] * len(self.accessors)
+        return {
+            key: self._evaluate_leaves(leaves, lhs, values)
+            for key, leaves, _ in self._leaves
+        }
+
+    def matches(self, lhs: ValueType) -> List[Hashable]:
+        """
+        Returns the keys of the patterns that match, in the order they were added.
+        """
+        values = [_UNSET] * len(self.accessors)
+
+        cache_key = self._cache_key(lhs, values)
+        if cache_key is None:
+            return [
+                key
+                for key, leaves, _ in self._leaves
+                if self._evaluate_leaves(leaves, lhs, values) is MatchResult.MATCH
+            ]
+
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self.cache_stats.hits += 1
+            self._touch(cache_key)
+        else:
+            self.cache_stats.misses += 1
+            cached = frozenset(
+                key
+                for key, leaves, is_cached in self._leaves
+                if is_cached and self._evaluate_leaves(leaves, lhs, values) is MatchResult.MATCH
+            )
+            self._store(cache_key, cached)
+
+        return [
+            key
+            for key, leaves, is_cached in self._leaves
+            if (key in cached if is_cached else self._evaluate_leaves(leaves, lhs, values) is MatchResult.MATCH)
+        ]
+
+    def clear_cache(self):
+        self._cache.clear()
+        self.cache_stats = CacheStats()
+
+    def _cache_key(self, lhs: ValueType, values: list):
+        if not self.cache_size or not self._cached_accessors:
+            return None
+
+        accessors = self.accessors
+        for index in self._cached_accessors:
+            values[index] = accessors[index](lhs)
+
+        cache_key = fingerprint(tuple(values[index] for index in self._cached_accessors))
+        if cache_key is None:
+            self.cache_stats.skipped += 1
+        return cache_key
+
+    def _touch(self, cache_key):
+        try:
+            self._cache.move_to_end(cache_key)
+        except KeyError:
+            # Evicted by another thread
+            pass
+
+    def _store(self, cache_key, matched: frozenset):
+        cache = self._cache
+        cache[cache_key] = matched
+        while len(cache) > self.cache_size:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
+
+    def _evaluate_leaves(self, leaves, lhs: ValueType, values: list) -> str:
+        accessors = self.accessors
+
+        for index, leaf in leaves:
+            value = values[index]
+            if value is _UNSET:
+                value = values[index] = accessors[index](lhs)
+
+            result = leaf_result(value, leaf)
+            if result is not MatchResult.MATCH:
+                return result
+
+        return MatchResult.MATCH
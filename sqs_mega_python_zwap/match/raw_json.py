@@ -0,0 +1,212 @@
+import json
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from sqs_mega_python_zwap.match.compilation import compile_pattern
+from sqs_mega_python_zwap.match.paths import flatten_pattern
+from sqs_mega_python_zwap.match.types import RightHandSideType, MatchResult
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Strings are matched as a whole, so that brackets inside them are not counted
+_CONTAINER_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]')
+
+_STRING_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+_scan_once = json.JSONDecoder().scan_once
+
+_REJECTED = -1
+
+
+class _PathNode:
+    __slots__ = ('children', 'leaf', 'keys')
+
+    def __init__(self, keys: FrozenSet[str] = frozenset()):
+        self.children = {}
+        self.leaf = None
+        # Keys of the path of the node
+        self.keys = keys
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _decode_value(text: str, pos: int):
+    try:
+        return _scan_once(text, pos)
+    except StopIteration:
+        raise ValueError('Expecting value at position {}'.format(pos))
+
+
+def _skip_value(text: str, pos: int) -> int:
+    if text[pos] not in '{[':
+        return _decode_value(text, pos)[1]
+
+    # Containers are skipped by counting brackets, without decoding them
+    depth = 0
+    for token in _CONTAINER_TOKEN.finditer(text, pos):
+        bracket = token.group()
+        if bracket == '{' or bracket == '[':
+            depth += 1
+        elif bracket == '}' or bracket == ']':
+            depth -= 1
+            if not depth:
+                return token.end()
+
+    raise ValueError('Unterminated container at position {}'.format(pos))
+
+
+def _scan_object(text: str, pos: int, visit) -> int:
+    #
+    # Calls ``visit(key, pos)`` with the position of the value of each key of the object starting at ``pos``. The
+    # visitor returns the position after the value, or _REJECTED to stop scanning.
+    #
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos] == '}':
+        return pos + 1
+
+    while True:
+        if text[pos] != '"':
+            raise ValueError('Expecting property name at position {}'.format(pos))
+        key, pos = _decode_value(text, pos)
+
+        pos = _skip_whitespace(text, pos)
+        if text[pos] != ':':
+            raise ValueError('Expecting ":" at position {}'.format(pos))
+
+        pos = visit(key, _skip_whitespace(text, pos + 1))
+        if pos == _REJECTED:
+            return _REJECTED
+
+        pos = _skip_whitespace(text, pos)
+        if text[pos] == ',':
+            pos = _skip_whitespace(text, pos + 1)
+        elif text[pos] == '}':
+            return pos + 1
+        else:
+            raise ValueError('Expecting "," or "}}" at position {}'.format(pos))
+
+
+def _has_key_after(text: str, pos: int, keys: FrozenSet[str]) -> bool:
+    # Whether one of the keys appears after ``pos``, as the key of any object. Strings that are not keys may be taken
+    # for keys when there are no escaped characters, since then keys are looked up as they are written.
+    if text.find('\\', pos) == -1:
+        return any(text.find(json.dumps(key, ensure_ascii=False), pos) != -1 for key in keys)
+
+    for token in _STRING_TOKEN.finditer(text, pos):
+        end = _skip_whitespace(text, token.end())
+        if end < len(text) and text[end] == ':' and json.loads(token.group()) in keys:
+            return True
+    return False
+
+
+def _start_of_object(text: str) -> Optional[int]:
+    pos = _skip_whitespace(text, 0)
+    if pos < len(text) and text[pos] == '{':
+        return pos
+    return None
+
+
+class JsonMatcher:
+    """
+    Evaluates a mapping pattern against a raw JSON document, without decoding the whole document. Only the values of
+    the fields tested by the pattern are decoded, every other value is skipped, and scanning stops at the first field
+    that does not match.
+
+    The pattern is compiled and flattened into field paths (see ``flatten_pattern``), so its functions are evaluated in
+    the order their fields appear in the document. Like ``json.loads``, only the last occurrence of a key counts: every
+    occurrence is evaluated until one does not match, and then the document is rejected only if none of the keys of the
+    field appears later in the document.
+    """
+
+    def __init__(self, rhs: RightHandSideType):
+        self.rhs = rhs
+        self._root = _PathNode()
+
+        for path, leaf in flatten_pattern(rhs):
+            node = self._root
+            for key in path:
+                child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = _PathNode(node.keys | {key})
+                node = child
+            node.leaf = compile_pattern(leaf)
+
+    def matches(self, text: Union[str, bytes]) -> Optional[bool]:
+        """
+        Returns whether the document matches the pattern, or None if it can't be told without decoding the document:
+        if it is not a JSON object, if the pattern is not a mapping, or if a field that does not match may be repeated.
+        """
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+
+        pos = _start_of_object(text)
+        if pos is None or self._root.leaf is not None:
+            return None
+
+        rejected = []
+        try:
+            end = _scan_object(text, pos, self.__visitor(text, self._root, rejected))
+            if end == _REJECTED:
+                node, rejected_end = rejected[0]
+                return None if _has_key_after(text, rejected_end, node.keys) else False
+            if _skip_whitespace(text, end) != len(text):
+                return None
+            return True
+        except (ValueError, IndexError):
+            return None
+
+    def __visitor(self, text: str, node: _PathNode, rejected: List[Tuple[_PathNode, int]]):
+        def visit(key, pos):
+            child = node.children.get(key)
+            if child is None:
+                return _skip_value(text, pos)
+            return self.__visit_child(text, pos, child, rejected)
+
+        return visit
+
+    def __visit_child(self, text: str, pos: int, node: _PathNode, rejected: List[Tuple[_PathNode, int]]) -> int:
+        if node.leaf is not None:
+            value, end = _decode_value(text, pos)
+            if node.leaf.evaluate_result(value) is not MatchResult.MATCH:
+                rejected.append((node, end))
+                return _REJECTED
+            return end
+
+        if text[pos] == '{':
+            return _scan_object(text, pos, self.__visitor(text, node, rejected))
+
+        # A nested mapping pattern never matches null, and doesn't accept other types
+        rejected.append((node, pos))
+        return _REJECTED
+
+
+def extract_fields(text: Union[str, bytes], keys: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """
+    Decodes the values of the given top-level keys of a raw JSON object, skipping every other value. Returns None if
+    the document is not a valid JSON object.
+    """
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+
+    pos = _start_of_object(text)
+    if pos is None:
+        return None
+
+    keys = set(keys)
+    fields = {}
+
+    def visit(key, value_pos):
+        if key not in keys:
+            return _skip_value(text, value_pos)
+        fields[key], end = _decode_value(text, value_pos)
+        return end
+
+    try:
+        end = _scan_object(text, pos, visit)
+        if _skip_whitespace(text, end) != len(text):
+            return None
+        return fields
+    except (ValueError, IndexError):
+        return None
@@ -0,0 +1,266 @@
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Hashable
+
+from sqs_mega_python_zwap.match.compilation import compile_pattern
+from sqs_mega_python_zwap.match.functions import And, Or, Not, Equal, Match, LessThan, LessThanOrEqual, GreaterThan, \
+    GreaterThanOrEqual, In
+from sqs_mega_python_zwap.match.functions.instrumented import InstrumentedFunction
+from sqs_mega_python_zwap.match.functions.lambda_ import Lambda
+from sqs_mega_python_zwap.match.functions.value import ValueFunction
+from sqs_mega_python_zwap.match.pattern_set import PatternSet, Patterns
+from sqs_mega_python_zwap.match.types import RightHandSideType, RightHandSideFunction, RightHandSideValue, is_function
+from sqs_mega_python_zwap.match.values import Null, String, Number, Boolean, DateTime, Collection, Mapping
+
+#
+# Patterns are serialized as documents made of JSON types only (dicts with string keys, lists, strings, finite numbers,
+# booleans and nulls), so they can be encoded as JSON or msgpack. The document of a pattern is:
+#
+#     {"version": 1, "pattern": <item>}
+#
+# Items are the right-hand sides of patterns:
+#
+# - strings, booleans, nulls, integers and finite floats are plain JSON values
+# - lists are lists of items
+# - other values are objects with a single tag: {"decimal": "1.5"}, {"float": "nan"}, {"date": "2020-01-01"},
+#   {"datetime": "2020-01-01T00:00:00+00:00"}, and {"mapping": [[<key item>, <item>], ...]}
+# - functions are objects with a "fn" tag: {"fn": "eq", "value": <value>}, {"fn": "not", "arg": <function>} and
+#   {"fn": "and", "args": [<function>, ...]}
+#
+# The right-hand side values of functions keep their type, as {"type": "number", "rhs": <item>}.
+#
+FORMAT_VERSION = 1
+
+_VALUE_FUNCTIONS = {
+    'eq': Equal,
+    'match': Match,
+    'lt': LessThan,
+    'lte': LessThanOrEqual,
+    'gt': GreaterThan,
+    'gte': GreaterThanOrEqual,
+    'in': In,
+}
+
+_COMBINED_FUNCTIONS = {
+    'and': And,
+    'or': Or,
+}
+
+_VALUES = {
+    'null': Null,
+    'string': String,
+    'number': Number,
+    'boolean': Boolean,
+    'datetime': DateTime,
+    'collection': Collection,
+    'mapping': Mapping,
+}
+
+_TAGGED_SCALARS = {
+    'decimal': Decimal,
+    'float': float,
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+}
+
+_VALUE_FUNCTION_NAMES = {function_type: name for name, function_type in _VALUE_FUNCTIONS.items()}
+_VALUE_NAMES = {value_type: name for name, value_type in _VALUES.items()}
+
+
+class PatternFormatError(ValueError):
+    pass
+
+
+def dump_pattern(rhs: RightHandSideType) -> Dict[str, Any]:
+    """
+    Serializes a pattern into a document of JSON types. Compiled and instrumented patterns are serialized as the
+    patterns they were compiled from. Lambdas can't be serialized, and raise a TypeError.
+    """
+    return {'version': FORMAT_VERSION, 'pattern': _dump_item(rhs)}
+
+
+def load_pattern(document: Dict[str, Any], compile: bool = True) -> RightHandSideType:
+    """
+    Builds a pattern from a document returned by ``dump_pattern``. The pattern is compiled (see ``compile_pattern``),
+    unless ``compile`` is unset. Raises a ``PatternFormatError`` if the document is not valid.
+    """
+    _check_version(document)
+    rhs = _load_item(_get(document, 'pattern'))
+    return compile_pattern(rhs) if compile else rhs
+
+
+def dump_patterns(patterns: Patterns) -> Dict[str, Any]:
+    """
+    Serializes a set of patterns identified by keys (see ``PatternSet``). Keys must be serializable values.
+    """
+    if hasattr(patterns, 'items'):
+        patterns = patterns.items()
+
+    return {
+        'version': FORMAT_VERSION,
+        'patterns': [
+            [_dump_item(key), _dump_item(pattern)]
+            for key, pattern in patterns
+        ]
+    }
+
+
+def load_pattern_set(document: Dict[str, Any]) -> PatternSet:
+    """
+    Builds a ``PatternSet`` from a document returned by ``dump_patterns``.
+    """
+    _check_version(document)
+    return PatternSet([
+        (_load_key(key), _load_item(pattern))
+        for key, pattern in _pairs(_get(document, 'patterns'))
+    ])
+
+
+def _check_version(document):
+    version = _get(document, 'version')
+    if version != FORMAT_VERSION:
+        raise PatternFormatError('Unsupported pattern format version: {}'.format(version))
+
+
+def _get(node, key):
+    if not isinstance(node, dict) or key not in node:
+        raise PatternFormatError('Expecting "{}" in: {}'.format(key, node))
+    return node[key]
+
+
+def _pairs(node):
+    if not isinstance(node, list) or not all(isinstance(i, list) and len(i) == 2 for i in node):
+        raise PatternFormatError('Expecting a list of pairs: {}'.format(node))
+    return node
+
+
+#
+# Serialization
+#
+
+def _dump_item(rhs: RightHandSideType):
+    if isinstance(rhs, RightHandSideFunction):
+        return _dump_function(rhs)
+    if isinstance(rhs, RightHandSideValue):
+        # A value is evaluated as if it was wrapped by eq()
+        return {'fn': 'eq', 'value': _dump_value(rhs)}
+    if is_function(rhs):
+        raise TypeError('Lambdas can not be serialized')
+
+    rhs_type = type(rhs)
+    if rhs is None or rhs_type in (str, bool, int):
+        return rhs
+    if rhs_type is float:
+        return rhs if math.isfinite(rhs) else {'float': repr(rhs)}
+    if rhs_type is Decimal:
+        return {'decimal': str(rhs)}
+    if rhs_type is datetime:
+        return {'datetime': rhs.isoformat()}
+    if rhs_type is date:
+        return {'date': rhs.isoformat()}
+    if rhs_type in (list, tuple, set):
+        return [_dump_item(i) for i in rhs]
+    if rhs_type is dict:
+        return {'mapping': [[_dump_item(key), _dump_item(item)] for key, item in rhs.items()]}
+
+    raise TypeError('Right-hand side can not be serialized: {}'.format(rhs_type.__name__))
+
+
+def _dump_function(function: RightHandSideFunction):
+    if isinstance(function, InstrumentedFunction):
+        return _dump_function(function.rhs)
+    if isinstance(function, Lambda):
+        raise TypeError('Lambdas can not be serialized')
+
+    if isinstance(function, ValueFunction):
+        name = _VALUE_FUNCTION_NAMES.get(type(function))
+        if name is not None:
+            return {'fn': name, 'value': _dump_value(function.rhs)}
+    elif isinstance(function, Not):
+        return {'fn': 'not', 'arg': _dump_function(function.rhs)}
+    else:
+        for name, function_type in _COMBINED_FUNCTIONS.items():
+            if isinstance(function, function_type):
+                return {'fn': name, 'args': [_dump_function(i) for i in function.rhs]}
+
+    raise TypeError('Function can not be serialized: {}'.format(type(function).__name__))
+
+
+def _dump_value(value: RightHandSideValue):
+    name = _VALUE_NAMES.get(type(value))
+    if name is None:
+        raise TypeError('Value can not be serialized: {}'.format(type(value).__name__))
+    return {'type': name, 'rhs': _dump_item(value.rhs)}
+
+
+#
+# Deserialization
+#
+
+def _load_item(node) -> RightHandSideType:
+    if node is None or type(node) in (str, bool, int, float):
+        return node
+    if type(node) is list:
+        return [_load_item(i) for i in node]
+    if type(node) is not dict:
+        raise PatternFormatError('Invalid item: {}'.format(node))
+
+    if 'fn' in node:
+        return _load_function(node)
+    if len(node) != 1:
+        raise PatternFormatError('Invalid item: {}'.format(node))
+
+    [(tag, data)] = node.items()
+    if tag == 'mapping':
+        return {_load_key(key): _load_item(item) for key, item in _pairs(data)}
+
+    parse = _TAGGED_SCALARS.get(tag)
+    if parse is None:
+        raise PatternFormatError('Unknown item type: {}'.format(tag))
+
+    try:
+        return parse(data)
+    except (ArithmeticError, TypeError, ValueError) as e:
+        raise PatternFormatError('Invalid item: {}. {}'.format(node, e))
+
+
+def _load_key(node) -> Hashable:
+    key = _load_item(node)
+    if isinstance(key, (list, dict, RightHandSideFunction)):
+        raise PatternFormatError('Invalid key: {}'.format(node))
+    return key
+
+
+def _load_function(node) -> RightHandSideFunction:
+    name = node['fn']
+
+    if name in _VALUE_FUNCTIONS:
+        return _VALUE_FUNCTIONS[name](_load_value(_get(node, 'value')))
+    if name == 'not':
+        return Not(_load_function_item(_get(node, 'arg')))
+    if name in _COMBINED_FUNCTIONS:
+        args = _get(node, 'args')
+        if not isinstance(args, list) or len(args) < 2:
+            raise PatternFormatError('Expecting at least two functions: {}'.format(node))
+        return _COMBINED_FUNCTIONS[name]([_load_function_item(i) for i in args])
+
+    raise PatternFormatError('Unknown function: {}'.format(name))
+
+
+def _load_function_item(node) -> RightHandSideFunction:
+    if not isinstance(node, dict) or 'fn' not in node:
+        raise PatternFormatError('Expecting a function: {}'.format(node))
+    return _load_function(node)
+
+
+def _load_value(node) -> RightHandSideValue:
+    value_type = _VALUES.get(_get(node, 'type'))
+    if value_type is None:
+        raise PatternFormatError('Unknown value type: {}'.format(node['type']))
+
+    rhs = _load_item(_get(node, 'rhs'))
+    try:
+        return value_type() if value_type is Null else value_type(rhs)
+    except Exception as e:
+        raise PatternFormatError('Invalid {} value: {}. {}'.format(node['type'], node['rhs'], e))
@@ -1,4 +1,3 @@
-import inspect
 import types
 from abc import ABC, abstractmethod
 from datetime import date, datetime
@@ -18,7 +17,27 @@ ValueType = Union[ScalarType, CollectionType, MappingType]
 FunctionType = types.FunctionType
 
 
+class MatchResult:
+    """
+    Outcome of a non-raising evaluation. ``TYPE_MISMATCH`` is returned wherever a raising evaluation would raise a
+    ``LeftHandSideTypeError``.
+    """
+    MATCH = 'match'
+    NO_MATCH = 'no_match'
+    TYPE_MISMATCH = 'type_mismatch'
+
+    @classmethod
+    def of(cls, result: bool) -> str:
+        return cls.MATCH if result else cls.NO_MATCH
+
+
 class RightHandSideValue(ABC):
+    __slots__ = ()
+
+    def evaluate_result(self, lhs: ValueType, function_type: str) -> str:
+        # Function types are named after the methods that implement them
+        return MatchResult.of(getattr(self, function_type)(lhs))
+
     @abstractmethod
     def equal(self, lhs: ValueType) -> bool:
         pass
@@ -29,6 +48,8 @@ class RightHandSideValue(ABC):
 
 
 class ComparableRightHandSideValue(RightHandSideValue, ABC):
+    __slots__ = ()
+
     @abstractmethod
     def less_than(self, lhs: ValueType) -> bool:
         pass
@@ -47,16 +68,23 @@ class ComparableRightHandSideValue(RightHandSideValue, ABC):
 
 
 class CollectionRightHandSideValue(RightHandSideValue, ABC):
+    __slots__ = ()
+
     @abstractmethod
     def contains(self, lhs: ValueType) -> bool:
         pass
 
 
 class RightHandSideFunction(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def evaluate(self, lhs: ValueType) -> bool:
         pass
 
+    def evaluate_result(self, lhs: ValueType) -> str:
+        return MatchResult.of(self.evaluate(lhs))
+
 
 RightHandSideValueType = Union[RightHandSideValue, ValueType]
 ComparableRightHandSideValueType = Union[ComparableRightHandSideValue, NumberType, DateTimeType]
@@ -100,4 +128,4 @@ def is_mapping(value) -> bool:
 
 
 def is_function(function) -> bool:
-    return inspect.isfunction(function)
+    return isinstance(function, types.FunctionType)
@@ -3,6 +3,7 @@ from sqs_mega_python_zwap.match.values.value import Value
 
 
 class Boolean(Value):
+    __slots__ = ()
 
     def __init__(self, rhs: BooleanType):
         super().__init__(rhs)
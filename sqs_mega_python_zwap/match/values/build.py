@@ -1,3 +1,7 @@
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
 from sqs_mega_python_zwap.match.types import RightHandSideValueType, RightHandSideValue, ComparableRightHandSideValue, \
     CollectionRightHandSideValue
 from sqs_mega_python_zwap.match.values.boolean import Boolean
@@ -8,8 +12,40 @@ from sqs_mega_python_zwap.match.values.null import Null
 from sqs_mega_python_zwap.match.values.number import Number
 from sqs_mega_python_zwap.match.values.string import String
 
+INTERN_CACHE_SIZE = 4096
+
+_VALUE_TYPES = {
+    type(None): Null,
+    str: String,
+    int: Number,
+    float: Number,
+    Decimal: Number,
+    date: DateTime,
+    datetime: DateTime,
+    bool: Boolean,
+    list: Collection,
+    tuple: Collection,
+    set: Collection,
+    dict: Mapping,
+}
+
+_IMMUTABLE_ITEM_TYPES = (type(None), str, int, float, Decimal, bool)
+
 
 def value(rhs: RightHandSideValueType) -> RightHandSideValue:
+    value_type = _VALUE_TYPES.get(type(rhs))
+    if value_type is None:
+        return _build_value(rhs)
+
+    key = _intern_key(rhs)
+    if key is None:
+        return _new_value(value_type, rhs)
+
+    return _interned_value(value_type, type(rhs), rhs, key)
+
+
+def _build_value(rhs: RightHandSideValueType) -> RightHandSideValue:
+    # Values and subclasses of the native types
     if isinstance(rhs, RightHandSideValue):
         return rhs
 
@@ -31,6 +67,44 @@ def value(rhs: RightHandSideValueType) -> RightHandSideValue:
     raise TypeError('Right-hand side value type is not supported: {}'.format(type(rhs).__name__))
 
 
+def _new_value(value_type, rhs: RightHandSideValueType) -> RightHandSideValue:
+    if value_type is Null:
+        return Null()
+    return value_type(rhs)
+
+
+def _intern_key(rhs: RightHandSideValueType):
+    #
+    # Only immutable right-hand side values are interned. Equal values of different types (e.g. 1, 1.0 and True) and
+    # datetimes in different timezones behave differently, so these must be told apart by the key. Timezones are not
+    # always hashable, hence their identity is used; the cached datetime keeps its timezone alive.
+    #
+    rhs_type = type(rhs)
+
+    if rhs_type is tuple:
+        if all(type(i) in _IMMUTABLE_ITEM_TYPES for i in rhs):
+            return tuple((type(i), _exact_key(i)) for i in rhs)
+        return None
+    if rhs_type is datetime:
+        return id(rhs.tzinfo), rhs.utcoffset()
+    if rhs_type in _IMMUTABLE_ITEM_TYPES or rhs_type is date:
+        return _exact_key(rhs)
+
+    return None
+
+
+def _exact_key(rhs: RightHandSideValueType):
+    # Equal decimals and floats are still told apart by their exponent (1 and 1.00) and their sign (0.0 and -0.0)
+    if type(rhs) is Decimal or type(rhs) is float:
+        return repr(rhs)
+    return ()
+
+
+@lru_cache(maxsize=INTERN_CACHE_SIZE)
+def _interned_value(value_type, rhs_type, rhs, key) -> RightHandSideValue:
+    return _new_value(value_type, rhs)
+
+
 def comparable_value(rhs) -> ComparableRightHandSideValue:
     comparable = value(rhs)
     if not isinstance(comparable, ComparableRightHandSideValue):
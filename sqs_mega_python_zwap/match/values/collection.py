@@ -1,15 +1,168 @@
-from collections import defaultdict
+import decimal
+from typing import Iterable, Dict, Set, Any, List, Tuple
 
-from sqs_mega_python_zwap.match.types import is_collection, is_scalar, ValueType, CollectionRightHandSideValue, CollectionType
+from sqs_mega_python_zwap.match.types import is_collection, is_scalar, is_string, is_number, is_boolean, is_mapping, \
+    is_datetime, ValueType, CollectionRightHandSideValue, CollectionType
 from sqs_mega_python_zwap.match.values.value import Value, LeftHandSideTypeError, HigherOrderValue
 
 
+class ScalarIndex:
+    """
+    Hash sets of the plain scalar items of a collection, partitioned by type. Any other item (functions, values,
+    dates, nested collections and mappings, and NaN, which is not equal to itself) is kept in the ``others`` list, in
+    its original order.
+    """
+
+    __slots__ = ('has_null', 'strings', 'numbers', 'booleans', 'others')
+
+    def __init__(self, items: Iterable[Any]):
+        self.has_null = False
+        self.strings = set()
+        self.numbers = set()
+        self.booleans = set()
+        self.others = []
+
+        for item in items:
+            if item is None:
+                self.has_null = True
+            elif is_string(item):
+                self.strings.add(item)
+            elif is_number(item) and item == item:
+                self.numbers.add(item)
+            elif is_boolean(item):
+                self.booleans.add(item)
+            else:
+                self.others.append(item)
+
+
+def _number_cast_type(number):
+    # Mirrors Number._cast: a string left-hand side is cast to the type of the right-hand side number.
+    return type(number) if number else decimal.Decimal
+
+
+def _group_numbers_by_cast_type(items: Iterable[Any]) -> Dict[type, Set[Any]]:
+    groups = {}
+    for item in items:
+        if is_number(item):
+            groups.setdefault(_number_cast_type(item), set()).add(item)
+    return groups
+
+
+def _try_cast(value: str, cast_type: type):
+    try:
+        return cast_type(value), True
+    except Exception:
+        return None, False
+
+
+def _is_plain_scalar(item) -> bool:
+    return item is None or is_string(item) or is_boolean(item) or (is_number(item) and item == item)
+
+
+def _is_always_incompatible(item) -> bool:
+    # Items that may only be compared to a null scalar
+    return is_collection(item) or is_mapping(item) or is_datetime(item)
+
+
+class FirstPositions:
+    """
+    Positions of the first plain scalar items of a left-hand side collection, by value, and of the first items that
+    may not be compared to a string, a number or a boolean, so that searching the collection for a scalar in order is a
+    few lookups. Collections with items that may raise anything else than a type error (e.g. strings cast to a
+    signaling NaN) or may match unexpectedly are not ``regular``, and must be searched item by item.
+    """
+
+    __slots__ = ('size', 'regular', 'null', 'strings', 'numbers', 'booleans', 'casts', 'non_string', 'non_number',
+                 'non_boolean', 'non_cast')
+
+    def __init__(self, items: List[Any], cast_types: Iterable[type]):
+        self.size = absent = len(items)
+        self.regular = True
+        self.null = absent
+        self.strings = {}
+        self.numbers = {}
+        self.booleans = {}
+        self.casts = {cast_type: {} for cast_type in cast_types}
+        self.non_string = self.non_number = self.non_boolean = absent
+        self.non_cast = dict.fromkeys(self.casts, absent)
+
+        for position, item in enumerate(items):
+            if item is None:
+                self.null = min(self.null, position)
+                continue
+
+            if is_string(item):
+                self.strings.setdefault(item, position)
+                self.__add_casts(item, position)
+            else:
+                self.non_string = min(self.non_string, position)
+
+            if is_boolean(item):
+                self.booleans.setdefault(item, position)
+            else:
+                self.non_boolean = min(self.non_boolean, position)
+
+            if is_number(item):
+                if item == item:
+                    self.numbers.setdefault(item, position)
+            elif is_boolean(item) or _is_always_incompatible(item):
+                self.non_number = min(self.non_number, position)
+            elif not is_string(item):
+                self.regular = False
+
+    def __add_casts(self, item: str, position: int):
+        for cast_type, casts in self.casts.items():
+            number, ok = _try_cast(item, cast_type)
+            if not ok:
+                self.non_cast[cast_type] = min(self.non_cast[cast_type], position)
+            elif isinstance(number, decimal.Decimal) and number.is_snan():
+                self.regular = False
+            elif number == number:
+                casts.setdefault(number, position)
+
+    def find(self, rhs_item) -> Tuple[int, int]:
+        """
+        Return the position of the first item equal to a plain scalar, and the position of the first item that may not
+        be compared to it, or ``size`` for none.
+        """
+        absent = self.size
+        if rhs_item is None:
+            return self.null, absent
+        if is_string(rhs_item):
+            position = self.strings.get(rhs_item, absent)
+            return (position if rhs_item else min(position, self.null)), self.non_string
+        if is_boolean(rhs_item):
+            return self.booleans.get(rhs_item, absent), self.non_boolean
+
+        cast_type = _number_cast_type(rhs_item)
+        return (
+            min(self.numbers.get(rhs_item, absent), self.casts[cast_type].get(rhs_item, absent)),
+            min(self.non_number, self.non_cast[cast_type])
+        )
+
+
 class Collection(HigherOrderValue, CollectionRightHandSideValue):
+    __slots__ = ('_scalars', '_number_groups')
+
     class FunctionType(Value.FunctionType):
         CONTAINS = 'contains'
 
     def __init__(self, rhs: CollectionType):
         super().__init__(rhs)
+        self._scalars = ScalarIndex(self.rhs)
+        self._number_groups = _group_numbers_by_cast_type(self.rhs)
+
+    @property
+    def scalars(self) -> ScalarIndex:
+        return self._scalars
+
+    @property
+    def has_patterns(self) -> bool:
+        """
+        Whether the collection has items other than plain scalars (e.g. functions, values or nested collections), which
+        are evaluated one by one instead of being looked up by value.
+        """
+        return bool(self._scalars.others)
 
     @classmethod
     def accepts_rhs(cls, rhs):
@@ -34,7 +187,7 @@ class Collection(HigherOrderValue, CollectionRightHandSideValue):
         if lhs is None:
             return not self.rhs
 
-        return self._compare_collections(lhs, self.rhs, self.FunctionType.EQUAL)
+        return self._compare_collections(lhs, self.FunctionType.EQUAL)
 
     def _match(self, lhs: ValueType) -> bool:
         if lhs is None:
@@ -43,52 +196,129 @@ class Collection(HigherOrderValue, CollectionRightHandSideValue):
         if is_scalar(lhs):
             return self._contains(lhs, function_type=self.FunctionType.MATCH)
 
-        return self._compare_collections(lhs, self.rhs, self.FunctionType.MATCH)
+        return self._compare_collections(lhs, self.FunctionType.MATCH)
 
     def contains(self, lhs: ValueType) -> bool:
         lhs = self._filter_lhs(lhs, self.FunctionType.CONTAINS)
         return self._contains(lhs)
 
+    def _apply(self, lhs: ValueType, function_type: str) -> bool:
+        if function_type == self.FunctionType.CONTAINS:
+            return self._contains(lhs)
+        return super()._apply(lhs, function_type)
+
     def _contains(self, lhs: ValueType, function_type=FunctionType.CONTAINS) -> bool:
-        for rhs_item in self.rhs:
-            try:
-                if self._evaluate(lhs, rhs_item):
+        if not self.__is_compatible_with_scalars(lhs):
+            # Fall back to a sequential search, which raises if an incompatible item comes before a matching one
+            for rhs_item in self.rhs:
+                if self.__evaluate_contained_item(lhs, rhs_item, function_type):
                     return True
-            except LeftHandSideTypeError as e:
-                raise LeftHandSideTypeError(
-                    self, function_type, lhs,
-                    context='Left-hand side is not compatible with collection type. {}'.format(e)
-                ) from e
+            return False
+
+        return self.__scalars_contain(lhs)
 
+    def __scalars_contain(self, lhs: ValueType) -> bool:
+        scalars = self._scalars
+
+        if lhs is None:
+            return scalars.has_null or '' in scalars.strings
+        if is_string(lhs):
+            if lhs in scalars.strings:
+                return True
+            for cast_type, numbers in self._number_groups.items():
+                number, ok = _try_cast(lhs, cast_type)
+                if ok and number in numbers:
+                    return True
+            return False
+        if is_number(lhs):
+            return lhs in scalars.numbers
+        if is_boolean(lhs):
+            return lhs in scalars.booleans
         return False
 
-    def _compare_collections(self, lhs, rhs, function_type):
-        lhs_matches = defaultdict(lambda: set())
+    def __is_compatible_with_scalars(self, lhs: ValueType) -> bool:
+        scalars = self._scalars
 
-        for rhs_item in rhs:
-            rhs_match = False
+        # Other items may not be comparable to the left-hand side, and are searched sequentially
+        if scalars.others:
+            return False
+        if lhs is None:
+            return True
+        if is_string(lhs):
+            return not scalars.booleans and all(
+                _try_cast(lhs, cast_type)[1]
+                for cast_type in self._number_groups
+            )
+        if is_number(lhs):
+            return not scalars.strings and not scalars.booleans
+        if is_boolean(lhs):
+            return not scalars.strings and not scalars.numbers
+        return False
 
-            for lhs_item in lhs:
-                if rhs_item in lhs_matches[lhs_item]:
-                    rhs_match = True
-                    break
+    def __evaluate_contained_item(self, lhs, rhs_item, function_type):
+        try:
+            return self._evaluate(lhs, rhs_item)
+        except LeftHandSideTypeError as e:
+            raise LeftHandSideTypeError(
+                self, function_type, lhs,
+                context='Left-hand side is not compatible with collection type. {}'.format(e)
+            ) from e
 
-                match = self.__evaluate_comparison_items(lhs_item, rhs_item, function_type, lhs)
-                if match:
-                    lhs_matches[lhs_item].add(rhs_item)
-                    rhs_match = True
-                    break
+    def _compare_collections(self, lhs, function_type):
+        #
+        # Each right-hand side item is matched to the first equal left-hand side item, as in a sequential search. Plain
+        # scalars are looked up by value, and the search raises if an item that may not be compared to the scalar comes
+        # before that, so that the cost is linear in the size of both collections. Only the other items, and the items
+        # of irregular collections, are compared pairwise.
+        #
+        items = list(lhs)
+        positions = FirstPositions(items, self._number_groups)
+        if not positions.regular:
+            positions = None
 
-            if not rhs_match:
+        matched = set()
+        for rhs_item in self.rhs:
+            if positions is not None and _is_plain_scalar(rhs_item):
+                lhs_index = self.__find_scalar_match(lhs, items, positions, rhs_item, function_type)
+            else:
+                lhs_index = self.__find_pairwise_match(lhs, items, rhs_item, function_type)
+            if lhs_index is None:
                 return False
+            matched.add(lhs_index)
 
         if function_type == self.FunctionType.EQUAL:
-            for lhs_item in lhs:
-                if not lhs_matches[lhs_item]:
+            for lhs_index, lhs_item in enumerate(items):
+                if lhs_index not in matched and not self.__is_lhs_item_matched(lhs_item, positions is not None):
                     return False
 
         return True
 
+    def __find_scalar_match(self, lhs, items, positions, rhs_item, function_type):
+        lhs_index, incompatible_index = positions.find(rhs_item)
+        if incompatible_index < lhs_index:
+            # Raise the error of the first incompatible item
+            return self.__find_pairwise_match(lhs, items, rhs_item, function_type)
+        return lhs_index if lhs_index < positions.size else None
+
+    def __find_pairwise_match(self, lhs, items, rhs_item, function_type):
+        for lhs_index, lhs_item in enumerate(items):
+            if self.__evaluate_comparison_items(lhs_item, rhs_item, function_type, lhs):
+                return lhs_index
+        return None
+
+    def __is_lhs_item_matched(self, lhs_item, by_value: bool) -> bool:
+        if by_value and is_scalar(lhs_item) and self.__scalars_contain(lhs_item):
+            return True
+
+        for rhs_item in (self._scalars.others if by_value else self.rhs):
+            try:
+                if self._evaluate(lhs_item, rhs_item):
+                    return True
+            except LeftHandSideTypeError:
+                continue
+
+        return False
+
     def __evaluate_comparison_items(self, lhs_item, rhs_item, function_type, lhs):
         try:
             return self._evaluate(lhs_item, rhs_item)
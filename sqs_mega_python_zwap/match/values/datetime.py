@@ -1,16 +1,21 @@
 import re
-from datetime import date, datetime
+from datetime import date, datetime, timezone
+from functools import lru_cache
 from typing import Optional, Union
 
-import dateutil.parser
-from dateutil.tz import tzutc
-
 from sqs_mega_python_zwap.match.types import is_datetime, is_string, DateTimeType, ValueType
 from sqs_mega_python_zwap.match.values.value import ComparableValue
 
+PARSE_CACHE_SIZE = 4096
+
+_ISO_DATE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+_ISO_DATETIME = re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{3}(\d{3})?)?([+-]\d{2}:\d{2})?$')
+
+UTC = timezone.utc
+
 
 def _match_iso_date(string: str) -> re.Match:
-    return re.match(r'^(\d{4})-(\d{1,2})-(\d{1,2})$', string)
+    return _ISO_DATE.match(string)
 
 
 def _parse_iso_date(string: str) -> Optional[date]:
@@ -24,11 +29,68 @@ def _parse_iso_date(string: str) -> Optional[date]:
     return None
 
 
+def _parse_iso_datetime(string: str) -> Optional[datetime]:
+    if string.endswith('Z'):
+        string = string[:-1] + '+00:00'
+
+    if not _ISO_DATETIME.match(string):
+        return None
+
+    dt = datetime.fromisoformat(string)
+    if not dt.utcoffset():
+        return dt.replace(tzinfo=UTC)
+    return dt
+
+
+def _normalize_native_datetime(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=UTC, microsecond=0)
+    if dt.microsecond:
+        return dt.replace(microsecond=0)
+    return dt
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_iso_string(string: str) -> Optional[DateTimeType]:
+    """
+    Parses strict ISO-8601 strings without using dateutil. Returns a date for date-only strings, a normalized datetime
+    for complete date-time strings, or None if the string does not have one of these formats.
+    """
+    try:
+        dt = _parse_iso_datetime(string)
+        if dt:
+            return _normalize_native_datetime(dt)
+        return _parse_iso_date(string)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_string(string: str, default: Optional[datetime]) -> datetime:
+    # dateutil is only imported when parsing a string that is not strict ISO-8601, since it is slow to import
+    import dateutil.parser
+
+    try:
+        dt = dateutil.parser.parse(string, default=default)
+        return _normalize_native_datetime(dt)
+    except dateutil.parser.ParserError:
+        raise ValueError('Not a valid ISO-8601 string: "{}"'.format(str(string)))
+
+
 class DateTime(ComparableValue):
+    __slots__ = ('__rhs_date', '__parse_default')
 
     def __init__(self, rhs: Union[DateTimeType, str]):
         super().__init__(self.__normalize_rhs(rhs))
 
+        # The right-hand side variants used by comparisons are computed only once
+        if type(self.rhs) is datetime:
+            self.__rhs_date = self.rhs.date()
+            self.__parse_default = self.rhs.replace(tzinfo=UTC)
+        else:
+            self.__rhs_date = self.rhs
+            self.__parse_default = None
+
     @classmethod
     def accepts_rhs(cls, value):
         return is_datetime(value) or is_string(value)
@@ -37,13 +99,17 @@ class DateTime(ComparableValue):
         return is_string(value)
 
     def _cast(self, value, function_type=None, reference_value=None):
-        default_attributes = self.__default_datetime_attributes(value, reference_value)
+        parsed = parse_iso_string(value)
 
-        try:
-            dt = dateutil.parser.parse(value, default=default_attributes)
-            return self.__normalize_native_datetime(dt)
-        except dateutil.parser.ParserError:
-            raise ValueError('Not a valid ISO-8601 string: "{}"'.format(str(value)))
+        if parsed is None:
+            # When casting the left-hand side, the reference value is always the right-hand side
+            default = self.__parse_default if reference_value is not None else None
+            return _parse_string(value, default)
+
+        if type(parsed) is date:
+            return self.__date_to_datetime(parsed, reference_value)
+
+        return parsed
 
     def _equal(self, lhs: DateTimeType):
         return self._match(lhs)
@@ -52,64 +118,35 @@ class DateTime(ComparableValue):
         if lhs is None:
             return False
 
-        lhs = self.__normalize_value(lhs)
-        lhs, rhs = self.__cast_to_same_native_type(lhs, self.rhs)
-
-        return (lhs - rhs).total_seconds() == 0
+        lhs, rhs = self.__comparable_values(lhs)
+        return lhs == rhs
 
     def _less_than(self, lhs: DateTimeType):
-        lhs = self.__normalize_value(lhs)
-        lhs, rhs = self.__cast_to_same_native_type(lhs, self.rhs)
-
+        lhs, rhs = self.__comparable_values(lhs)
         return lhs < rhs
 
-    def __normalize_rhs(self, rhs: ValueType) -> ValueType:
-        if is_string(rhs):
-            return _parse_iso_date(rhs) or rhs
-        return self.__normalize_value(rhs)
+    def __comparable_values(self, lhs: DateTimeType) -> (DateTimeType, DateTimeType):
+        #
+        # When comparing a date to a datetime, only the date component is taken into account. The time component is the
+        # same on both sides, so this is the same as filling in the date with the time and timezone of the datetime.
+        #
+        if type(lhs) is datetime:
+            if type(self.rhs) is datetime:
+                return _normalize_native_datetime(lhs), self.rhs
+            return lhs.date(), self.rhs
 
-    def __normalize_value(self, value: ValueType) -> ValueType:
-        if type(value) is datetime:
-            return self.__normalize_native_datetime(value)
-        return value
+        return lhs, self.__rhs_date
 
     @staticmethod
-    def __normalize_native_datetime(dt: datetime) -> datetime:
-        if dt.tzinfo is None:
-            return dt.replace(tzinfo=tzutc(), microsecond=0)
-        return dt.replace(microsecond=0)
-
-    def __default_datetime_attributes(
-            self, value_to_cast: ValueType, reference_value: DateTimeType) -> Optional[datetime]:
-        if type(reference_value) is not datetime:
-            return None
-
-        if self.__is_iso_date_string(value_to_cast):
-            return reference_value
-
-        return reference_value.replace(tzinfo=tzutc())
-
-    @staticmethod
-    def __is_iso_date_string(string: str) -> bool:
-        return bool(_match_iso_date(string))
-
-    @classmethod
-    def __cast_to_same_native_type(cls, lhs: DateTimeType, rhs: DateTimeType) -> (DateTimeType, DateTimeType):
-        if type(lhs) is date and type(rhs) is datetime:
-            lhs = cls.__date_to_datetime(lhs, reference=rhs)
-        elif type(lhs) is datetime and type(rhs) is date:
-            rhs = cls.__date_to_datetime(rhs, reference=lhs)
-        return lhs, rhs
+    def __normalize_rhs(rhs: ValueType) -> ValueType:
+        if is_string(rhs):
+            return _parse_iso_date(rhs) or rhs
+        if type(rhs) is datetime:
+            return _normalize_native_datetime(rhs)
+        return rhs
 
     @staticmethod
-    def __date_to_datetime(date_: date, reference: datetime) -> datetime:
-        return datetime(
-            year=date_.year,
-            month=date_.month,
-            day=date_.day,
-            hour=reference.hour,
-            minute=reference.minute,
-            second=reference.second,
-            microsecond=reference.microsecond,
-            tzinfo=reference.tzinfo
-        )
+    def __date_to_datetime(date_: date, reference: Optional[DateTimeType]) -> datetime:
+        if type(reference) is datetime:
+            return reference.replace(year=date_.year, month=date_.month, day=date_.day)
+        return datetime(year=date_.year, month=date_.month, day=date_.day, tzinfo=UTC)
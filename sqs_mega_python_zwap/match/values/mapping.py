@@ -1,8 +1,9 @@
-from sqs_mega_python_zwap.match.types import is_mapping, MappingType
+from sqs_mega_python_zwap.match.types import is_mapping, MappingType, MatchResult
 from sqs_mega_python_zwap.match.values.value import HigherOrderValue
 
 
 class Mapping(HigherOrderValue):
+    __slots__ = ()
 
     def __init__(self, rhs: MappingType):
         super().__init__(rhs)
@@ -30,3 +31,15 @@ class Mapping(HigherOrderValue):
                     return False
 
         return True
+
+    def _apply_result(self, lhs: MappingType, function_type: str) -> str:
+        if lhs is None:
+            return MatchResult.of(not self.rhs)
+
+        for key in self.rhs:
+            if key in lhs:
+                result = self._evaluate_result(lhs[key], self.rhs[key])
+                if result is not MatchResult.MATCH:
+                    return result
+
+        return MatchResult.MATCH
@@ -2,6 +2,8 @@ from sqs_mega_python_zwap.match.values.value import Value
 
 
 class Null(Value):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(None)
 
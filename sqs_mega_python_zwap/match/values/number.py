@@ -5,11 +5,28 @@ from sqs_mega_python_zwap.match.types import is_number, is_string, NumberType
 from sqs_mega_python_zwap.match.values.value import ComparableValue
 
 
+def _exact_native(number: NumberType) -> NumberType:
+    # A float with the exact same value as a decimal, if there is one. Native numbers compare exactly to each other.
+    if type(number) is not decimal.Decimal or number.is_nan():
+        return number
+
+    native = float(number)
+    if decimal.Decimal(native) == number:
+        return native
+    return number
+
+
 class Number(ComparableValue):
+    __slots__ = ('__native', '__decimal')
 
     def __init__(self, rhs: Union[NumberType, str]):
         super().__init__(rhs)
 
+        # Exact variants of the right-hand side, compared to native and decimal left-hand sides respectively. Decimals
+        # compare exactly to integers, but not to floats.
+        self.__native = _exact_native(self.rhs)
+        self.__decimal = self.rhs if type(self.rhs) is not float else decimal.Decimal(self.rhs)
+
     @classmethod
     def accepts_rhs(cls, value):
         return is_number(value) or is_string(value)
@@ -32,3 +49,69 @@ class Number(ComparableValue):
 
     def _match(self, lhs: NumberType):
         return self._equal(lhs)
+
+    #
+    # Fast path: native left-hand sides skip the generic filtering, and every function is a single comparison against
+    # the exact variant of the right-hand side with the cheapest comparison for the left-hand side type.
+    #
+
+    def __operands(self, lhs, function_type: str):
+        lhs_type = type(lhs)
+        if lhs_type is int or lhs_type is float or lhs_type is decimal.Decimal:
+            return lhs, self.__rhs_for(lhs)
+        # Other left-hand sides are cast to the type of the right-hand side
+        return self._filter_lhs(lhs, function_type), self.rhs
+
+    def __rhs_for(self, lhs):
+        lhs_type = type(lhs)
+        if lhs_type is decimal.Decimal:
+            return self.__decimal
+        if lhs_type is float and lhs != lhs:
+            # NaN compares to the original right-hand side, since comparing it to a decimal raises
+            return self.rhs
+        return self.__native
+
+    def equal(self, lhs) -> bool:
+        if lhs is None:
+            return False
+        lhs, rhs = self.__operands(lhs, self.FunctionType.EQUAL)
+        return lhs == rhs
+
+    def match(self, lhs) -> bool:
+        if lhs is None:
+            return False
+        lhs, rhs = self.__operands(lhs, self.FunctionType.MATCH)
+        return lhs == rhs
+
+    def less_than(self, lhs) -> bool:
+        lhs, rhs = self.__operands(lhs, self.FunctionType.LESS_THAN)
+        return lhs < rhs
+
+    def less_than_or_equal(self, lhs) -> bool:
+        lhs, rhs = self.__operands(lhs, self.FunctionType.LESS_THAN_OR_EQUAL)
+        return lhs <= rhs
+
+    def greater_than(self, lhs) -> bool:
+        lhs, rhs = self.__operands(lhs, self.FunctionType.GREATER_THAN)
+        return not lhs <= rhs
+
+    def greater_than_or_equal(self, lhs) -> bool:
+        lhs, rhs = self.__operands(lhs, self.FunctionType.GREATER_THAN_OR_EQUAL)
+        return not lhs < rhs
+
+    def _apply(self, lhs, function_type: str) -> bool:
+        if lhs is None:
+            return False
+
+        rhs = self.__rhs_for(lhs)
+        if function_type == self.FunctionType.EQUAL or function_type == self.FunctionType.MATCH:
+            return lhs == rhs
+        if function_type == self.FunctionType.LESS_THAN:
+            return lhs < rhs
+        if function_type == self.FunctionType.LESS_THAN_OR_EQUAL:
+            return lhs <= rhs
+        if function_type == self.FunctionType.GREATER_THAN:
+            return not lhs <= rhs
+        if function_type == self.FunctionType.GREATER_THAN_OR_EQUAL:
+            return not lhs < rhs
+        raise AssertionError(function_type)
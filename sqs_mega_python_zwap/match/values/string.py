@@ -5,6 +5,7 @@ from sqs_mega_python_zwap.match.values.value import Value
 
 
 class String(Value):
+    __slots__ = ()
 
     def __init__(self, rhs: StringType):
         super().__init__(rhs)
@@ -2,10 +2,15 @@ from abc import ABC, abstractmethod
 from typing import Set, Type, Any, Optional
 
 from sqs_mega_python_zwap.match.types import ValueType, is_scalar, RightHandSideValue, ComparableRightHandSideValue, \
-    RightHandSideType, ComparableType
+    RightHandSideType, ComparableType, MatchResult
+
+# Returned instead of the left-hand side when it is not compatible with the right-hand side
+INCOMPATIBLE = object()
 
 
 class Value(RightHandSideValue, ABC):
+    __slots__ = ('_rhs',)
+
     class FunctionType:
         EQUAL = 'equal'
         MATCH = 'match'
@@ -73,6 +78,39 @@ class Value(RightHandSideValue, ABC):
 
         return lhs
 
+    def _coerce_lhs(self, lhs: ValueType, function_type: str) -> ValueType:
+        # Same as _filter_lhs, without building errors
+        if not self._accepts_lhs(lhs, function_type):
+            return INCOMPATIBLE
+
+        if self._needs_casting(lhs):
+            try:
+                return self._cast(lhs, function_type=function_type, reference_value=self.rhs)
+            except Exception:
+                return INCOMPATIBLE
+
+        return lhs
+
+    def evaluate_result(self, lhs: ValueType, function_type: str) -> str:
+        """
+        Evaluates the function without raising: returns ``MatchResult.TYPE_MISMATCH`` if the left-hand side is not
+        compatible, instead of raising a ``LeftHandSideTypeError`` with a detailed message.
+        """
+        lhs = self._coerce_lhs(lhs, function_type)
+        if lhs is INCOMPATIBLE:
+            return MatchResult.TYPE_MISMATCH
+        return self._apply_result(lhs, function_type)
+
+    def _apply_result(self, lhs: ValueType, function_type: str) -> str:
+        return MatchResult.of(self._apply(lhs, function_type))
+
+    def _apply(self, lhs: ValueType, function_type: str) -> bool:
+        if function_type == self.FunctionType.EQUAL:
+            return self._equal(lhs)
+        if function_type == self.FunctionType.MATCH:
+            return self._match(lhs)
+        raise AssertionError(function_type)
+
     def equal(self, lhs: ValueType) -> bool:
         lhs = self._filter_lhs(lhs, self.FunctionType.EQUAL)
         return self._equal(lhs)
@@ -91,6 +129,8 @@ class Value(RightHandSideValue, ABC):
 
 
 class ComparableValue(Value, ComparableRightHandSideValue, ABC):
+    __slots__ = ()
+
     class FunctionType(Value.FunctionType):
         LESS_THAN = 'less_than'
         LESS_THAN_OR_EQUAL = 'less_than_or_equal'
@@ -125,16 +165,41 @@ class ComparableValue(Value, ComparableRightHandSideValue, ABC):
         lhs = self._filter_lhs(lhs, self.FunctionType.GREATER_THAN_OR_EQUAL)
         return not self._less_than(lhs)
 
+    def _apply(self, lhs: ValueType, function_type: str) -> bool:
+        if function_type == self.FunctionType.LESS_THAN:
+            return self._less_than(lhs)
+        if function_type == self.FunctionType.LESS_THAN_OR_EQUAL:
+            return self._less_than(lhs) or self._equal(lhs)
+        if function_type == self.FunctionType.GREATER_THAN:
+            return not (self._less_than(lhs) or self._equal(lhs))
+        if function_type == self.FunctionType.GREATER_THAN_OR_EQUAL:
+            return not self._less_than(lhs)
+        return super()._apply(lhs, function_type)
+
 
 class HigherOrderValue(Value, ABC):
+    __slots__ = ()
+
     @staticmethod
     def _evaluate(lhs: ValueType, rhs: RightHandSideType) -> bool:
         #
-        # PLEASE NOTE: because of a cyclic dependency between mega.match.values and mega.match.function modules, we
-        # must use meta-programming here. The alternative would be squashing everything in the same file!
+        # PLEASE NOTE: because of a cyclic dependency between match.values and match.functions modules, we must defer
+        # this import until call time. The alternative would be squashing everything in the same file!
         #
-        exec('from mega.match.evaluation import evaluate; result = evaluate(lhs, rhs)')
-        return locals()['result']
+        from sqs_mega_python_zwap.match.evaluation import evaluate
+        return evaluate(lhs, rhs)
+
+    @staticmethod
+    def _evaluate_result(lhs: ValueType, rhs: RightHandSideType) -> str:
+        from sqs_mega_python_zwap.match.evaluation import evaluate_result
+        return evaluate_result(lhs, rhs)
+
+    def _apply_result(self, lhs: ValueType, function_type: str) -> str:
+        # Nested items are evaluated by the raising functions, unless the value overrides this method
+        try:
+            return super()._apply_result(lhs, function_type)
+        except LeftHandSideTypeError:
+            return MatchResult.TYPE_MISMATCH
 
 
 class RightHandSideTypeError(Exception):
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from sqs_mega_python_zwap.aws.clients import ClientRegistry, client_config, get_client, clients
+from sqs_mega_python_zwap.aws.sns.publish import SnsPublisher
+from sqs_mega_python_zwap.aws.sqs.publish.api import SqsPublisher
+
+
+def test_registry_reuses_clients():
+    registry = ClientRegistry()
+
+    client = registry.get_client('sqs', region_name='us-east-2')
+
+    assert registry.get_client('sqs', region_name='us-east-2') is client
+    assert registry.get_client('sqs', region_name='us-east-1') is not client
+    assert registry.get_client('sns', region_name='us-east-2') is not client
+    assert registry.get_client('sqs', region_name='us-east-2', aws_access_key_id='a',
+                               aws_secret_access_key='b') is not client
+    assert registry.get_client('sqs', region_name='us-east-2', endpoint_url='http://localhost:4566') is not client
+
+
+def test_registry_creates_a_single_client_per_key_concurrently():
+    registry = ClientRegistry()
+
+    with ThreadPoolExecutor(8) as executor:
+        created = list(executor.map(lambda _: registry.get_client('sqs', region_name='us-east-2'), range(32)))
+
+    assert all(client is created[0] for client in created)
+
+
+def test_registry_configures_clients():
+    registry = ClientRegistry(client_config(max_pool_connections=7, read_timeout=25, max_attempts=2))
+
+    config = registry.get_client('sqs', region_name='us-east-2').meta.config
+
+    assert config.max_pool_connections == 7
+    assert config.read_timeout == 25
+    assert config.retries == {'mode': 'standard', 'total_max_attempts': 3}
+
+
+def test_registry_returns_registered_clients():
+    registry = ClientRegistry()
+    client = MagicMock()
+
+    registry.register_client(client, 'sqs', region_name='us-east-2')
+    assert registry.get_client('sqs', region_name='us-east-2') is client
+
+    registry.clear()
+    assert registry.get_client('sqs', region_name='us-east-2') is not client
+
+
+def test_publishers_share_clients():
+    assert SqsPublisher(region_name='us-east-2')._client is get_client('sqs', region_name='us-east-2')
+    assert SnsPublisher(region_name='us-east-2')._client is SnsPublisher(region_name='us-east-2')._client
+    assert clients.get_client('sns', region_name='us-east-2') is SnsPublisher(region_name='us-east-2')._client
+
+
+def test_publishers_accept_clients():
+    client = MagicMock()
+
+    assert SqsPublisher(client=client)._client is client
+    assert SnsPublisher(client=client)._client is client
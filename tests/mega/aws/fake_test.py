@@ -0,0 +1,324 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.aws.clients import ClientRegistry
+from sqs_mega_python_zwap.aws.fake import FakeAws
+from sqs_mega_python_zwap.aws.sns.message import SnsNotification
+from sqs_mega_python_zwap.aws.sns.publish.api import SnsPublisher
+from sqs_mega_python_zwap.aws.sqs.message import SqsMessage
+from sqs_mega_python_zwap.aws.sqs.publish.api import SqsPublisher
+from sqs_mega_python_zwap.aws.sqs.subscribe.api import SqsReceiver
+from sqs_mega_python_zwap.event import Payload, Event, ObjectData
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def build_payload(object_id=1):
+    return Payload(
+        event=Event(name='user.updated'),
+        object=ObjectData(current={'name': 'John Doe'}, type='user', id=object_id)
+    )
+
+
+def receive(client, queue_url, max_number_of_messages=10, **kwargs):
+    response = client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=max_number_of_messages,
+                                      AttributeNames=['All'], **kwargs)
+    return response.get('Messages', [])
+
+
+def bodies(messages):
+    return [message['Body'] for message in messages]
+
+
+def send_fifo(client, queue_url, body, group_id):
+    client.send_message(QueueUrl=queue_url, MessageBody=body, MessageGroupId=group_id, MessageDeduplicationId=body)
+
+
+@pytest.fixture(autouse=True)
+def django_settings(monkeypatch):
+    # Received messages are deserialized according to the Django settings of the application
+    monkeypatch.setattr('django.conf.settings', SimpleNamespace(IS_GCLOUD=False))
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def aws(clock):
+    return FakeAws(clock=clock)
+
+
+@pytest.fixture
+def sqs(aws):
+    return aws.sqs_client()
+
+
+@pytest.fixture
+def queue_url(aws):
+    return aws.create_queue('queue', {'VisibilityTimeout': '30'})
+
+
+@pytest.fixture
+def fifo_queue_url(aws):
+    return aws.create_queue('queue.fifo')
+
+
+def test_messages_are_received_until_deleted(sqs, queue_url):
+    sqs.send_message(QueueUrl=queue_url, MessageBody='one')
+    sqs.send_message(QueueUrl=queue_url, MessageBody='two')
+
+    messages = receive(sqs, queue_url)
+    assert bodies(messages) == ['one', 'two']
+    assert messages[0]['Attributes']['ApproximateReceiveCount'] == '1'
+    assert receive(sqs, queue_url) == []
+
+    sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=messages[0]['ReceiptHandle'])
+    sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=messages[0]['ReceiptHandle'])
+    assert sqs.get_queue_attributes(QueueUrl=queue_url)['Attributes']['ApproximateNumberOfMessagesNotVisible'] == '1'
+
+
+def test_messages_are_received_again_after_their_visibility_timeout(sqs, queue_url, clock):
+    sqs.send_message(QueueUrl=queue_url, MessageBody='one')
+    sqs.send_message(QueueUrl=queue_url, MessageBody='two')
+    first, second = receive(sqs, queue_url, VisibilityTimeout=10)
+
+    sqs.change_message_visibility(QueueUrl=queue_url, ReceiptHandle=second['ReceiptHandle'], VisibilityTimeout=60)
+    clock.now += 10
+    messages = receive(sqs, queue_url)
+    assert bodies(messages) == ['one']
+    assert messages[0]['Attributes']['ApproximateReceiveCount'] == '2'
+
+    # The receipt handle of the first receive is stale
+    with pytest.raises(ClientError) as error:
+        sqs.change_message_visibility(QueueUrl=queue_url, ReceiptHandle=first['ReceiptHandle'], VisibilityTimeout=0)
+    assert error.value.response['Error']['Code'] == 'MessageNotInflight'
+
+
+def test_delayed_messages_are_not_visible(sqs, queue_url, clock):
+    sqs.send_message(QueueUrl=queue_url, MessageBody='one', DelaySeconds=5)
+    assert receive(sqs, queue_url) == []
+
+    clock.now += 5
+    assert bodies(receive(sqs, queue_url)) == ['one']
+
+
+def test_invalid_receipt_handles_are_rejected(sqs, queue_url):
+    with pytest.raises(ClientError) as error:
+        sqs.delete_message(QueueUrl=queue_url, ReceiptHandle='invalid')
+    assert error.value.response['Error']['Code'] == 'ReceiptHandleIsInvalid'
+
+
+def test_unknown_queues_are_rejected(sqs):
+    with pytest.raises(ClientError) as error:
+        sqs.send_message(QueueUrl='https://sqs.us-east-1.amazonaws.com/000000000000/unknown', MessageBody='one')
+    assert error.value.response['Error']['Code'] == 'AWS.SimpleQueueService.NonExistentQueue'
+
+
+def test_batches(sqs, queue_url):
+    response = sqs.send_message_batch(QueueUrl=queue_url, Entries=[
+        {'Id': str(index), 'MessageBody': str(index)} for index in range(3)
+    ])
+    assert [entry['Id'] for entry in response['Successful']] == ['0', '1', '2']
+
+    messages = receive(sqs, queue_url)
+    response = sqs.delete_message_batch(QueueUrl=queue_url, Entries=[
+        {'Id': 'valid', 'ReceiptHandle': messages[0]['ReceiptHandle']},
+        {'Id': 'invalid', 'ReceiptHandle': 'invalid'},
+    ])
+    assert response['Successful'] == [{'Id': 'valid'}]
+    assert response['Failed'][0]['Id'] == 'invalid'
+    assert response['Failed'][0]['Code'] == 'ReceiptHandleIsInvalid'
+
+    response = sqs.change_message_visibility_batch(QueueUrl=queue_url, Entries=[
+        {'Id': str(index), 'ReceiptHandle': message['ReceiptHandle'], 'VisibilityTimeout': 0}
+        for index, message in enumerate(messages[1:])
+    ])
+    assert len(response['Successful']) == 2
+    assert bodies(receive(sqs, queue_url)) == ['1', '2']
+
+
+@parameterized.expand([
+    ([], 'AWS.SimpleQueueService.EmptyBatchRequest'),
+    ([{'Id': str(index), 'MessageBody': 'body'} for index in range(11)],
+     'AWS.SimpleQueueService.TooManyEntriesInBatchRequest'),
+    ([{'Id': 'same', 'MessageBody': 'body'}] * 2, 'AWS.SimpleQueueService.BatchEntryIdsNotDistinct'),
+])
+def test_invalid_batches_are_rejected(entries, code):
+    aws = FakeAws()
+    queue_url = aws.create_queue('queue')
+
+    with pytest.raises(ClientError) as error:
+        aws.sqs_client().send_message_batch(QueueUrl=queue_url, Entries=entries)
+    assert error.value.response['Error']['Code'] == code
+
+
+def test_fifo_groups_are_locked_while_a_message_is_in_flight(sqs, fifo_queue_url):
+    for body, group_id in [('a1', 'a'), ('b1', 'b'), ('a2', 'a'), ('b2', 'b')]:
+        send_fifo(sqs, fifo_queue_url, body, group_id)
+
+    messages = receive(sqs, fifo_queue_url, max_number_of_messages=1)
+    assert bodies(messages) == ['a1']
+    assert messages[0]['Attributes']['MessageGroupId'] == 'a'
+    assert bodies(receive(sqs, fifo_queue_url)) == ['b1', 'b2']
+
+    sqs.delete_message(QueueUrl=fifo_queue_url, ReceiptHandle=messages[0]['ReceiptHandle'])
+    assert bodies(receive(sqs, fifo_queue_url)) == ['a2']
+
+
+def test_fifo_messages_are_deduplicated(sqs, fifo_queue_url, clock):
+    send_fifo(sqs, fifo_queue_url, 'one', 'group')
+    send_fifo(sqs, fifo_queue_url, 'one', 'group')
+    messages = receive(sqs, fifo_queue_url)
+    assert bodies(messages) == ['one']
+
+    sqs.delete_message(QueueUrl=fifo_queue_url, ReceiptHandle=messages[0]['ReceiptHandle'])
+    send_fifo(sqs, fifo_queue_url, 'one', 'group')
+    assert receive(sqs, fifo_queue_url) == []
+
+    clock.now += 5 * 60
+    send_fifo(sqs, fifo_queue_url, 'one', 'group')
+    assert bodies(receive(sqs, fifo_queue_url)) == ['one']
+
+
+@parameterized.expand([
+    ({'MessageDeduplicationId': 'one'}, 'MissingParameter'),
+    ({'MessageGroupId': 'group'}, 'InvalidParameterValue'),
+])
+def test_fifo_messages_require_parameters(parameters, code):
+    aws = FakeAws()
+    queue_url = aws.create_queue('queue.fifo')
+
+    with pytest.raises(ClientError) as error:
+        aws.sqs_client().send_message(QueueUrl=queue_url, MessageBody='one', **parameters)
+    assert error.value.response['Error']['Code'] == code
+
+
+def test_content_based_deduplication(aws):
+    sqs = aws.sqs_client()
+    queue_url = aws.create_queue('queue.fifo', {'ContentBasedDeduplication': 'true'})
+    sqs.send_message(QueueUrl=queue_url, MessageBody='one', MessageGroupId='group')
+    sqs.send_message(QueueUrl=queue_url, MessageBody='one', MessageGroupId='group')
+
+    assert bodies(receive(sqs, queue_url)) == ['one']
+
+
+def test_redrive_policy_moves_messages_to_the_dead_letter_queue(aws, sqs, clock):
+    dead_letter_queue_url = aws.create_queue('dead-letters')
+    dead_letter_queue_arn = sqs.get_queue_attributes(QueueUrl=dead_letter_queue_url)['Attributes']['QueueArn']
+    queue_url = aws.create_queue('queue', {
+        'RedrivePolicy': json.dumps({'deadLetterTargetArn': dead_letter_queue_arn, 'maxReceiveCount': 2})
+    })
+    sqs.send_message(QueueUrl=queue_url, MessageBody='one')
+
+    for _ in range(2):
+        assert bodies(receive(sqs, queue_url, VisibilityTimeout=1)) == ['one']
+        clock.now += 1
+
+    assert receive(sqs, queue_url) == []
+    assert bodies(receive(sqs, dead_letter_queue_url)) == ['one']
+
+
+def test_long_polling_waits_for_messages():
+    aws = FakeAws()
+    sqs = aws.sqs_client()
+    queue_url = aws.create_queue('queue')
+    threading.Timer(0.1, sqs.send_message, kwargs={'QueueUrl': queue_url, 'MessageBody': 'one'}).start()
+
+    start = time.monotonic()
+    assert bodies(receive(sqs, queue_url, WaitTimeSeconds=5)) == ['one']
+    assert time.monotonic() - start < 5
+
+
+def test_long_polling_returns_when_messages_are_visible_again():
+    aws = FakeAws()
+    sqs = aws.sqs_client()
+    queue_url = aws.create_queue('queue')
+    sqs.send_message(QueueUrl=queue_url, MessageBody='one')
+    receive(sqs, queue_url, VisibilityTimeout=0.1)
+
+    assert bodies(receive(sqs, queue_url, WaitTimeSeconds=5)) == ['one']
+
+
+def test_receiver_and_publisher_use_the_fake_clients(aws, queue_url):
+    publisher = SqsPublisher(queue_url=queue_url, client=aws.sqs_client())
+    receiver = SqsReceiver(queue_url=queue_url, wait_time_seconds=0, max_number_of_messages=10,
+                           client=aws.sqs_client())
+    message_ids = publisher.publish_raw_messages(['one', 'two'])
+
+    messages = receiver.receive_messages()
+    assert [message.message_id for message in messages] == message_ids
+    assert all(isinstance(message, SqsMessage) for message in messages)
+    assert receiver.delete_messages(messages) == []
+    assert aws.messages(queue_url) == []
+
+
+@parameterized.expand([
+    ('queue', False),
+    ('queue.fifo', True),
+])
+def test_topics_deliver_notifications(queue_name, fifo):
+    aws = FakeAws()
+    topic_arn = aws.create_topic('topic.fifo' if fifo else 'topic')
+    queue_url = aws.create_queue(queue_name)
+    aws.sns_client().subscribe(TopicArn=topic_arn, Protocol='sqs', Endpoint=queue_url)
+    publisher = SnsPublisher(topic_arn=topic_arn, client=aws.sns_client())
+    receiver = SqsReceiver(queue_url=queue_url, wait_time_seconds=0, client=aws.sqs_client())
+
+    message_id = publisher.publish(build_payload())
+
+    message, = receiver.receive_messages()
+    assert isinstance(message.embedded_message, SnsNotification)
+    assert message.embedded_message.message_id == message_id
+    assert message.embedded_message.topic_arn == topic_arn
+    assert message.payload.event.name == 'user.updated'
+    assert message.message_group_id == ('user:1' if fifo else None)
+
+
+def test_topics_deliver_raw_messages(aws, queue_url):
+    topic_arn = aws.create_topic('topic')
+    aws.subscribe(topic_arn, queue_url, raw_message_delivery=True)
+    aws.sns_client().publish(TopicArn=topic_arn, Message='one', MessageAttributes={
+        'event_name': {'DataType': 'String', 'StringValue': 'user.updated'}
+    })
+
+    message, = aws.sqs_client().receive_message(QueueUrl=queue_url, MessageAttributeNames=['All'])['Messages']
+    assert message['Body'] == 'one'
+    assert message['MessageAttributes'] == {'event_name': {'DataType': 'String', 'StringValue': 'user.updated'}}
+
+
+def test_topics_deliver_to_all_their_queues(aws):
+    topic_arn = aws.create_topic('topic')
+    queue_urls = [aws.create_queue('first'), aws.create_queue('second')]
+    for queue_url in queue_urls:
+        aws.subscribe(topic_arn, queue_url, raw_message_delivery=True)
+
+    aws.sns_client().publish(TopicArn=topic_arn, Message='one')
+    assert [aws.messages(queue_url) for queue_url in queue_urls] == [['one'], ['one']]
+
+
+def test_fifo_topics_only_deliver_to_fifo_queues(aws, queue_url):
+    with pytest.raises(ClientError):
+        aws.subscribe(aws.create_topic('topic.fifo'), queue_url)
+
+
+def test_register(aws, queue_url):
+    registry = ClientRegistry()
+    aws.register(registry)
+
+    assert registry.get_client('sqs').aws is aws
+    assert registry.get_client('sns').aws is aws
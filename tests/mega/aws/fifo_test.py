@@ -0,0 +1,42 @@
+import hashlib
+
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.aws.fifo import is_fifo, object_message_group_id, content_deduplication_id
+from sqs_mega_python_zwap.event import Payload, Event, ObjectData
+
+
+def build_payload(object_type=None, object_id=None):
+    return Payload(
+        event=Event(name='user.updated'),
+        object=ObjectData(current={'name': 'John Doe'}, type=object_type, id=object_id)
+    )
+
+
+@parameterized.expand([
+    ('https://sqs.us-east-2.amazonaws.com/424566909325/orders.fifo', True),
+    ('arn:aws:sns:us-east-2:424566909325:orders.fifo', True),
+    ('https://sqs.us-east-2.amazonaws.com/424566909325/orders', False),
+    ('arn:aws:sns:us-east-2:424566909325:fifo', False),
+])
+def test_is_fifo(queue_url_or_topic_arn, expected):
+    assert is_fifo(queue_url_or_topic_arn) is expected
+
+
+@parameterized.expand([
+    (build_payload('user', 987650), 'user:987650'),
+    (build_payload(None, 'abc'), 'abc'),
+    (build_payload('user', None), None),
+    (Payload(event=Event(name='user.updated')), None),
+    ({'id': 987650}, None),
+    ('hello world!', None),
+    (build_payload('user', 'x' * 200), hashlib.sha256(('user:' + 'x' * 200).encode()).hexdigest()),
+])
+def test_object_message_group_id(payload, expected):
+    assert object_message_group_id(payload) == expected
+
+
+def test_content_deduplication_id():
+    assert content_deduplication_id('hello world!') == content_deduplication_id('hello world!')
+    assert content_deduplication_id('hello world!') != content_deduplication_id('hello world')
+    assert len(content_deduplication_id('x' * 1000)) == 64
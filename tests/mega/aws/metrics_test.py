@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock
+
+import pytest
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.aws.metrics import Metrics, StatsdMetrics, PrometheusMetrics, RECEIVE_SECONDS, \
+    RECEIVED_MESSAGES, IN_FLIGHT_MESSAGES, ERRORS, RECEIVE, METRICS, payload_type_label
+from sqs_mega_python_zwap.aws.payload import PayloadType
+
+QUEUE_URL = 'https://sqs.us-east-2.amazonaws.com/424566909325/sqs-mega-test'
+
+
+def test_metrics_are_ignored_by_default():
+    metrics = Metrics()
+
+    metrics.increment(ERRORS, RECEIVE)
+    metrics.observe(RECEIVE_SECONDS, 0.5, (QUEUE_URL,))
+    metrics.add(IN_FLIGHT_MESSAGES, 1)
+
+
+@parameterized.expand([
+    (MagicMock(payload_type=PayloadType.MEGA), 'mega'),
+    ({'event_name': 'item.added'}, 'unknown'),
+])
+def test_payload_type_label(message, expected):
+    assert payload_type_label(message) == expected
+
+
+def test_statsd_metrics():
+    client = MagicMock()
+    metrics = StatsdMetrics(client)
+
+    metrics.increment(ERRORS, RECEIVE)
+    metrics.observe(RECEIVE_SECONDS, 0.5, (QUEUE_URL,))
+    metrics.observe(RECEIVED_MESSAGES, 3, (QUEUE_URL,))
+    metrics.add(IN_FLIGHT_MESSAGES, -1)
+
+    queue = 'https_sqs_us-east-2_amazonaws_com_424566909325_sqs-mega-test'
+    client.incr.assert_called_once_with('sqs_mega.errors.receive', 1)
+    assert [call[0] for call in client.timing.call_args_list] == [
+        ('sqs_mega.receive_seconds.' + queue, 500),
+        ('sqs_mega.received_messages.' + queue, 3),
+    ]
+    client.gauge.assert_called_once_with('sqs_mega.in_flight_messages', -1, delta=True)
+
+
+def test_statsd_metrics_without_prefix():
+    client = MagicMock()
+    StatsdMetrics(client, prefix=None).increment(ERRORS, RECEIVE, 2)
+
+    client.incr.assert_called_once_with('errors.receive', 2)
+
+
+def test_prometheus_metrics():
+    prometheus_client = pytest.importorskip('prometheus_client')
+    registry = prometheus_client.CollectorRegistry()
+    metrics = PrometheusMetrics(registry)
+
+    metrics.increment(ERRORS, RECEIVE)
+    metrics.observe(RECEIVED_MESSAGES, 3, (QUEUE_URL,))
+    metrics.add(IN_FLIGHT_MESSAGES, 2)
+    metrics.add(IN_FLIGHT_MESSAGES, -1)
+
+    assert registry.get_sample_value('sqs_mega_errors_total', {'operation': 'receive'}) == 1
+    assert registry.get_sample_value('sqs_mega_received_messages_sum', {'queue': QUEUE_URL}) == 3
+    assert registry.get_sample_value('sqs_mega_in_flight_messages') == 1
+    assert len({metric.name for metric in METRICS}) == len(METRICS)
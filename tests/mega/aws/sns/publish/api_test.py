@@ -2,6 +2,7 @@ import json
 import logging
 import re
 from base64 import b64decode
+from unittest.mock import MagicMock
 from urllib.parse import parse_qs
 
 import bson
@@ -9,6 +10,8 @@ import dateutil.parser
 import pytest
 
 import sqs_mega_python_zwap.event
+from sqs_mega_python_zwap.aws.fifo import content_deduplication_id
+from sqs_mega_python_zwap.aws.metrics import PUBLISH_BATCH_SIZE, ERRORS, PUBLISH
 from sqs_mega_python_zwap.aws.sns.publish.api import SnsPublisher, logger
 from tests.vcr import build_vcr
 
@@ -275,3 +278,68 @@ def test_log_published_messages(sns, caplog):
     assert records[0].message == '[{}][{}] Published SNS message'.format(sns.topic_arn, message_id)
     assert records[1].levelno == logging.DEBUG
     assert records[1].message == '[{}][{}] hello world!'.format(sns.topic_arn, message_id)
+
+
+def test_publish_to_object_message_group():
+    client = MagicMock()
+    sns = SnsPublisher(topic_arn='arn:aws:sns:us-east-2:424566909325:sqs-mega-test.fifo', client=client)
+    payload = build_mega_payload()
+    payload.object.type = 'user'
+    payload.object.id = '987650'
+
+    sns.publish(payload)
+    sns.publish(payload, message_group_id='users')
+
+    first, second = [call[1] for call in client.publish.call_args_list]
+    assert first['MessageGroupId'] == 'user:987650'
+    assert second['MessageGroupId'] == 'users'
+    assert first['MessageDeduplicationId'] == content_deduplication_id(first['Message'])
+    assert first['MessageDeduplicationId'] == second['MessageDeduplicationId']
+
+
+def test_publish_with_idempotency_key_or_random_deduplication_id():
+    client = MagicMock()
+    sns = SnsPublisher(
+        topic_arn='arn:aws:sns:us-east-2:424566909325:sqs-mega-test.fifo',
+        client=client,
+        content_based_deduplication=False
+    )
+
+    sns.publish(build_mega_payload(), idempotency_key='user-987650')
+    sns.publish_raw_message('hello world!')
+    sns.publish_raw_message('hello world!')
+
+    first, second, third = [call[1]['MessageDeduplicationId'] for call in client.publish.call_args_list]
+    assert first == content_deduplication_id('user-987650')
+    assert second != third
+
+
+def test_publish_with_content_based_deduplication():
+    client = MagicMock()
+    sns = SnsPublisher(
+        topic_arn='arn:aws:sns:us-east-2:424566909325:sqs-mega-test.fifo',
+        client=client,
+        content_based_deduplication=True
+    )
+
+    sns.publish_raw_message('hello world!', event_name='greeting')
+    sns.publish_raw_message('hello world!', event_name='greeting', deduplication_id='greeting-1')
+
+    first, second = [call[1] for call in client.publish.call_args_list]
+    assert first['MessageDeduplicationId'] == content_deduplication_id('hello world!')
+    assert second['MessageDeduplicationId'] == 'greeting-1'
+
+
+def test_publish_metrics():
+    client = MagicMock()
+    client.publish.side_effect = [{'MessageId': 'id'}, RuntimeError('Publish failed')]
+    metrics = MagicMock()
+    topic_arn = 'arn:aws:sns:us-east-2:424566909325:sqs-mega-test.fifo'
+    sns = SnsPublisher(topic_arn=topic_arn, client=client, metrics=metrics)
+
+    sns.publish_raw_message('hello world!')
+    with pytest.raises(RuntimeError):
+        sns.publish_raw_message('hello world!')
+
+    metrics.observe.assert_called_once_with(PUBLISH_BATCH_SIZE, 1, (topic_arn,))
+    metrics.increment.assert_called_once_with(ERRORS, PUBLISH)
@@ -1,12 +1,15 @@
 import json
 import logging
 from base64 import b64decode
+from unittest.mock import MagicMock, call
 
 import bson
 import dateutil.parser
 import pytest
 
 import sqs_mega_python_zwap.event
+from sqs_mega_python_zwap.aws.fifo import content_deduplication_id
+from sqs_mega_python_zwap.aws.metrics import PUBLISH_BATCH_SIZE, ERRORS, PUBLISH
 from sqs_mega_python_zwap.aws.sqs.api import logger
 from sqs_mega_python_zwap.aws.sqs.publish.api import SqsPublisher
 from tests.mega.aws.sqs import get_sqs_request_data, get_queue_url_from_request, get_sqs_response_data
@@ -254,3 +257,107 @@ def test_log_sent_messages(sqs, caplog):
     assert records[0].message == '[{}][{}] Sent SQS message'.format(sqs.queue_url, message_id)
     assert records[1].levelno == logging.DEBUG
     assert records[1].message == '[{}][{}] hello world!'.format(sqs.queue_url, message_id)
+
+
+def build_object_payload(object_id):
+    payload = build_mega_payload()
+    payload.object.type = 'user'
+    payload.object.id = object_id
+    return payload
+
+
+def test_publish_to_fifo_queue_with_object_message_group():
+    client = MagicMock()
+    sqs = SqsPublisher(queue_url='https://sqs.us-east-2.amazonaws.com/424566909325/sqs-mega-test.fifo', client=client)
+
+    sqs.publish(build_object_payload(987650))
+
+    assert client.send_message.call_args[1]['MessageGroupId'] == 'user:987650'
+    request = client.send_message.call_args[1]
+    assert request['MessageDeduplicationId'] == content_deduplication_id(request['MessageBody'])
+
+
+def test_publish_to_fifo_queue_with_idempotency_key():
+    client = MagicMock()
+    sqs = SqsPublisher(
+        queue_url='https://sqs.us-east-2.amazonaws.com/424566909325/sqs-mega-test.fifo',
+        client=client,
+        content_based_deduplication=False
+    )
+
+    sqs.publish('hello world!')
+    sqs.publish('hello world!', idempotency_key='greeting-1')
+
+    first, second = [call[1] for call in client.send_message.call_args_list]
+    assert 'MessageDeduplicationId' not in first
+    assert second['MessageDeduplicationId'] == content_deduplication_id('greeting-1')
+
+
+def test_publish_to_fifo_queue_with_content_based_deduplication():
+    client = MagicMock()
+    sqs = SqsPublisher(
+        queue_url='https://sqs.us-east-2.amazonaws.com/424566909325/sqs-mega-test.fifo',
+        client=client,
+        content_based_deduplication=True
+    )
+
+    sqs.publish_raw_message('hello world!')
+    sqs.publish_raw_message('hello world!', message_group_id='greetings')
+
+    first, second = [call[1] for call in client.send_message.call_args_list]
+    assert first['MessageDeduplicationId'] == second['MessageDeduplicationId']
+    assert first['MessageGroupId'] != 'greetings'
+    assert second['MessageGroupId'] == 'greetings'
+
+
+def test_publish_to_standard_queue_without_message_group():
+    client = MagicMock()
+    sqs = SqsPublisher(
+        queue_url='https://sqs.us-east-2.amazonaws.com/424566909325/sqs-mega-test',
+        client=client,
+        content_based_deduplication=True
+    )
+
+    sqs.publish(build_object_payload(987650), idempotency_key='user-987650')
+
+    assert set(client.send_message.call_args[1]) == {'QueueUrl', 'MessageBody'}
+
+
+def test_publish_raw_messages_in_batches():
+    client = MagicMock()
+    client.send_message_batch.side_effect = [
+        {'Successful': [{'Id': str(i), 'MessageId': 'id-{}'.format(i)} for i in range(10) if i != 3],
+         'Failed': [{'Id': '3', 'Code': 'InternalError'}]},
+        {'Successful': [{'Id': '10', 'MessageId': 'id-10'}]},
+    ]
+    sqs = SqsPublisher(queue_url='https://sqs.us-east-2.amazonaws.com/424566909325/sqs-mega-test.fifo', client=client)
+    bodies = ['message {}'.format(i) for i in range(11)]
+
+    message_ids = sqs.publish_raw_messages(bodies)
+
+    assert message_ids == ['id-{}'.format(i) if i != 3 else None for i in range(11)]
+    entries = [entry for call in client.send_message_batch.call_args_list for entry in call[1]['Entries']]
+    assert [entry['MessageBody'] for entry in entries] == bodies
+    assert all(entry['MessageDeduplicationId'] == content_deduplication_id(entry['MessageBody']) for entry in entries)
+
+
+def test_publish_metrics():
+    client = MagicMock()
+    client.send_message_batch.side_effect = [
+        {'Successful': [{'Id': str(i), 'MessageId': 'id-{}'.format(i)} for i in range(10) if i != 3],
+         'Failed': [{'Id': '3', 'Code': 'InternalError'}]},
+        {'Successful': [{'Id': '10', 'MessageId': 'id-10'}]},
+    ]
+    metrics = MagicMock()
+    queue_url = 'https://sqs.us-east-2.amazonaws.com/424566909325/sqs-mega-test'
+    sqs = SqsPublisher(queue_url=queue_url, client=client, metrics=metrics)
+
+    sqs.publish_raw_message('hello world!')
+    sqs.publish_raw_messages(['message {}'.format(i) for i in range(11)])
+
+    assert metrics.observe.call_args_list == [
+        call(PUBLISH_BATCH_SIZE, 1, (queue_url,)),
+        call(PUBLISH_BATCH_SIZE, 10, (queue_url,)),
+        call(PUBLISH_BATCH_SIZE, 1, (queue_url,)),
+    ]
+    metrics.increment.assert_called_once_with(ERRORS, PUBLISH, 1)
@@ -1,11 +1,15 @@
 import json
 import logging
 from base64 import b64decode
+from unittest.mock import MagicMock, patch, call
 
 import bson
 import pytest
 
+from sqs_mega_python_zwap.aws.encoding import decode_value, encode_bson
 from sqs_mega_python_zwap.aws.message import MessageType
+from sqs_mega_python_zwap.aws.metrics import RECEIVE_SECONDS, RECEIVED_MESSAGES, EMPTY_RECEIVES, DELETE_BATCH_SIZE, \
+    ERRORS, RECEIVE, DELETE
 from sqs_mega_python_zwap.aws.payload import PayloadType
 from sqs_mega_python_zwap.aws.sns.message import SnsNotification, SnsMessageType
 from sqs_mega_python_zwap.aws.sqs.api import logger
@@ -13,6 +17,7 @@ from sqs_mega_python_zwap.aws.sqs.message import SqsMessage
 from sqs_mega_python_zwap.aws.sqs.schema import deserialize_sqs_message
 from sqs_mega_python_zwap.aws.sqs.subscribe.api import SqsReceiver
 from sqs_mega_python_zwap.event import deserialize_payload
+from sqs_mega_python_zwap.match.functions import gt, match, or_
 from tests.mega.aws.sqs import get_sqs_request_data, get_queue_url_from_request, get_request_attribute, \
     get_sqs_response_data
 from tests.vcr import build_vcr
@@ -406,3 +411,168 @@ def test_log_deleted_message(queue_url, caplog):
     assert records[0].message == '[{}][{}] Deleted message'.format(sqs.queue_url, message_id)
     assert records[1].levelno == logging.DEBUG
     assert records[1].message == '[{}][{}] ReceiptHandle={}'.format(sqs.queue_url, message_id, receipt_handle)
+
+
+def build_receive_response(*bodies):
+    return {
+        'Messages': [
+            {'MessageId': 'message-{}'.format(i), 'ReceiptHandle': 'receipt-{}'.format(i), 'Body': body}
+            for i, body in enumerate(bodies)
+        ]
+    }
+
+
+def build_sns_notification_body(message, type_='Notification'):
+    return json.dumps({
+        'Type': type_,
+        'MessageId': 'sns-message',
+        'TopicArn': 'arn:aws:sns:us-east-2:424566909325:sqs-mega-test',
+        'Timestamp': '2020-05-04T15:53:23.000Z',
+        'Message': message,
+    })
+
+
+def receive_with_filter(queue_url, response, **kwargs):
+    sqs = SqsReceiver(queue_url=queue_url, max_number_of_messages=10, client=MagicMock(), **kwargs)
+    sqs._client.receive_message.return_value = response
+
+    with patch('sqs_mega_python_zwap.aws.sqs.subscribe.api.deserialize_sqs_message', side_effect=lambda data: data), \
+            patch('sqs_mega_python_zwap.aws.sqs.subscribe.api.decode_value', wraps=decode_value) as decode:
+        messages = sqs.receive_messages()
+
+    return sqs, messages, decode
+
+
+def test_receive_messages_matching_filter(queue_url):
+    response = build_receive_response(
+        json.dumps({'event': {'name': 'item.added', 'version': 2}}),
+        json.dumps({'event': {'name': 'cart.removed', 'version': 2}}),
+        json.dumps({'event': {'name': 'item.added', 'version': 'v1'}}),
+        build_sns_notification_body(json.dumps({'event': {'name': 'item.added', 'version': 3}})),
+        build_sns_notification_body(json.dumps({'event': {'name': 'cart.created'}})),
+    )
+
+    sqs, messages, decode = receive_with_filter(
+        queue_url, response,
+        message_filter={'event': {'name': match(r'item\..*'), 'version': gt(1)}}
+    )
+
+    assert [m['MessageId'] for m in messages] == ['message-0', 'message-3']
+    decode.assert_not_called()
+    assert sqs._client.delete_message.call_args_list == [
+        call(QueueUrl=queue_url, ReceiptHandle='receipt-1'),
+        call(QueueUrl=queue_url, ReceiptHandle='receipt-2'),
+        call(QueueUrl=queue_url, ReceiptHandle='receipt-4'),
+    ]
+
+
+def test_receive_messages_filter_does_not_delete_matching_messages(queue_url):
+    response = build_receive_response(
+        json.dumps({'event': {'name': 'bar'}}),
+        json.dumps({'event': {'name': 2}}),
+        '{"event": {"name": "foo", "name": "bar"}}',
+        json.dumps({'event': {'name': 'foo'}}),
+    )
+
+    sqs, messages, _ = receive_with_filter(
+        queue_url, response,
+        message_filter={'event': {'name': or_(match(r'b.*'), gt(1))}}
+    )
+
+    assert [m['MessageId'] for m in messages] == ['message-0', 'message-1', 'message-2']
+    sqs._client.delete_message.assert_called_once_with(QueueUrl=queue_url, ReceiptHandle='receipt-3')
+
+
+def test_receive_messages_filter_decodes_payloads_that_are_not_json_objects(queue_url):
+    response = build_receive_response(
+        encode_bson({'event': {'name': 'item.added'}}),
+        encode_bson({'event': {'name': 'cart.created'}}),
+        'plaintext',
+    )
+
+    _, messages, decode = receive_with_filter(queue_url, response, message_filter={'event': {'name': 'item.added'}})
+
+    assert [m['MessageId'] for m in messages] == ['message-0']
+    assert decode.call_count == 3
+
+
+def test_receive_messages_filter_keeps_sns_subscription_confirmations(queue_url):
+    response = build_receive_response(
+        build_sns_notification_body('You have chosen to subscribe to the topic', type_='SubscriptionConfirmation'),
+    )
+
+    _, messages, _ = receive_with_filter(queue_url, response, message_filter={'event': {'name': 'item.added'}})
+
+    assert len(messages) == 1
+
+
+def test_receive_messages_without_deleting_filtered_messages(queue_url):
+    response = build_receive_response(json.dumps({'event': {'name': 'item.removed'}}))
+
+    sqs, messages, _ = receive_with_filter(
+        queue_url, response,
+        message_filter={'event': {'name': 'item.added'}},
+        delete_filtered_messages=False
+    )
+
+    assert messages == []
+    sqs._client.delete_message.assert_not_called()
+
+
+@pytest.mark.parametrize('visibility_timeout, expected', [(45, 45), (10 ** 6, 43200), (-1, 0)])
+def test_change_message_visibility(queue_url, visibility_timeout, expected):
+    sqs = SqsReceiver(queue_url=queue_url, client=MagicMock())
+    message = MagicMock(receipt_handle='handle')
+
+    sqs.change_message_visibility(message, visibility_timeout)
+
+    sqs._client.change_message_visibility.assert_called_once_with(
+        QueueUrl=queue_url, ReceiptHandle='handle', VisibilityTimeout=expected
+    )
+
+
+def test_delete_messages_in_batches(queue_url):
+    sqs = SqsReceiver(queue_url=queue_url, client=MagicMock())
+    messages = [MagicMock(receipt_handle='handle-{}'.format(i), message_id=str(i)) for i in range(12)]
+    sqs._client.delete_message_batch.side_effect = [
+        {'Successful': [{'Id': str(i)} for i in range(9)], 'Failed': [{'Id': '9', 'Code': 'ReceiptHandleIsInvalid'}]},
+        {'Successful': [{'Id': '0'}, {'Id': '1'}]},
+    ]
+
+    assert sqs.delete_messages(messages) == [messages[9]]
+
+    first, second = [call[1]['Entries'] for call in sqs._client.delete_message_batch.call_args_list]
+    assert [entry['ReceiptHandle'] for entry in first + second] == ['handle-{}'.format(i) for i in range(12)]
+
+
+def test_receive_messages_metrics(queue_url):
+    metrics = MagicMock()
+    sqs = SqsReceiver(queue_url=queue_url, client=MagicMock(), metrics=metrics)
+    sqs._client.receive_message.side_effect = [{}, RuntimeError('Receive failed')]
+
+    assert sqs.receive_messages() == []
+    with pytest.raises(RuntimeError):
+        sqs.receive_messages()
+
+    observed = {call[0][0]: call[0][1:] for call in metrics.observe.call_args_list}
+    assert observed[RECEIVED_MESSAGES] == (0, (queue_url,))
+    assert RECEIVE_SECONDS in observed
+    assert metrics.increment.call_args_list == [call(EMPTY_RECEIVES, (queue_url,)), call(ERRORS, RECEIVE)]
+
+
+def test_delete_messages_metrics(queue_url):
+    metrics = MagicMock()
+    sqs = SqsReceiver(queue_url=queue_url, client=MagicMock(), metrics=metrics)
+    messages = [MagicMock(receipt_handle='handle-{}'.format(i), message_id=str(i)) for i in range(12)]
+    sqs._client.delete_message_batch.side_effect = [
+        {'Successful': [{'Id': str(i)} for i in range(9)], 'Failed': [{'Id': '9', 'Code': 'ReceiptHandleIsInvalid'}]},
+        {'Successful': [{'Id': '0'}, {'Id': '1'}]},
+    ]
+
+    sqs.delete_messages(messages)
+
+    assert metrics.observe.call_args_list == [
+        call(DELETE_BATCH_SIZE, 10, (queue_url,)),
+        call(DELETE_BATCH_SIZE, 2, (queue_url,)),
+    ]
+    metrics.increment.assert_called_once_with(ERRORS, DELETE, 1)
@@ -0,0 +1,44 @@
+import threading
+import time
+
+import pytest
+
+from sqs_mega_python_zwap.aws.sqs.subscribe.executor import KeyedExecutor
+
+
+def test_tasks_with_the_same_key_run_in_order():
+    runs = []
+
+    def task(key, index):
+        time.sleep(0.001 * (5 - index))
+        runs.append((key, index))
+
+    with KeyedExecutor(4) as executor:
+        for index in range(5):
+            for key in 'abc':
+                executor.submit(key, task, key, index)
+
+    for key in 'abc':
+        assert [index for run_key, index in runs if run_key == key] == list(range(5))
+
+
+def test_tasks_with_different_keys_run_in_parallel():
+    barrier = threading.Barrier(3, timeout=5)
+
+    with KeyedExecutor(3) as executor:
+        futures = [executor.submit(key, barrier.wait) for key in ('a', 'b', None)]
+
+    assert sorted(future.result() for future in futures) == [0, 1, 2]
+
+
+def test_failed_task_does_not_stop_the_next_tasks_of_the_key():
+    def fail():
+        raise RuntimeError('Task failed')
+
+    with KeyedExecutor(1) as executor:
+        failed = executor.submit('a', fail)
+        succeeded = executor.submit('a', lambda: 'done')
+
+    with pytest.raises(RuntimeError):
+        failed.result()
+    assert succeeded.result() == 'done'
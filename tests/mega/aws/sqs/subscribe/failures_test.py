@@ -0,0 +1,62 @@
+from unittest.mock import MagicMock
+
+import pytest
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.aws.sqs.subscribe.failures import FailurePolicy
+
+
+def _message(message_id, receive_count):
+    return MagicMock(message_id=message_id, receive_count=receive_count, body='body of {}'.format(message_id))
+
+
+@parameterized.expand([
+    (None, 5),
+    (1, 5),
+    (2, 10),
+    (4, 40),
+    (10, 900),
+    (1000, 900),
+])
+def test_backoff_is_exponential_up_to_max_delay(receive_count, expected):
+    assert FailurePolicy().backoff(receive_count) == expected
+
+
+def test_failed_messages_are_retried_after_backoff():
+    receiver = MagicMock()
+    messages = [_message('a', 1), _message('b', 3)]
+
+    FailurePolicy(base_delay=2).handle_failures([(message, RuntimeError()) for message in messages], receiver)
+
+    assert [call[0] for call in receiver.change_message_visibility.call_args_list] == [
+        (messages[0], 2), (messages[1], 8)
+    ]
+    receiver.delete_messages.assert_not_called()
+
+
+def test_exhausted_messages_are_retried_without_dead_letter_queue():
+    receiver = MagicMock()
+    message = _message('a', 10)
+
+    FailurePolicy(max_attempts=3).handle_failures([(message, RuntimeError())], receiver)
+
+    receiver.change_message_visibility.assert_called_once_with(message, 900)
+
+
+def test_exhausted_messages_are_forwarded_to_dead_letter_queue():
+    receiver = MagicMock()
+    dead_letter_queue = MagicMock()
+    dead_letter_queue.publish_raw_messages.return_value = ['dlq-a', None]
+    retried, forwarded, not_forwarded = _message('a', 1), _message('b', 3), _message('c', 4)
+    failures = [(message, RuntimeError()) for message in (retried, forwarded, not_forwarded)]
+
+    FailurePolicy(max_attempts=3, dead_letter_queue=dead_letter_queue).handle_failures(failures, receiver)
+
+    dead_letter_queue.publish_raw_messages.assert_called_once_with(['body of b', 'body of c'])
+    receiver.delete_messages.assert_called_once_with([forwarded])
+    receiver.change_message_visibility.assert_called_once_with(retried, 5)
+
+
+def test_invalid_max_attempts():
+    with pytest.raises(ValueError):
+        FailurePolicy(max_attempts=0)
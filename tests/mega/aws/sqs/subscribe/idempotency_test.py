@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.aws.sqs.subscribe.idempotency import MemoryIdempotencyStore, SqliteIdempotencyStore, \
+    RedisIdempotencyStore, idempotency_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self, clock):
+        self.clock = clock
+        self.values = {}
+
+    def exists(self, key):
+        value = self.values.get(key)
+        return int(value is not None and value[1] > self.clock())
+
+    def set(self, key, value, ex=None):
+        self.values[key] = (value, self.clock() + ex)
+
+
+STORES = [
+    ('memory', lambda clock: MemoryIdempotencyStore(ttl=60, clock=clock)),
+    ('sqlite', lambda clock: SqliteIdempotencyStore(ttl=60, clock=clock)),
+    ('redis', lambda clock: RedisIdempotencyStore(FakeRedis(clock), ttl=60)),
+]
+
+
+@parameterized.expand(STORES)
+def test_store_remembers_processed_keys(_, build_store):
+    store = build_store(Clock())
+
+    assert not store.is_processed('a')
+    store.mark_processed('a')
+    assert store.is_processed('a')
+    assert not store.is_processed('b')
+
+
+@parameterized.expand(STORES)
+def test_store_forgets_processed_keys_after_ttl(_, build_store):
+    clock = Clock()
+    store = build_store(clock)
+    store.mark_processed('a')
+
+    clock.now += 59
+    assert store.is_processed('a')
+    clock.now += 1
+    assert not store.is_processed('a')
+
+
+def test_memory_store_forgets_least_recently_processed_keys():
+    store = MemoryIdempotencyStore(max_size=2)
+    for key in ('a', 'b', 'a', 'c'):
+        store.mark_processed(key)
+
+    assert len(store) == 2
+    assert [store.is_processed(key) for key in ('a', 'b', 'c')] == [True, False, True]
+
+
+def test_memory_store_rejects_invalid_max_size():
+    with pytest.raises(ValueError):
+        MemoryIdempotencyStore(max_size=0)
+
+
+def test_sqlite_store_is_shared_by_threads(tmp_path):
+    store = SqliteIdempotencyStore(str(tmp_path / 'processed.db'))
+    threads = [threading.Thread(target=store.mark_processed, args=(str(i),)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    other = SqliteIdempotencyStore(str(tmp_path / 'processed.db'))
+    assert all(other.is_processed(str(i)) for i in range(10))
+    store.close()
+    other.close()
+
+
+def test_sqlite_store_deletes_expired_keys_with_an_index(tmp_path):
+    path = str(tmp_path / 'processed.db')
+    SqliteIdempotencyStore(path).close()
+
+    connection = sqlite3.connect(path)
+    plan = connection.execute(
+        'EXPLAIN QUERY PLAN DELETE FROM processed_messages WHERE expiration <= ?', (0,)
+    ).fetchall()
+    connection.close()
+    assert any('processed_messages_expiration' in row[-1] for row in plan)
+
+
+def test_idempotency_key():
+    message = MagicMock(message_id='sqs-id', embedded_message=None)
+    assert idempotency_key(message) == 'sqs-id'
+
+    message.embedded_message = MagicMock(message_id='sns-id')
+    assert idempotency_key(message) == 'sns-id'
+
+    assert idempotency_key({'message_id': 'gcloud-id'}) == 'gcloud-id'
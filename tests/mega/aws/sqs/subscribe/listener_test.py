@@ -0,0 +1,220 @@
+from unittest.mock import MagicMock, PropertyMock, patch
+
+from sqs_mega_python_zwap.aws.metrics import HANDLER_SECONDS, ERRORS, HANDLE
+from sqs_mega_python_zwap.aws.sqs.subscribe.executor import KeyedExecutor
+from sqs_mega_python_zwap.aws.sqs.subscribe.idempotency import MemoryIdempotencyStore
+from sqs_mega_python_zwap.aws.sqs.subscribe.listener import SqsListener
+from sqs_mega_python_zwap.aws.sqs.subscribe.throttling import RouteLimit
+from sqs_mega_python_zwap.match.functions import gt, match
+from sqs_mega_python_zwap.match.parallel import ParallelPatternSet
+
+
+def _message(name, attributes):
+    message = MagicMock()
+    message.payload.event.name = name
+    message.payload.event.attributes = attributes
+    message.payload.event.publisher = 'test'
+    message.receive_count = 1
+    return message
+
+
+MESSAGES = [
+    _message('item.added', {'quantity': 2}),
+    _message('item.removed', {'quantity': 0}),
+    _message('cart.created', {}),
+]
+
+
+def test_is_gcloud_reads_the_settings_once():
+    is_gcloud = PropertyMock(return_value=True)
+    settings = MagicMock()
+    type(settings).IS_GCLOUD = is_gcloud
+    listener = SqsListener({'item': MagicMock()})
+
+    with patch('django.conf.settings', settings):
+        listener.handle_batch([{'event_name': 'item.added'}, {'event_name': 'item.removed'}])
+        assert listener.is_gcloud is True
+
+    is_gcloud.assert_called_once_with()
+
+
+def test_handle_batch_matching_topics():
+    added, item = MagicMock(), MagicMock()
+    listener = SqsListener({'item.added': added, r'item\..*': item})
+
+    assert listener.handle_batch(MESSAGES).handled == MESSAGES
+    assert added.call_count == 1
+    assert [call[0][0]['event_name'] for call in item.call_args_list] == ['item.added', 'item.removed']
+
+
+def test_handle_batch_matching_patterns_in_pattern_pool():
+    added, item = MagicMock(), MagicMock()
+    patterns = {
+        'added': {'event_name': 'item.added', 'event_data': {'quantity': gt(0)}},
+        'item': {'event_name': match(r'item\..*')},
+    }
+
+    with ParallelPatternSet(patterns, processes=2) as pool:
+        listener = SqsListener({'added': added, 'item': item}, pattern_pool=pool)
+        assert listener.handle_batch(MESSAGES).handled == MESSAGES
+
+    added.assert_called_once_with({'event_name': 'item.added', 'event_data': {'quantity': 2}, 'publisher': 'test'})
+    assert [call[0][0]['event_name'] for call in item.call_args_list] == ['item.added', 'item.removed']
+
+
+def test_swap_routes_while_handling_messages():
+    item = MagicMock()
+    listener = SqsListener({})
+    swapped = []
+
+    def added(data):
+        swapped.append(listener.swap_routes(listener.routes.replace(topic_callbacks={r'item\..*': item})))
+
+    listener.swap_routes(listener.routes.replace(topic_callbacks={'item.added': added}))
+
+    # The batch keeps the routes it started with
+    assert listener.handle_batch(MESSAGES).handled == MESSAGES
+    assert item.call_count == 0
+
+    assert listener.handle_batch(MESSAGES).handled == MESSAGES
+    assert len(swapped) == 1
+    assert item.call_count == 2
+    assert swapped[0].route({'event_name': 'item.added'}) == [added]
+
+
+def test_handle_batch_in_order_and_skips_group_after_failure():
+    messages = [_message('item.added', {'index': index}) for index in range(6)]
+    for index, message in enumerate(messages):
+        message.message_group_id = 'group-{}'.format(index % 2)
+    messages[2].payload.event.name = 'item.failed'
+    handled = []
+
+    def callback(data):
+        if data['event_name'] == 'item.failed':
+            raise RuntimeError('Callback failed')
+        handled.append(data['event_data']['index'])
+
+    with KeyedExecutor(2) as executor:
+        listener = SqsListener({'item': callback}, executor=executor)
+        assert listener.handle_batch(messages).handled == [messages[0], messages[1], messages[3], messages[5]]
+
+    assert [index for index in handled if index % 2 == 1] == [1, 3, 5]
+    assert [index for index in handled if index % 2 == 0] == [0]
+
+
+def test_handle_batch_skips_callbacks_of_processed_messages():
+    callback = MagicMock()
+    messages = [_message('item.added', {'index': index}) for index in range(3)]
+    for index, message in enumerate(messages):
+        message.message_id = 'message-{}'.format(index)
+        message.embedded_message = None
+
+    listener = SqsListener({'item': callback}, idempotency_store=MemoryIdempotencyStore())
+    assert listener.handle_batch(messages[:2]).handled == messages[:2]
+    assert listener.handle_batch(messages).handled == messages
+
+    assert [call[0][0]['event_data']['index'] for call in callback.call_args_list] == [0, 1, 2]
+
+
+def test_handle_batch_does_not_mark_failed_messages_as_processed():
+    message = _message('item.added', {})
+    message.message_id = 'message'
+    message.embedded_message = None
+    error = RuntimeError('Callback failed')
+    callback = MagicMock(side_effect=[error, None])
+    store = MemoryIdempotencyStore()
+    listener = SqsListener({'item': callback}, idempotency_store=store)
+
+    assert listener.handle_batch([message]).failed == [(message, error)]
+    assert not store.is_processed('message')
+
+    assert listener.handle_batch([message]).handled == [message]
+    assert store.is_processed('message')
+
+
+def test_handle_batch_extends_visibility_of_throttled_messages():
+    receiver = MagicMock(visibility_timeout=30)
+    callback, other = MagicMock(), MagicMock()
+    limit = RouteLimit(rate=10, burst=1)
+    listener = SqsListener({'item': callback, 'cart': other}, listener=receiver, route_limits={'item': limit})
+
+    messages = [_message('item.added', {}), _message('item.removed', {}), _message('cart.created', {})]
+    assert listener.handle_batch(messages).handled == messages
+
+    assert callback.call_count == 2
+    assert other.call_count == 1
+    receiver.change_message_visibility.assert_called_once_with(messages[1], 31)
+
+
+def test_process_batch_isolates_failures_and_deletes_handled_messages_at_once():
+    receiver = MagicMock()
+    failure_policy = MagicMock()
+    messages = [_message('item.added', {}), _message('item.failed', {}), _message('item.removed', {})]
+    error = RuntimeError('Callback failed')
+
+    def callback(data):
+        if data['event_name'] == 'item.failed':
+            raise error
+
+    listener = SqsListener({'item': callback}, listener=receiver, failure_policy=failure_policy)
+    result = listener.process_batch(messages)
+
+    assert result.handled == [messages[0], messages[2]]
+    assert result.failed == [(messages[1], error)]
+    receiver.delete_messages.assert_called_once_with([messages[0], messages[2]])
+    failure_policy.handle_failures.assert_called_once_with([(messages[1], error)], receiver)
+
+
+def test_handle_batch_metrics():
+    metrics = MagicMock()
+    error = RuntimeError('Callback failed')
+
+    def callback(data):
+        if data['event_name'] == 'item.removed':
+            raise error
+
+    listener = SqsListener({r'item\..*': callback, 'item.added': MagicMock()}, metrics=metrics)
+    result = listener.handle_batch(MESSAGES[:2])
+
+    assert result.failed == [(MESSAGES[1], error)]
+    assert [call[0][2] for call in metrics.observe.call_args_list] == [(r'item\..*',), ('item.added',), (r'item\..*',)]
+    assert all(call[0][0] is HANDLER_SECONDS for call in metrics.observe.call_args_list)
+    assert [call[0][1] for call in metrics.add.call_args_list] == [1, -1, 1, -1]
+    metrics.increment.assert_called_once_with(ERRORS, HANDLE)
+
+
+def test_process_batch_fails_messages_whose_data_cannot_be_extracted():
+    receiver = MagicMock()
+    failure_policy = MagicMock()
+    callback = MagicMock()
+    data_message = MagicMock(payload={'order_id': 987650}, receive_count=1)
+    messages = [_message('item.added', {}), data_message]
+
+    listener = SqsListener({'item': callback}, listener=receiver, failure_policy=failure_policy)
+    result = listener.process_batch(messages)
+
+    assert result.handled == [messages[0]]
+    assert [message for message, _ in result.failed] == [data_message]
+    assert isinstance(result.failed[0][1], AttributeError)
+    callback.assert_called_once()
+    receiver.delete_messages.assert_called_once_with([messages[0]])
+    failure_policy.handle_failures.assert_called_once_with(result.failed, receiver)
+
+
+def test_handle_batch_routes_messages_one_by_one_when_the_batch_cannot_be_routed():
+    def matches(data):
+        if any(message_data['event_name'] == 'item.invalid' for message_data in data):
+            raise ValueError('Invalid message')
+        return [['item'] for _ in data]
+
+    patterns = MagicMock(spec=ParallelPatternSet)
+    patterns.matches.side_effect = matches
+    callback = MagicMock()
+    messages = [_message('item.added', {}), _message('item.invalid', {}), _message('item.removed', {})]
+
+    listener = SqsListener({'item': callback}, pattern_pool=patterns)
+    result = listener.handle_batch(messages)
+
+    assert result.handled == [messages[0], messages[2]]
+    assert [message for message, _ in result.failed] == [messages[1]]
+    assert [call[0][0]['event_name'] for call in callback.call_args_list] == ['item.added', 'item.removed']
@@ -0,0 +1,173 @@
+import threading
+from collections import Counter
+from unittest.mock import MagicMock
+
+import pytest
+
+from sqs_mega_python_zwap.aws.sqs.subscribe.multi_queue import MultiQueueListener, QueueScheduler, QueueSource
+
+
+def _message(name):
+    message = MagicMock()
+    message.payload.event.name = name
+    message.payload.event.attributes = {}
+    message.payload.event.publisher = 'test'
+    message.receive_count = 1
+    return message
+
+
+def _receiver(queue_url, *batches):
+    batches = list(batches)
+
+    def receive_messages():
+        if batches:
+            return batches.pop(0)
+        threading.Event().wait(0.01)
+        return []
+
+    receiver = MagicMock()
+    receiver.queue_url = queue_url
+    receiver.receive_messages.side_effect = receive_messages
+    return receiver
+
+
+def _source(name, **kwargs):
+    return QueueSource(MagicMock(queue_url=name), **kwargs)
+
+
+def _pop_all(scheduler, count):
+    popped = []
+    for _ in range(count):
+        source, _ = scheduler.pop()
+        scheduler.done(source)
+        popped.append(source.name)
+    return popped
+
+
+def test_scheduler_shares_messages_in_proportion_to_weights():
+    heavy, light = _source('heavy', weight=3), _source('light')
+    scheduler = QueueScheduler([heavy, light])
+    scheduler.push(heavy, [object()] * 100)
+    scheduler.push(light, [object()] * 100)
+
+    assert Counter(_pop_all(scheduler, 40)) == {'heavy': 30, 'light': 10}
+
+
+def test_scheduler_drains_higher_priority_queues_first():
+    high, low = _source('high', priority=1), _source('low', weight=10)
+    scheduler = QueueScheduler([low, high])
+    scheduler.push(low, [object()] * 3)
+    scheduler.push(high, [object()] * 2)
+
+    assert _pop_all(scheduler, 5) == ['high', 'high', 'low', 'low', 'low']
+    assert scheduler.pop() is None
+
+
+def test_scheduler_does_not_give_credit_to_idle_queues():
+    busy, idle = _source('busy'), _source('idle')
+    scheduler = QueueScheduler([busy, idle])
+    scheduler.push(busy, [object()] * 20)
+    _pop_all(scheduler, 10)
+
+    scheduler.push(idle, [object()] * 10)
+    assert Counter(_pop_all(scheduler, 10)) == {'busy': 5, 'idle': 5}
+
+
+def test_scheduler_enforces_max_concurrency():
+    capped, other = _source('capped', max_concurrency=1), _source('other')
+    scheduler = QueueScheduler([capped, other])
+    scheduler.push(capped, [object()] * 2)
+
+    source, _ = scheduler.pop()
+    assert source is capped
+    assert scheduler.pop() is None
+    assert not scheduler.ready
+    assert not scheduler.can_receive(capped)
+    assert scheduler.can_receive(other)
+
+    scheduler.done(capped)
+    assert scheduler.ready
+    assert scheduler.pop()[0] is capped
+    assert scheduler.pending(capped) == 0
+    assert scheduler.in_flight(capped) == 1
+
+
+@pytest.mark.parametrize('kwargs', [{'weight': 0}, {'max_concurrency': 0}])
+def test_queue_source_rejects_invalid_parameters(kwargs):
+    with pytest.raises(ValueError):
+        _source('queue', **kwargs)
+
+
+def test_listener_handles_and_deletes_messages_of_all_queues():
+    orders = _receiver('orders', [_message('order.created'), _message('order.paid')])
+    carts = _receiver('carts', [_message('cart.created')], [_message('cart.deleted')])
+    handled = []
+    lock = threading.Lock()
+
+    def callback(data):
+        with lock:
+            handled.append(data['event_name'])
+            if len(handled) == 4:
+                listener.stop()
+
+    listener = MultiQueueListener(
+        [QueueSource(orders, weight=2), QueueSource(carts, max_concurrency=1)],
+        {'.*': callback},
+        max_workers=2
+    )
+    _run(listener)
+
+    assert sorted(handled) == ['cart.created', 'cart.deleted', 'order.created', 'order.paid']
+    assert orders.delete_message.call_count == 2
+    assert carts.delete_message.call_count == 2
+
+
+def test_listener_retries_messages_whose_callbacks_fail():
+    failed, succeeded = _message('failed'), _message('succeeded')
+    receiver = _receiver('queue', [failed, succeeded])
+    done = threading.Event()
+
+    def callback(data):
+        if data['event_name'] == 'failed':
+            raise RuntimeError('Callback failed')
+        done.set()
+
+    listener = MultiQueueListener([QueueSource(receiver)], {'.*': callback}, max_workers=1)
+    thread = threading.Thread(target=listener.listener)
+    thread.start()
+    assert done.wait(5)
+    listener.stop()
+    thread.join(5)
+
+    receiver.delete_message.assert_called_once_with(succeeded)
+    receiver.change_message_visibility.assert_called_once_with(failed, 5)
+
+
+def test_listener_skips_messages_of_a_group_after_a_failure():
+    first, second, other = _message('first'), _message('second'), _message('other')
+    first.message_group_id = second.message_group_id = 'group'
+    other.message_group_id = None
+    receiver = _receiver('queue.fifo', [first, second, other])
+    handled = []
+
+    def callback(data):
+        handled.append(data['event_name'])
+        if data['event_name'] == 'first':
+            raise RuntimeError('Callback failed')
+        listener.stop()
+
+    listener = MultiQueueListener([QueueSource(receiver)], {'.*': callback}, max_workers=1)
+    _run(listener)
+
+    assert handled == ['first', 'other']
+    receiver.delete_message.assert_called_once_with(other)
+    receiver.change_message_visibility.assert_called_once_with(first, 5)
+
+
+def _run(listener):
+    thread = threading.Thread(target=listener.listener)
+    thread.start()
+    thread.join(5)
+    if thread.is_alive():
+        listener.stop()
+        pytest.fail('Listener did not stop')
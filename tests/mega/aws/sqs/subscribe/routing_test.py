@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from sqs_mega_python_zwap.aws.sqs.subscribe.routing import RoutingTable
+from sqs_mega_python_zwap.match.functions import match
+from sqs_mega_python_zwap.match.pattern_set import PatternSet
+
+ADDED = {'event_name': 'item.added', 'event_data': {}, 'publisher': 'test'}
+CREATED = {'event_name': 'cart.created', 'event_data': {}, 'publisher': 'test'}
+
+
+def test_route_topics():
+    added, item = MagicMock(), MagicMock()
+    routes = RoutingTable({'item.added': added, r'item\..*': item})
+
+    assert routes.route(ADDED) == [added, item]
+    assert routes.route(CREATED) == []
+    assert routes.route({'event_name': None}) == []
+    assert routes.route_keys(ADDED) == ['item.added', r'item\..*']
+
+
+def test_route_all_topics():
+    callback = MagicMock()
+    routes = RoutingTable({'*': callback}, all_topics=True)
+
+    assert routes.route_all([ADDED, CREATED]) == [[callback], [callback]]
+
+
+def test_route_patterns():
+    item, missing = MagicMock(), MagicMock()
+    patterns = PatternSet({'item': {'event_name': match(r'item\..*')}, 'unknown': {'publisher': 'test'}})
+    routes = RoutingTable({'item': item, 'missing': missing}, patterns=patterns)
+
+    assert routes.route_all([ADDED, CREATED]) == [[item], []]
+    assert routes.route(ADDED) == [item]
+    assert routes.route_all_keys([ADDED, CREATED]) == [['item'], []]
+
+
+def test_routing_table_is_copied_on_write():
+    added, created = MagicMock(), MagicMock()
+    topic_callbacks = {'item.added': added}
+    routes = RoutingTable(topic_callbacks)
+    topic_callbacks['cart.created'] = created
+
+    updated = routes.with_callbacks({'cart.created': created})
+    removed = updated.without_callbacks(['item.added'])
+
+    assert routes.route(CREATED) == []
+    assert updated.route(CREATED) == [created]
+    assert removed.route(ADDED) == []
+    assert removed.route(CREATED) == [created]
+    with pytest.raises(TypeError):
+        routes.topic_callbacks['cart.created'] = created
+
+
+def test_replace_patterns():
+    item = MagicMock()
+    routes = RoutingTable({'item': item}, patterns=PatternSet({'item': {'event_name': 'cart.created'}}))
+
+    replaced = routes.replace(patterns=PatternSet({'item': {'event_name': 'item.added'}}))
+
+    assert routes.route(ADDED) == []
+    assert replaced.route(ADDED) == [item]
+    # Without patterns, keys are topics again
+    assert replaced.replace(patterns=None).route(CREATED) == []
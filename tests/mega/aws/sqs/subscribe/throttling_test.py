@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.aws.sqs.subscribe.throttling import TokenBucket, RouteLimit
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_bursts_then_spaces_reservations():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+    assert [bucket.reserve() for _ in range(5)] == [0, 0, 0, 0.5, 1.0]
+
+
+def test_token_bucket_refills_up_to_burst():
+    clock = Clock()
+    bucket = TokenBucket(rate=1, burst=2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now += 10
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 1.0]
+
+
+@parameterized.expand([
+    ({'rate': 0},),
+    ({'rate': 1, 'burst': 0.5},),
+])
+def test_token_bucket_rejects_invalid_parameters(kwargs):
+    with pytest.raises(ValueError):
+        TokenBucket(**kwargs)
+
+
+def test_route_limit_waits_for_tokens():
+    clock = Clock()
+    limit = RouteLimit(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+    waits = []
+
+    for _ in range(3):
+        limit.acquire(waits.append)
+        limit.release()
+
+    assert waits == [1.0, 1.0]
+    assert clock.now == 1002.0
+
+
+def test_route_limit_waits_for_free_slots():
+    limit = RouteLimit(max_concurrency=1)
+    waits = []
+    limit.acquire(waits.append)
+
+    acquired = threading.Event()
+
+    def acquire():
+        limit.acquire(waits.append, wait_step=0.01)
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.05)
+    assert waits and set(waits) == {0.01}
+
+    limit.release()
+    assert acquired.wait(5)
+    thread.join()
+    limit.release()
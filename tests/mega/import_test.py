@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from parameterized import parameterized
+
+import sqs_mega_python_zwap
+
+# Dependencies that are slow to import, and are only imported when they are used
+HEAVY_DEPENDENCIES = ('boto3', 'botocore', 'marshmallow', 'bson', 'dateutil', 'django', 'numpy')
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(sqs_mega_python_zwap.__file__)))
+
+
+def imported_modules(module):
+    """
+    Imports a module in a new interpreter with ``-X importtime``, and returns the cumulative import time in
+    microseconds of each module that was imported.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+        cwd=PACKAGE_ROOT, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, universal_newlines=True, check=True
+    )
+
+    modules = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+@parameterized.expand([
+    ['sqs_mega_python_zwap', HEAVY_DEPENDENCIES],
+    ['sqs_mega_python_zwap.match.evaluation', HEAVY_DEPENDENCIES],
+    ['sqs_mega_python_zwap.match.compilation', HEAVY_DEPENDENCIES],
+    ['sqs_mega_python_zwap.match.pattern_set', HEAVY_DEPENDENCIES],
+    ['sqs_mega_python_zwap.match.serialization', HEAVY_DEPENDENCIES],
+    ['sqs_mega_python_zwap.match.raw_json', HEAVY_DEPENDENCIES],
+    ['sqs_mega_python_zwap.aws.encoding', HEAVY_DEPENDENCIES],
+    ['sqs_mega_python_zwap.aws.clients', HEAVY_DEPENDENCIES],
+    ['sqs_mega_python_zwap.aws.sqs.subscribe.listener', ('boto3', 'botocore', 'bson', 'django', 'numpy')],
+    ['sqs_mega_python_zwap.aws.sqs.publish', ('boto3', 'botocore', 'bson', 'django', 'numpy')],
+])
+def test_import_does_not_load_heavy_dependencies(module, dependencies):
+    modules = imported_modules(module)
+
+    assert module in modules
+    assert sorted(name for name in modules if name.split('.')[0] in dependencies) == []
@@ -0,0 +1,75 @@
+from datetime import datetime, date
+
+import pytest
+from dateutil.tz import tzutc
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.evaluation import evaluate
+from sqs_mega_python_zwap.match.functions import and_, or_, not_, eq, gt, gte, lt, lte, match, one_of, in_
+from sqs_mega_python_zwap.match.values.value import LeftHandSideTypeError
+
+numpy = pytest.importorskip('numpy')
+from sqs_mega_python_zwap.match.batch import evaluate_batch  # noqa: E402
+
+UTC = tzutc()
+
+EVENTS = [
+    {'event': {'name': 'item.added', 'version': 1, 'timestamp': '2020-05-04T15:53:23', 'quantity': 5}},
+    {'event': {'name': 'item.removed', 'version': 2, 'timestamp': '2020-05-04T15:53:23+03:00', 'quantity': 0}},
+    {'event': {'name': 'item.added', 'version': 2.5, 'timestamp': datetime(2021, 1, 1, tzinfo=UTC)}},
+    {'event': {'name': 'cart.created', 'version': 3, 'timestamp': datetime(2020, 12, 31, 23, 59, 59)}},
+    {'event': {'name': None, 'version': 1, 'timestamp': '2020-05-04', 'quantity': 1.5}},
+    {'event': {'name': '', 'timestamp': date(2020, 5, 4)}},
+    {'event': {}},
+    {'extra': {'channel': 'web'}},
+    {},
+    None,
+]
+
+
+@parameterized.expand([
+    [{'event': {'name': 'item.added'}}],
+    [{'event': {'name': ''}}],
+    [{'event': {'name': one_of('item.added', 'item.removed')}}],
+    [{'event': {'name': not_(in_(['cart.created', None]))}}],
+    [{'event': {'name': match(r'item\..*')}}],
+    [{'event': {'name': lambda name: bool(name) and name.startswith('cart')}}],
+    [{'event': {'version': and_(gte(1), lte(2))}}],
+    [{'event': {'version': or_(eq(3), lt(2))}}],
+    [{'event': {'version': not_(one_of(1, 2))}}],
+    [{'event': {'timestamp': gt(datetime(2020, 5, 4, 15, 0, 0))}}],
+    [{'event': {'timestamp': lt(datetime(2021, 1, 1, tzinfo=UTC)), 'quantity': gt(0)}}],
+    [{'event': {'name': 'item.added', 'quantity': not_(0)}, 'extra': {'channel': 'web'}}],
+    [or_(eq({'extra': {'channel': 'web'}}), eq({'event': {'version': 3}}))],
+    [{}],
+])
+def test_evaluate_batch_is_equivalent_to_evaluate(rhs):
+    expected = [evaluate(lhs, rhs) for lhs in EVENTS]
+
+    mask = evaluate_batch(EVENTS, rhs)
+
+    assert mask.dtype == bool
+    assert mask.tolist() == expected
+
+
+def test_evaluate_batch_returns_indices():
+    indices = evaluate_batch(EVENTS, {'event': {'name': 'item.added'}}, indices=True)
+    assert indices.tolist() == [0, 2, 6, 7, 8]
+
+
+def test_evaluate_batch_with_scalar_values():
+    assert evaluate_batch([1, 5, 10, 2.5], and_(gt(2), lt(10))).tolist() == [False, True, False, True]
+
+
+def test_evaluate_batch_with_no_values():
+    assert evaluate_batch([], {'event': {'name': 'item.added'}}).tolist() == []
+
+
+def test_evaluate_batch_short_circuits_like_evaluate():
+    values = [None, 10, 1]
+    assert evaluate_batch(values, or_(eq(None), gt(5))).tolist() == [True, True, False]
+
+
+def test_evaluate_batch_raises_incompatible_types():
+    with pytest.raises(LeftHandSideTypeError):
+        evaluate_batch(EVENTS, {'event': {'name': gt(1)}})
@@ -0,0 +1,202 @@
+import pickle
+from datetime import date
+
+import pytest
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.compilation import compile_pattern
+from sqs_mega_python_zwap.match.evaluation import evaluate, evaluate_result
+from sqs_mega_python_zwap.match.functions import and_, or_, not_, eq, gt, lt, match, one_of, Equal
+from sqs_mega_python_zwap.match.functions.adaptive import AdaptiveAnd, AdaptiveOr
+from sqs_mega_python_zwap.match.types import MatchResult
+from sqs_mega_python_zwap.match.values.value import LeftHandSideTypeError
+
+PATTERN = {
+    'event': {
+        'name': or_(eq('item.added'), eq('item.removed'), match(r'item\..*')),
+        'version': and_(gt(0), lt(3)),
+        'timestamp': and_(gt(date(2020, 1, 1)), lt(date(2021, 1, 1))),
+    },
+    'object': {
+        'current': {
+            'items': [{'quantity': gt(0)}],
+            'currency': not_(one_of('EUR', 'GBP')),
+        }
+    }
+}
+
+
+PATTERN_CASES = [
+    {},
+    {'event': {'name': 'item.added', 'version': 2, 'timestamp': '2020-05-04T15:53:23'}},
+    {'event': {'name': 'item.changed', 'version': 1, 'timestamp': date(2020, 12, 31)}},
+    {'event': {'name': 'cart.created', 'version': 1, 'timestamp': '2020-05-04'}},
+    {'event': {'name': 'item.added', 'version': 3, 'timestamp': '2020-05-04'}},
+    {'event': {'name': 'item.added', 'version': 2, 'timestamp': '2021-05-04'}},
+    {'object': {'current': {'items': [{'quantity': 0}, {'quantity': 2}], 'currency': 'USD'}}},
+    {'object': {'current': {'items': [{'quantity': 0}], 'currency': 'USD'}}},
+    {'object': {'current': {'items': [{'quantity': 5}], 'currency': 'EUR'}}},
+]
+
+
+@parameterized.expand([
+    [lhs]
+    for lhs in PATTERN_CASES
+])
+def test_compiled_pattern_is_equivalent_to_pattern(lhs):
+    compiled = compile_pattern(PATTERN)
+    for _ in range(3):
+        assert compiled.evaluate(lhs) is evaluate(lhs, PATTERN)
+
+
+MIXED_PATTERNS = [
+    and_(match(r'foo.*'), gt(1)),
+    and_(gt(1), match(r'foo.*')),
+    or_(match(r'b.*'), gt(1)),
+    or_(gt(1), match(r'b.*')),
+    not_(or_(match(r'b.*'), gt(1))),
+    or_(and_(match(r'b.*'), lt(5)), eq(2)),
+    and_(or_(gt(1), match(r'b.*')), not_(lt(0))),
+]
+
+MIXED_VALUES = ['bar', 'foo', '5', 0, 2, 10, None, True]
+
+
+def _outcome(function):
+    try:
+        return function()
+    except LeftHandSideTypeError:
+        return LeftHandSideTypeError
+
+
+@parameterized.expand([
+    [pattern, lhs]
+    for pattern in MIXED_PATTERNS
+    for lhs in MIXED_VALUES
+])
+def test_compiled_pattern_is_equivalent_to_pattern_on_mixed_types(pattern, lhs):
+    compiled = compile_pattern({'name': pattern})
+    expected = (
+        _outcome(lambda: evaluate({'name': lhs}, {'name': pattern})),
+        evaluate_result({'name': lhs}, {'name': pattern})
+    )
+
+    for _ in range(3):
+        outcome = _outcome(lambda: compiled.evaluate({'name': lhs})), compiled.evaluate_result({'name': lhs})
+        # Where declaration order mismatches, the function that mismatches may be skipped by the compiled pattern
+        if expected[1] is not MatchResult.TYPE_MISMATCH:
+            assert outcome == expected
+
+
+def test_compiled_pattern_evaluates_in_declaration_order_after_type_mismatch():
+    assert compile_pattern(and_(match(r'foo.*'), gt(1))).evaluate('bar') is False
+    assert compile_pattern(or_(match(r'b.*'), gt(1))).evaluate('bar') is True
+    assert compile_pattern({'name': or_(match(r'b.*'), gt(1))}).evaluate_result({'name': 'bar'}) is MatchResult.MATCH
+    assert compile_pattern(or_(gt(1), match(r'b.*'))).evaluate_result(2) is MatchResult.MATCH
+
+    with pytest.raises(LeftHandSideTypeError):
+        compile_pattern(and_(gt(1), match(r'foo.*'))).evaluate('bar')
+
+
+def test_compile_flattens_nested_combined_functions():
+    compiled = compile_pattern(and_(gt(1), and_(lt(10), and_(not_(5), not_(6))), or_(eq(2), eq(3))))
+
+    assert type(compiled) is AdaptiveAnd
+    assert len(compiled.rhs) == 5
+    assert type(compiled.rhs[4]) is AdaptiveOr
+
+
+def test_compile_orders_functions_by_estimated_cost():
+    expensive = match(r'^foo.*bar$')
+    cheap = eq('foobar')
+    compiled = compile_pattern(and_(expensive, eq({'a': 1}), cheap))
+
+    assert [compiled.rhs[i] for i in compiled.order][0] is cheap
+
+
+def test_adaptive_and_evaluates_the_most_selective_function_first():
+    calls = []
+
+    def rarely_fails(lhs):
+        calls.append('rarely_fails')
+        return True
+
+    def often_fails(lhs):
+        calls.append('often_fails')
+        return lhs > 90
+
+    compiled = AdaptiveAnd([rarely_fails, often_fails], reorder_interval=10)
+    for i in range(100):
+        compiled.evaluate(i)
+
+    calls.clear()
+    assert compiled.evaluate(1) is False
+    assert calls == ['often_fails']
+
+
+def test_adaptive_or_evaluates_the_most_selective_function_first():
+    compiled = AdaptiveOr([eq(1), eq(2)], reorder_interval=10)
+    for _ in range(20):
+        compiled.evaluate(2)
+
+    assert compiled.order == (1, 0)
+
+
+def test_adaptive_functions_reorder_after_lost_updates():
+    # Concurrent evaluations may lose updates of the statistics, leaving more passes than evaluations
+    compiled = AdaptiveAnd([eq(1), eq(2)], reorder_interval=1)
+    compiled.evaluations[:] = [3, 3]
+    compiled.passes[:] = [4, 0]
+
+    assert compiled.evaluate(2) is False
+    assert compiled.order == (1, 0)
+
+
+def test_compiled_value_functions_are_kept():
+    function = eq('foo')
+    assert compile_pattern(function) is function
+    assert type(compile_pattern('foo')) is Equal
+
+
+def test_compiled_pattern_raises_incompatible_types():
+    with pytest.raises(LeftHandSideTypeError):
+        compile_pattern({'a': and_(gt(1), lt(5))}).evaluate({'a': 'foo'})
+
+
+def _nodes(node):
+    yield node
+
+    children = node.rhs
+    if isinstance(children, dict):
+        children = children.values()
+    elif not isinstance(children, (list, tuple)):
+        children = [children]
+
+    for child in children:
+        if hasattr(child, 'rhs'):
+            yield from _nodes(child)
+
+
+def test_compiled_pattern_nodes_have_no_instance_dict():
+    compiled = compile_pattern(PATTERN, instrument=True)
+    nodes = list(_nodes(compiled))
+
+    assert len(nodes) > 10
+    for node in nodes:
+        assert not hasattr(node, '__dict__'), type(node).__name__
+
+
+@parameterized.expand([
+    [protocol]
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1)
+])
+def test_compiled_pattern_can_be_pickled(protocol):
+    lhs = {'event': {'name': 'item.added', 'version': 2, 'timestamp': '2020-05-04T15:53:23'}}
+    compiled = compile_pattern(PATTERN, instrument=True)
+    compiled.evaluate(lhs)
+
+    unpickled = pickle.loads(pickle.dumps(compiled, protocol=protocol))
+
+    assert unpickled.stats.calls == 1
+    for other in PATTERN_CASES:
+        assert unpickled.evaluate(other) is evaluate(other, PATTERN)
@@ -0,0 +1,71 @@
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.compilation import compile_pattern
+from sqs_mega_python_zwap.match.evaluation import evaluate, evaluate_result
+from sqs_mega_python_zwap.match.functions import and_, or_, not_, eq, gt, lt, match, one_of
+from sqs_mega_python_zwap.match.types import MatchResult
+from sqs_mega_python_zwap.match.values.value import LeftHandSideTypeError
+
+MATCH = MatchResult.MATCH
+NO_MATCH = MatchResult.NO_MATCH
+TYPE_MISMATCH = MatchResult.TYPE_MISMATCH
+
+CASES = [
+    ['foo', 'foo', MATCH],
+    ['bar', 'foo', NO_MATCH],
+    [5, 'foo', TYPE_MISMATCH],
+    ['5', gt(3), MATCH],
+    ['abc', gt(3), TYPE_MISMATCH],
+    [None, gt(3), TYPE_MISMATCH],
+    [None, eq(3), NO_MATCH],
+    ['2020-05-15', lt(date(2021, 1, 1)), MATCH],
+    ['foo', lt(date(2021, 1, 1)), TYPE_MISMATCH],
+    [1, not_(eq('foo')), TYPE_MISMATCH],
+    ['bar', not_(eq('foo')), MATCH],
+    [5, or_(eq(5), eq('foo')), MATCH],
+    [5, or_(eq('foo'), eq(5)), TYPE_MISMATCH],
+    [5, and_(eq(4), eq('foo')), NO_MATCH],
+    [5, and_(eq(5), eq('foo')), TYPE_MISMATCH],
+    ['b', one_of('a', 'b'), MATCH],
+    [True, one_of('a', 'b'), TYPE_MISMATCH],
+    [{'a': 1}, {'a': 1, 'b': 'x'}, MATCH],
+    [{'a': 1, 'b': 2}, {'a': 1, 'b': 'x'}, TYPE_MISMATCH],
+    [{'a': 2, 'b': 2}, {'a': 1, 'b': 'x'}, NO_MATCH],
+    [[{'a': 1}], [{'a': gt(0)}], MATCH],
+    [[{'a': 'x'}], [{'a': gt(0)}], TYPE_MISMATCH],
+    ['abc', match(r'^a'), MATCH],
+    [3, {'a': 1}, TYPE_MISMATCH],
+]
+
+
+@parameterized.expand(CASES)
+def test_evaluate_result(lhs, rhs, expected):
+    assert evaluate_result(lhs, rhs) is expected
+
+
+@parameterized.expand(CASES)
+def test_compiled_evaluate_result(lhs, rhs, expected):
+    compiled = compile_pattern(rhs, instrument=True)
+    assert compiled.evaluate_result(lhs) is expected
+    assert compiled.stats.errors == (expected is TYPE_MISMATCH)
+
+
+@parameterized.expand(CASES)
+def test_evaluate_result_is_type_mismatch_when_evaluate_raises(lhs, rhs, expected):
+    if expected is TYPE_MISMATCH:
+        with pytest.raises(LeftHandSideTypeError):
+            evaluate(lhs, rhs)
+    else:
+        assert evaluate(lhs, rhs) is (expected is MATCH)
+
+
+def test_evaluate_result_does_not_build_errors_for_scalar_mismatches():
+    with patch('sqs_mega_python_zwap.match.values.value.LeftHandSideTypeError') as error:
+        assert evaluate_result({'a': 'abc', 'b': 5}, {'a': gt(3), 'b': 'foo'}) is TYPE_MISMATCH
+        assert evaluate_result('abc', or_(eq('foo'), gt(3))) is TYPE_MISMATCH
+
+    error.assert_not_called()
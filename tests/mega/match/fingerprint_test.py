@@ -0,0 +1,60 @@
+from datetime import date, datetime, timezone, timedelta
+from decimal import Decimal
+
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.compilation import compile_pattern
+from sqs_mega_python_zwap.match.fingerprint import fingerprint, is_deterministic
+from sqs_mega_python_zwap.match.functions import and_, eq, gt, not_, one_of
+from sqs_mega_python_zwap.match.paths import MISSING, NULL
+from sqs_mega_python_zwap.match.values import Mapping
+
+
+@parameterized.expand([
+    [1, True],
+    [1, 1.0],
+    [1, Decimal(1)],
+    [1, '1'],
+    [0, None],
+    [[1], (1,)],
+    [{'a': 1}, {'a': True}],
+    [{1: 'a'}, {True: 'a'}],
+    [MISSING, NULL],
+    [None, NULL],
+    [datetime(2020, 1, 1, 0, 30, tzinfo=timezone(timedelta(hours=1))), datetime(2019, 12, 31, 23, 30, tzinfo=timezone.utc)],
+])
+def test_fingerprints_of_different_values(lhs, other):
+    assert fingerprint(lhs) != fingerprint(other)
+
+
+@parameterized.expand([
+    [{'a': [1, 'b', None], 'c': {'d': 1.5}}],
+    [date(2020, 1, 1)],
+    [MISSING],
+])
+def test_fingerprints_of_equal_values(lhs):
+    assert fingerprint(lhs) == fingerprint(lhs.copy() if isinstance(lhs, dict) else lhs)
+    assert hash(fingerprint(lhs)) == hash(fingerprint(lhs))
+
+
+def test_fingerprint_of_dicts_does_not_depend_on_key_order():
+    assert fingerprint({'a': 1, 'b': 2}) == fingerprint({'b': 2, 'a': 1})
+
+
+def test_fingerprint_of_unsupported_values():
+    assert fingerprint(object()) is None
+    assert fingerprint({'a': [{1, 2}]}) is None
+
+
+@parameterized.expand([
+    [1, True],
+    [{'a': gt(1), 'b': [one_of(1, 2)]}, True],
+    [compile_pattern(and_(gt(1), not_({'a': 1}))), True],
+    [Mapping({'a': eq(1)}), True],
+    [lambda x: True, False],
+    [{'a': {'b': lambda x: True}}, False],
+    [one_of(1, lambda x: True), False],
+    [compile_pattern(and_(gt(1), lambda x: True)), False],
+])
+def test_is_deterministic(rhs, expected):
+    assert is_deterministic(rhs) is expected
@@ -0,0 +1,75 @@
+import pytest
+
+from sqs_mega_python_zwap.match.compilation import compile_pattern
+from sqs_mega_python_zwap.match.functions import and_, not_, gt, lt, one_of, match
+from sqs_mega_python_zwap.match.functions.instrumented import InstrumentedFunction
+from sqs_mega_python_zwap.match.instrumentation import instrumented_nodes, report, prometheus_metrics
+from sqs_mega_python_zwap.match.values.value import LeftHandSideTypeError
+
+PATTERN = {
+    'event': {
+        'name': one_of('item.added', 'item.removed'),
+        'version': and_(gt(1), lt(4), not_(3)),
+        'subject': match(r'\d+'),
+    }
+}
+
+
+def _evaluate_events(pattern):
+    pattern.evaluate({'event': {'name': 'item.added', 'version': 2, 'subject': '123'}})
+    pattern.evaluate({'event': {'name': 'item.added', 'version': 3}})
+    pattern.evaluate({'event': {'name': 'cart.created', 'version': 2}})
+    with pytest.raises(LeftHandSideTypeError):
+        pattern.evaluate({'event': {'name': 'item.added', 'version': 'two'}})
+
+
+def test_compiled_pattern_is_not_instrumented_by_default():
+    pattern = compile_pattern(PATTERN)
+    assert not isinstance(pattern, InstrumentedFunction)
+    assert instrumented_nodes(pattern) == []
+
+
+def test_instrumented_pattern_records_statistics_per_node():
+    pattern = compile_pattern(PATTERN, instrument=True)
+    _evaluate_events(pattern)
+
+    nodes = {node.path: node for node in instrumented_nodes(pattern)}
+
+    assert nodes['/'].stats.calls == 4
+    assert nodes['/'].stats.hits == 1
+    assert nodes['/'].stats.misses == 2
+    assert nodes['/'].stats.errors == 1
+
+    assert nodes['/event/name'].stats.calls == 4
+    assert nodes['/event/name'].stats.hits == 3
+    assert nodes['/event/name'].label == 'In(Collection[2])'
+
+    assert nodes['/event/version'].stats.calls == 3
+    assert nodes['/event/version'].stats.errors == 1
+    assert nodes['/event/version/2/not'].label == 'Equal(Number 3)'
+
+    assert nodes['/event/subject'].stats.calls == 1
+    assert nodes['/'].stats.seconds >= nodes['/event'].stats.seconds > 0
+
+
+def test_report_formats_a_tree():
+    pattern = compile_pattern(PATTERN, instrument=True)
+    _evaluate_events(pattern)
+
+    lines = report(pattern).splitlines()
+
+    assert lines[0].startswith('/ Equal(Mapping[1]): calls=4 hits=1 (25.0%) errors=1 time=')
+    assert lines[1].startswith('  /event Equal(Mapping[3]): calls=4')
+    assert lines[2].startswith('    /event/name In(Collection[2]): calls=4 hits=3 (75.0%) errors=0')
+
+
+def test_prometheus_metrics():
+    pattern = compile_pattern(PATTERN, instrument=True)
+    _evaluate_events(pattern)
+
+    metrics = prometheus_metrics(pattern, labels={'subscription': 'items'}).splitlines()
+
+    assert '# TYPE sqs_mega_match_calls_total counter' in metrics
+    assert 'sqs_mega_match_calls_total{subscription="items",node="/event/name"} 4' in metrics
+    assert 'sqs_mega_match_errors_total{subscription="items",node="/"} 1' in metrics
+    assert 'sqs_mega_match_hits_total{subscription="items",node="/event/version/0"} 2' in metrics
@@ -0,0 +1,58 @@
+import json
+from datetime import date
+
+import pytest
+
+from sqs_mega_python_zwap.match.functions import and_, gt, lt, match, not_, one_of
+from sqs_mega_python_zwap.match.parallel import ParallelPatternSet
+from sqs_mega_python_zwap.match.pattern_set import PatternSet
+
+PATTERNS = {
+    'added': {'event': {'name': 'item.added', 'version': gt(1)}},
+    'items': {'event': {'name': match(r'item\..*')}, 'object': {'current': {'items': [{'quantity': gt(0)}]}}},
+    'recent': {'event': {'timestamp': and_(gt(date(2020, 1, 1)), lt(date(2021, 1, 1)))}},
+    'currency': {'object': {'current': {'currency': not_(one_of('EUR', 'GBP'))}}},
+}
+
+EVENTS = [
+    {},
+    None,
+    {'event': {'name': 'item.added', 'version': 2, 'timestamp': '2020-05-04'}},
+    {'event': {'name': 'item.added', 'version': 'v1'}},
+    {'event': {'name': 'cart.created', 'version': 3, 'timestamp': '2021-05-04'}},
+    {'event': {'name': 'item.removed'}, 'object': {'current': {'items': [{'quantity': 2}], 'currency': 'USD'}}},
+    {'event': {'name': 'item.removed'}, 'object': {'current': {'items': [], 'currency': 'EUR'}}},
+]
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with ParallelPatternSet(PATTERNS, processes=2, batch_size=2) as pool:
+        yield pool
+
+
+def test_parallel_pattern_set_is_equivalent_to_pattern_set(pool):
+    patterns = PatternSet(PATTERNS)
+    assert pool.matches(EVENTS) == [patterns.matches(event) for event in EVENTS]
+
+
+def test_parallel_pattern_set_decodes_raw_documents(pool):
+    patterns = PatternSet(PATTERNS)
+    documents = [json.dumps(event) for event in EVENTS] + [json.dumps(event).encode('utf-8') for event in EVENTS]
+
+    assert pool.matches(documents) == [patterns.matches(event) for event in EVENTS + EVENTS]
+
+
+def test_parallel_pattern_set_does_not_match_invalid_documents(pool):
+    documents = ['{"event": ', b'\xff', '{"event": {"name": "cart.created"}}']
+    assert pool.matches(documents) == [[], [], ['recent', 'currency']]
+
+
+def test_parallel_pattern_set_without_events(pool):
+    assert pool.matches([]) == []
+    assert len(pool) == len(PATTERNS)
+
+
+def test_parallel_pattern_set_batch_size_must_be_positive():
+    with pytest.raises(ValueError):
+        ParallelPatternSet(PATTERNS, batch_size=0)
@@ -0,0 +1,51 @@
+import pickle
+
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.functions import gt, not_, Equal, GreaterThan, Not
+from sqs_mega_python_zwap.match.paths import flatten_pattern, FieldAccessor, MISSING, NULL, NOT_MAPPING
+from sqs_mega_python_zwap.match.values import Mapping, String
+
+
+def test_flatten_nested_mapping_pattern():
+    leaves = flatten_pattern({
+        'event': {'name': 'item.added', 'version': gt(1)},
+        'object': {'id': not_(None)},
+    })
+
+    assert [path for path, _ in leaves] == [('event', 'name'), ('event', 'version'), ('object', 'id')]
+    assert [type(leaf) for _, leaf in leaves] == [Equal, GreaterThan, Not]
+    assert type(leaves[0][1].rhs) is String
+
+
+def test_flatten_keeps_empty_mappings_as_leaves():
+    [(path, leaf)] = flatten_pattern({'event': {}})
+
+    assert path == ('event',)
+    assert type(leaf.rhs) is Mapping
+
+
+def test_flatten_pattern_that_is_not_a_mapping():
+    [(path, leaf)] = flatten_pattern(gt(1))
+    assert path == ()
+    assert type(leaf) is GreaterThan
+
+
+@parameterized.expand([
+    [{'a': {'b': 1}}, 1],
+    [{'a': {'b': None}}, None],
+    [{'a': {'c': 1}}, MISSING],
+    [{}, MISSING],
+    [{'a': None}, NULL],
+    [None, NULL],
+    [{'a': 'foo'}, NOT_MAPPING],
+    [{'a': [1]}, NOT_MAPPING],
+])
+def test_field_accessor(lhs, expected):
+    assert FieldAccessor(('a', 'b'))(lhs) is expected
+
+
+def test_field_accessor_markers_survive_pickling():
+    accessor = pickle.loads(pickle.dumps(FieldAccessor(('a', 'b'))))
+    assert accessor({}) is MISSING
+    assert accessor({'a': None}) is NULL
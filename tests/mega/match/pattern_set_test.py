@@ -0,0 +1,186 @@
+import pickle
+from datetime import date
+
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.evaluation import evaluate_result
+from sqs_mega_python_zwap.match.functions import and_, or_, not_, eq, gt, lt, match, one_of
+from sqs_mega_python_zwap.match.pattern_set import PatternSet
+from sqs_mega_python_zwap.match.types import MatchResult
+
+PATTERNS = {
+    'added': {'event': {'name': 'item.added', 'version': gt(1)}},
+    'items': {'event': {'name': match(r'item\..*')}, 'object': {'current': {'items': [{'quantity': gt(0)}]}}},
+    'recent': {'event': {'timestamp': and_(gt(date(2020, 1, 1)), lt(date(2021, 1, 1)))}},
+    'currency': {'object': {'current': {'currency': not_(one_of('EUR', 'GBP'))}}},
+    'any': {'event': or_(eq({'name': 'cart.created'}), eq({'version': 3}))},
+    'empty': {'object': {}},
+}
+
+EVENTS = [
+    {},
+    None,
+    'foo',
+    {'event': None},
+    {'event': 'foo'},
+    {'event': {'name': 'item.added', 'version': 2, 'timestamp': '2020-05-04'}},
+    {'event': {'name': 'item.added', 'version': 'v1'}},
+    {'event': {'name': 'cart.created', 'version': 3, 'timestamp': '2021-05-04'}},
+    {'event': {'name': 'item.removed'}, 'object': {'current': {'items': [{'quantity': 2}], 'currency': 'USD'}}},
+    {'event': {'name': 'item.removed'}, 'object': {'current': {'items': [], 'currency': 'EUR'}}},
+    {'object': None},
+    {'object': {'current': None}},
+    {'object': {'current': 'foo'}},
+]
+
+
+@parameterized.expand([
+    [event]
+    for event in EVENTS
+])
+def test_pattern_set_is_equivalent_to_patterns(event):
+    results = PatternSet(PATTERNS).evaluate(event)
+
+    assert results == {
+        key: evaluate_result(event, pattern)
+        for key, pattern in PATTERNS.items()
+    }
+
+
+MIXED_PATTERNS = {
+    'or': {'name': or_(match(r'b.*'), gt(1))},
+    'or_reversed': {'name': or_(gt(1), match(r'b.*'))},
+    'and': {'name': and_(match(r'foo.*'), gt(1))},
+    'not': {'name': not_(or_(match(r'b.*'), gt(1)))},
+    'nested': {'name': or_(and_(match(r'b.*'), lt(5)), eq(2)), 'version': or_(lt(1), match(r'v.*'))},
+}
+
+MIXED_EVENTS = [
+    {'name': name, 'version': version}
+    for name in ['bar', 'foo', '5', 0, 2, 10, None, True]
+    for version in ['v1', 0, 3]
+]
+
+
+@parameterized.expand([
+    [event]
+    for event in MIXED_EVENTS
+])
+def test_pattern_set_matches_patterns_on_mixed_types(event):
+    patterns = PatternSet(MIXED_PATTERNS)
+    results = {key: evaluate_result(event, pattern) for key, pattern in MIXED_PATTERNS.items()}
+
+    for _ in range(3):
+        matches = patterns.matches(event)
+        # Every matching pattern is found. A pattern that mismatches in declaration order may match once compiled,
+        # when the function that mismatches is skipped.
+        assert [key for key in MIXED_PATTERNS if results[key] is MatchResult.MATCH] == \
+               [key for key in matches if results[key] is not MatchResult.TYPE_MISMATCH]
+
+
+def test_pattern_set_matches():
+    patterns = PatternSet(PATTERNS)
+    event = {'event': {'name': 'item.added', 'version': 2}, 'object': {'current': {'currency': 'EUR'}}}
+
+    assert patterns.matches(event) == ['added', 'items', 'recent', 'empty']
+
+
+def test_pattern_set_does_not_match_type_mismatches():
+    patterns = PatternSet([('a', {'version': gt(1)}), ('b', {'name': 'foo'})])
+
+    assert patterns.evaluate({'version': 'v2', 'name': 'foo'}) == {'a': MatchResult.TYPE_MISMATCH, 'b': MatchResult.MATCH}
+    assert patterns.matches({'version': 'v2', 'name': 'foo'}) == ['b']
+
+
+def test_pattern_set_shares_field_accessors():
+    patterns = PatternSet({
+        i: {'event': {'name': 'item.{}'.format(i), 'version': gt(i)}}
+        for i in range(100)
+    })
+
+    assert len(patterns) == 100
+    assert patterns.paths == [('event', 'name'), ('event', 'version')]
+
+
+def test_pattern_set_extracts_fields_once_per_event():
+    class CountingDict(dict):
+        gets = 0
+
+        def get(self, key, default=None):
+            CountingDict.gets += 1
+            return super().get(key, default)
+
+    patterns = PatternSet({
+        i: {'event': {'version': gt(i)}}
+        for i in range(10)
+    })
+
+    assert patterns.matches(CountingDict(event=CountingDict(version=5))) == [0, 1, 2, 3, 4]
+    assert CountingDict.gets == 2
+
+
+def test_pattern_set_can_be_pickled():
+    patterns = pickle.loads(pickle.dumps(PatternSet(PATTERNS)))
+    event = {'event': {'name': 'item.added', 'version': 2}, 'object': {'current': {'currency': 'EUR'}}}
+
+    assert patterns.matches(event) == ['added', 'items', 'recent', 'empty']
+
+
+@parameterized.expand([
+    [event]
+    for event in EVENTS
+])
+def test_cached_pattern_set_is_equivalent_to_pattern_set(event):
+    patterns = PatternSet(PATTERNS, cache_size=4)
+
+    assert patterns.matches(event) == PatternSet(PATTERNS).matches(event)
+    assert patterns.matches(event) == PatternSet(PATTERNS).matches(event)
+
+
+def test_pattern_set_caches_matches_on_the_fields_it_reads():
+    patterns = PatternSet({'added': {'event': {'name': 'item.added'}}, 'v2': {'event': {'version': gt(1)}}}, cache_size=2)
+
+    for i in range(10):
+        assert patterns.matches({'event': {'name': 'item.added', 'version': 2, 'id': i}}) == ['added', 'v2']
+    assert patterns.matches({'event': {'name': 'item.added', 'version': True}}) == ['added']
+
+    assert patterns.cache_stats.hits == 9
+    assert patterns.cache_stats.misses == 2
+    assert patterns.cache_stats.hit_ratio == 9 / 11
+
+
+def test_pattern_set_cache_is_bounded():
+    patterns = PatternSet({'positive': {'version': gt(0)}}, cache_size=2)
+
+    for version in (1, 2, 3, 1):
+        patterns.matches({'version': version})
+
+    assert patterns.cache_stats.misses == 4
+    assert len(patterns._cache) == 2
+
+    patterns.clear_cache()
+    assert patterns.cache_stats.lookups == 0
+
+
+def test_pattern_set_does_not_cache_lambdas():
+    calls = []
+
+    def record(lhs):
+        calls.append(lhs)
+        return lhs > 1
+
+    patterns = PatternSet({'lambda': {'version': record}, 'plain': {'version': gt(1)}}, cache_size=10)
+
+    for _ in range(3):
+        assert patterns.matches({'version': 2}) == ['lambda', 'plain']
+
+    assert calls == [2, 2, 2]
+    assert patterns.cache_stats.hits == 2
+
+
+def test_pattern_set_does_not_cache_unsupported_values():
+    patterns = PatternSet({'any': {'version': not_(None)}}, cache_size=10)
+
+    assert patterns.matches({'version': {1, 2}}) == ['any']
+    assert patterns.cache_stats.skipped == 1
+    assert patterns.cache_stats.lookups == 0
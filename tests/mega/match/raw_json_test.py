@@ -0,0 +1,123 @@
+import json
+
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.evaluation import evaluate_result
+from sqs_mega_python_zwap.match.functions import gt, lt, not_, match, one_of, or_, eq, and_
+from sqs_mega_python_zwap.match.raw_json import JsonMatcher, extract_fields
+from sqs_mega_python_zwap.match.types import MatchResult
+
+PATTERN = {
+    'event': {
+        'name': match(r'item\..*'),
+        'version': or_(eq(1), gt(2)),
+    },
+    'object': {
+        'current': {'currency': not_(one_of('EUR', 'GBP')), 'total': lt(100)},
+    },
+}
+
+DOCUMENTS = [
+    {},
+    {'event': {'name': 'item.added', 'version': 1}},
+    {'event': {'name': 'item.added', 'version': 2}},
+    {'event': {'name': 'cart.created', 'version': 1}},
+    {'event': {'name': 'item.added', 'version': 'v1'}},
+    {'event': None},
+    {'event': 'item.added'},
+    {'event': ['item.added']},
+    {'object': {'current': {'currency': 'USD', 'total': 10.5}}, 'event': {'version': 3}},
+    {'object': {'current': {'currency': 'EUR'}}},
+    {'object': {'current': None}},
+    {'object': {'previous': {'currency': 'EUR'}, 'current': {'total': 99}}},
+    {'skipped': {'a': [1, {'b': '}]{['}], 'c': 'x\\"}'}, 'event': {'name': 'item.removed'}},
+    {'skipped': [[], {}, [[]]], 'event': {'name': 'cart.removed'}},
+]
+
+
+@parameterized.expand([
+    [document]
+    for document in DOCUMENTS
+])
+def test_json_matcher_is_equivalent_to_evaluating_the_decoded_document(document):
+    for text in (json.dumps(document), json.dumps(document, indent=2)):
+        expected = evaluate_result(json.loads(text), PATTERN) is MatchResult.MATCH
+        assert JsonMatcher(PATTERN).matches(text) is expected
+
+
+@parameterized.expand([
+    ['"item.added"'],
+    ['[{"event": {"name": "item.added"}}]'],
+    ['plaintext'],
+    [''],
+    ['{"event": {"name": "item.added"}'],
+    ['{"event": {"name": "item.added"}} trailing'],
+    ['{"event": {"name": "item.added", }}'],
+])
+def test_json_matcher_can_not_tell_without_decoding(text):
+    assert JsonMatcher({'event': {'name': 'item.added'}}).matches(text) is None
+
+
+def test_json_matcher_needs_a_mapping_pattern():
+    assert JsonMatcher(eq({})).matches('{}') is None
+    assert JsonMatcher(not_({'a': 1})).matches('{"a": 2}') is None
+
+
+def test_json_matcher_stops_at_the_first_field_that_does_not_match():
+    # The rest of the document is not even valid JSON
+    assert JsonMatcher({'event': {'name': 'item.added'}}).matches('{"event": {"name": "cart.created", ') is False
+
+
+@parameterized.expand([
+    ['{"name": "foo", "name": "bar"}', None],
+    ['{"name": "bar", "name": "foo"}', False],
+    ['{"name": "bar", "name": "bar"}', True],
+    ['{"name": "foo", "other": {"name": "x"}}', None],
+    ['{"name": "foo", "n\\u0061me": "bar"}', None],
+    ['{"name": "foo", "other": "n\\u0061me"}', False],
+    ['{"event": {"name": "foo"}, "event": {"name": "bar"}}', None],
+    ['{"event": {"name": "bar"}, "event": {"name": "foo"}}', False],
+    ['{"event": 1, "event": {"name": "bar"}}', None],
+])
+def test_json_matcher_keeps_the_last_occurrence_of_keys(text, expected):
+    pattern = {'name': 'bar'} if text.startswith('{"name"') else {'event': {'name': 'bar'}}
+
+    assert JsonMatcher(pattern).matches(text) is expected
+    if expected is not None:
+        assert expected is (evaluate_result(json.loads(text), pattern) is MatchResult.MATCH)
+
+
+@parameterized.expand([
+    [{'name': or_(match(r'b.*'), gt(1))}],
+    [{'name': or_(gt(1), match(r'b.*'))}],
+    [{'name': and_(match(r'b.*'), not_(lt(1)))}],
+])
+def test_json_matcher_is_equivalent_to_evaluating_mixed_types(pattern):
+    matcher = JsonMatcher(pattern)
+    for value in ['bar', 'foo', '5', 0, 2, None, True]:
+        document = {'name': value}
+        expected = evaluate_result(document, pattern)
+        if expected is not MatchResult.TYPE_MISMATCH:
+            assert matcher.matches(json.dumps(document)) is (expected is MatchResult.MATCH)
+
+
+def test_json_matcher_accepts_bytes():
+    assert JsonMatcher({'event': {'name': 'item.added'}}).matches(b'{"event": {"name": "item.added"}}') is True
+
+
+def test_extract_fields():
+    text = json.dumps({'Type': 'Notification', 'Message': json.dumps({'a': [1, '}']}), 'Other': {'x': [1, 2]}})
+
+    assert extract_fields(text, ['Type', 'Message', 'Missing']) == {
+        'Type': 'Notification',
+        'Message': '{"a": [1, "}"]}',
+    }
+
+
+@parameterized.expand([
+    ['[1, 2]'],
+    ['"foo"'],
+    ['{"Type": "Notification"'],
+])
+def test_extract_fields_from_invalid_objects(text):
+    assert extract_fields(text, ['Type']) is None
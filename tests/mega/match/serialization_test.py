@@ -0,0 +1,113 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from dateutil.tz import tzoffset
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.compilation import compile_pattern
+from sqs_mega_python_zwap.match.evaluation import evaluate_result
+from sqs_mega_python_zwap.match.functions import and_, or_, not_, eq, gt, gte, lt, lte, match, one_of, in_, neq
+from sqs_mega_python_zwap.match.pattern_set import PatternSet
+from sqs_mega_python_zwap.match.serialization import dump_pattern, load_pattern, dump_patterns, load_pattern_set, \
+    PatternFormatError
+from sqs_mega_python_zwap.match.values import Number
+
+PATTERNS = [
+    'item.added',
+    None,
+    {'event': {'name': match(r'item\..*'), 'version': or_(eq(1), gt(Decimal('2.5')))}},
+    {'event': {'timestamp': and_(gte(date(2020, 1, 1)), lt(datetime(2021, 1, 1, tzinfo=tzoffset(None, 3600))))}},
+    {'object': {'current': {'currency': not_(one_of('EUR', 'GBP', None)), 'items': [{'quantity': lte(10)}]}}},
+    {'object': {'current': {'total': in_([1, 2.5, float('inf'), Decimal('3'), gt(100)])}}},
+    {'event': neq({}), 'flags': [True, False]},
+    {1: 'one', Decimal('2'): Number('2')},
+]
+
+EVENTS = [
+    {},
+    None,
+    'item.added',
+    {'event': {'name': 'item.added', 'version': 3, 'timestamp': '2020-05-04T10:00:00Z'}},
+    {'event': {'name': 'cart.created', 'version': '1', 'timestamp': '2021-05-04'}},
+    {'object': {'current': {'currency': 'USD', 'items': [{'quantity': 2}], 'total': 2.5}}},
+    {'object': {'current': {'currency': 'EUR', 'items': [], 'total': 500}}},
+    {'event': {}, 'flags': [True, False], 1: 'one', 2: '2'},
+]
+
+
+def _round_trip(document):
+    return json.loads(json.dumps(document, allow_nan=False))
+
+
+@parameterized.expand([
+    [pattern, event]
+    for pattern in PATTERNS
+    for event in EVENTS
+])
+def test_loaded_pattern_is_equivalent_to_pattern(pattern, event):
+    document = _round_trip(dump_pattern(pattern))
+
+    assert evaluate_result(event, load_pattern(document, compile=False)) == evaluate_result(event, pattern)
+    assert evaluate_result(event, load_pattern(document)) == evaluate_result(event, compile_pattern(pattern))
+
+
+@parameterized.expand([
+    [pattern]
+    for pattern in PATTERNS
+])
+def test_compiled_pattern_is_dumped_as_its_source(pattern):
+    assert dump_pattern(compile_pattern(pattern, instrument=True)) == dump_pattern(compile_pattern(pattern))
+    assert _round_trip(dump_pattern(load_pattern(dump_pattern(pattern), compile=False))) == \
+        _round_trip(dump_pattern(pattern))
+
+
+def test_dump_pattern_document():
+    assert dump_pattern({'a': gt(1), 'b': [Decimal('1.5'), date(2020, 1, 2)]}) == {
+        'version': 1,
+        'pattern': {'mapping': [
+            ['a', {'fn': 'gt', 'value': {'type': 'number', 'rhs': 1}}],
+            ['b', [{'decimal': '1.5'}, {'date': '2020-01-02'}]],
+        ]}
+    }
+
+
+@parameterized.expand([
+    [lambda x: True],
+    [{'a': lambda x: True}],
+    [and_(eq(1), lambda x: True)],
+    [object()],
+])
+def test_dump_pattern_that_can_not_be_serialized(pattern):
+    with pytest.raises(TypeError):
+        dump_pattern(pattern)
+
+
+@parameterized.expand([
+    [{}],
+    [{'version': 2, 'pattern': 1}],
+    [{'version': 1}],
+    [{'version': 1, 'pattern': {'fn': 'foo', 'value': 1}}],
+    [{'version': 1, 'pattern': {'fn': 'eq'}}],
+    [{'version': 1, 'pattern': {'fn': 'eq', 'value': {'type': 'foo', 'rhs': 1}}}],
+    [{'version': 1, 'pattern': {'fn': 'gt', 'value': {'type': 'number', 'rhs': 'foo'}}}],
+    [{'version': 1, 'pattern': {'fn': 'and', 'args': [{'fn': 'eq', 'value': {'type': 'null', 'rhs': None}}]}}],
+    [{'version': 1, 'pattern': {'fn': 'not', 'arg': 1}}],
+    [{'version': 1, 'pattern': {'decimal': 'foo'}}],
+    [{'version': 1, 'pattern': {'mapping': [['a']]}}],
+    [{'version': 1, 'pattern': {'mapping': [[['a'], 1]]}}],
+    [{'version': 1, 'pattern': {'foo': 1}}],
+])
+def test_load_invalid_pattern(document):
+    with pytest.raises(PatternFormatError):
+        load_pattern(document)
+
+
+def test_load_pattern_set():
+    patterns = {str(i): pattern for i, pattern in enumerate(PATTERNS)}
+    pattern_set = load_pattern_set(_round_trip(dump_patterns(patterns)))
+
+    assert isinstance(pattern_set, PatternSet)
+    for event in EVENTS:
+        assert pattern_set.evaluate(event) == PatternSet(patterns).evaluate(event)
@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from datetime import date, datetime, timezone, timedelta
+from decimal import Decimal
+
+import pytest
+from parameterized import parameterized
+
+from sqs_mega_python_zwap.match.values import Null, String, Number, DateTime, Boolean, Collection, Mapping
+from sqs_mega_python_zwap.match.values.build import value
+
+
+class CustomString(str):
+    pass
+
+
+@parameterized.expand([
+    [None, Null],
+    ['abc', String],
+    ['2020-05-15', String],
+    [CustomString('abc'), String],
+    [0, Number],
+    [1.5, Number],
+    [Decimal('2.5'), Number],
+    [True, Boolean],
+    [False, Boolean],
+    [date(2020, 5, 15), DateTime],
+    [datetime(2020, 5, 15, 10, 30), DateTime],
+    [[1, 2], Collection],
+    [(1, 2), Collection],
+    [{1, 2}, Collection],
+    [{'a': 1}, Mapping],
+    [OrderedDict(a=1), Mapping],
+])
+def test_value_should_build_the_value_type_of_the_rhs(rhs, value_type):
+    assert type(value(rhs)) is value_type
+
+
+def test_value_should_return_values_as_they_are():
+    number = Number(42)
+    assert value(number) is number
+
+
+def test_value_should_raise_on_unsupported_rhs():
+    with pytest.raises(TypeError):
+        value(object())
+
+
+@parameterized.expand([
+    ['abc'],
+    [42],
+    [1.5],
+    [Decimal('2.5')],
+    [True],
+    [None],
+    [date(2020, 5, 15)],
+    [datetime(2020, 5, 15, 10, 30)],
+    [(1, 'a', None)],
+])
+def test_value_should_intern_immutable_rhs(rhs):
+    assert value(rhs) is value(rhs)
+
+
+@parameterized.expand([
+    [[1, 2]],
+    [{1, 2}],
+    [{'a': 1}],
+    [(1, [2])],
+])
+def test_value_should_not_intern_mutable_rhs(rhs):
+    assert value(rhs) is not value(rhs)
+
+
+@parameterized.expand([
+    [1, True],
+    [1, 1.0],
+    [1, Decimal(1)],
+    [0, False],
+    [(1,), (True,)],
+    [(1,), (1.0,)],
+    [datetime(2020, 5, 15, 23, tzinfo=timezone(timedelta(hours=-3))), datetime(2020, 5, 16, 2, tzinfo=timezone.utc)],
+])
+def test_value_should_not_share_equal_rhs_of_different_types(rhs, other):
+    assert value(rhs) is not value(other)
+    assert type(value(rhs).rhs) is type(rhs)
+    assert type(value(other).rhs) is type(other)
+
+
+@parameterized.expand([
+    [Decimal('1'), Decimal('1.00')],
+    [Decimal('0'), Decimal('-0')],
+    [0.0, -0.0],
+    [(Decimal('1'),), (Decimal('1.00'),)],
+    [(0.0,), (-0.0,)],
+])
+def test_value_should_not_share_equal_rhs_with_different_representations(rhs, other):
+    assert value(rhs) is not value(other)
+    assert repr(value(rhs).rhs) == repr(rhs)
+    assert repr(value(other).rhs) == repr(other)
+
+
+def test_interned_values_should_keep_their_semantics():
+    assert value(1).equal('1') is True
+    assert value(1.0).equal('1.5') is False
+    assert value(datetime(2020, 5, 15, 23, tzinfo=timezone(timedelta(hours=-3)))).equal('2020-05-15') is True
+    assert value(datetime(2020, 5, 16, 2, tzinfo=timezone.utc)).equal('2020-05-15') is False
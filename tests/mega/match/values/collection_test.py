@@ -39,7 +39,14 @@ def test_non_empty_collection_rhs_does_not_match_none_lhs():
     [['foo', 'bar'], ['bar', one_of('foo', 'FOO', 'Foo', '_foo_')]],
     [['foo', 'bar', 'barz'], ['bar', match(r'bar[zZ]'), eq('foo')]],
     [['Raphael', 'Leonardo', 'Donatello', 'Venus de Milo', 'Michelangelo'],
-     ['Leonardo', match(r'[Dd]onatel.*'), 'Raphael', 'Michelangelo', match(r'Venus [Dd]e Milo')]]
+     ['Leonardo', match(r'[Dd]onatel.*'), 'Raphael', 'Michelangelo', match(r'Venus [Dd]e Milo')]],
+
+    [[{'id': 1}, {'id': 2}], [{'id': 2}, {'id': 1}]],
+    [[{'id': 1}, {'id': 2}], [{'id': gt(1)}, {'id': 1}]],
+    [[None, ''], ['']],
+    [[1, None], [None, 1]],
+    [['a', None, ''], ['', 'a']],
+    [[1.5, '2'], [2, 1.5]],
 ])
 def test_collection_rhs_is_equal_to_collection_lhs(lhs, rhs):
     assert Collection(rhs).equal(lhs) is True
@@ -58,6 +65,11 @@ def test_collection_rhs_is_equal_to_collection_lhs(lhs, rhs):
     [['foo', 'bar'], ['bar', not_(one_of('foo', 'FOO', 'Foo', '_foo_'))]],
     [['Raphael', 'Leonardo', 'DANTE', 'Venus de Milo', 'Michelangelo'],
      ['Leonardo', match(r'[Dd]onatel.*'), 'Raphael', 'Michelangelo', match(r'Venus [Dd]e Milo')]],
+    [[{'id': 1}, {'id': 2}], [{'id': 2}, {'id': 3}]],
+    [[{'id': 1}, {'id': 2}], [{'id': 1}]],
+    [[0], [2, False, '2']],
+    [[None, 1], [1]],
+    [[1, '2'], [2]],
 ])
 def test_collection_rhs_is_not_equal_to_collection_lhs(lhs, rhs):
     assert Collection(rhs).equal(lhs) is False
@@ -73,7 +85,8 @@ def test_collection_rhs_is_not_equal_to_collection_lhs(lhs, rhs):
     [['foo', 'bar'], ['bar', one_of('foo', 'FOO', 'Foo', '_foo_')]],
     [['foo', 'bar', 'barz'], ['bar', match(r'bar[zZ]'), eq('foo')]],
     [['Raphael', 'Leonardo', 'Donatello', 'Venus de Milo', 'Michelangelo'],
-     [match(r'[Dd]onatel.*'), 'Michelangelo']]
+     [match(r'[Dd]onatel.*'), 'Michelangelo']],
+    [[{'id': 1, 'name': 'foo'}, {'id': 2}], [{'name': 'foo'}]],
 ])
 def test_collection_rhs_matches_collection_lhs(lhs, rhs):
     assert Collection(rhs).match(lhs) is True
@@ -94,6 +107,22 @@ def test_collection_rhs_does_not_match_collection_lhs(lhs, rhs):
     assert Collection(rhs).match(lhs) is False
 
 
+def test_compare_large_collections():
+    numbers = list(range(1000))
+    strings = [str(i) for i in range(1000)]
+
+    assert Collection(list(reversed(numbers))).equal(numbers) is True
+    assert Collection(strings[:500]).match(list(reversed(strings))) is True
+    assert Collection(numbers + [1000]).match(numbers) is False
+
+    # Items of mixed types match the first equal item, unless an item of an incompatible type comes before it
+    assert Collection(list(reversed(numbers)) + [None]).equal(numbers + [None]) is True
+    assert Collection(numbers + strings).equal(strings + numbers) is True
+    assert Collection(numbers + [None]).match(strings + [None]) is True
+    with pytest.raises(LeftHandSideTypeError):
+        Collection(list(reversed(strings))).equal(numbers + strings)
+
+
 @parameterized.expand([
     [1, [1, 2, 3]],
     ['bar', ['foo', match(r'[Bb]ar.*'), 'barz']],
@@ -176,6 +205,7 @@ def test_collection_equal_does_not_accept_invalid_lhs(lhs, rhs):
     [[1, 'a', 3], ['a', lt(5), 'b']],
     [[1, 2, 3], ['a', 'b']],
     [[True], ['a', 'b', 'c']],
+    [[1, 'a'], ['a']],
     [['Raphael', 'Leonardo', 'Donatello', 42, 'Venus de Milo', 'Michelangelo'],
      ['Leonardo', match(r'[Dd]onatel.*'), 'Raphael', 'Michelangelo', match(r'Venus [Dd]e Milo')]]
 ])
@@ -202,6 +232,9 @@ def test_collection_match_does_not_accept_invalid_lhs(lhs, rhs):
 
 @parameterized.expand([
     [[1, 'a', 3], ['a', lt(5), 'b']],
+    [[None, 1, 'a'], [None, 'a']],
+    [['1.5', 1], [1]],
+    [[{'id': 1, 'name': 'foo'}, {'id': 2}, 'bar'], [{'name': 'foo'}, 'bar']],
     [['Raphael', 'Leonardo', 'Donatello', 42, 'Venus de Milo', 'Michelangelo'],
      ['Leonardo', match(r'[Dd]onatel.*'), 'Raphael', 'Michelangelo', match(r'Venus [Dd]e Milo')]]
 ])
@@ -251,3 +284,13 @@ def test_collection_contains_does_not_accept_scalar_lhs_with_incompatible_types(
 
     assert '[Collection.contains] Could not apply left-hand side' in str(e.value)
     assert 'Left-hand side is not compatible with collection type.' in str(e.value)
+
+
+@parameterized.expand([
+    [[1, 'a', None, True], False],
+    [[1, gt(1)], True],
+    [['a', {'id': 1}], True],
+    [[float('nan')], True],
+])
+def test_collection_has_patterns(rhs, expected):
+    assert Collection(rhs).has_patterns is expected
@@ -5,7 +5,7 @@ import pytest
 from dateutil.tz import tzutc, tzoffset
 from parameterized import parameterized
 
-from sqs_mega_python_zwap.match.values.datetime import DateTime
+from sqs_mega_python_zwap.match.values.datetime import DateTime, parse_iso_string
 from sqs_mega_python_zwap.match.values.value import RightHandSideTypeError, LeftHandSideTypeError
 
 UTC = tzutc()
@@ -350,3 +350,55 @@ def test_datetime_lhs_should_be_greater_than_or_equal_to_datetime_rhs(lhs, rhs):
 ])
 def test_datetime_lhs_should_not_be_greater_than_or_equal_to_datetime_rhs(lhs, rhs):
     assert DateTime(rhs).greater_than_or_equal(lhs) is False
+
+
+@parameterized.expand([
+    ['2020-05-15T16:45:20'],
+    ['2020-05-15 16:45:20'],
+    ['2020-05-15T16:45:20.123'],
+    ['2020-05-15T16:45:20.123456'],
+    ['2020-05-15T16:45:20Z'],
+    ['2020-05-15T16:45:20.123456+00:00'],
+    ['2020-05-15T19:45:20+03:00'],
+    ['2020-05-15T13:45:20.123-03:00'],
+])
+def test_parse_iso_string_is_consistent_with_dateutil(string):
+    expected = dateutil.parser.parse(string)
+    if expected.tzinfo is None:
+        expected = expected.replace(tzinfo=UTC)
+
+    parsed = parse_iso_string(string)
+
+    assert parsed == expected.replace(microsecond=0)
+    assert parsed.utcoffset() == expected.utcoffset()
+    assert parsed.microsecond == 0
+
+
+@parameterized.expand([
+    ['2020-05-15', date(2020, 5, 15)],
+    ['2020-5-3', date(2020, 5, 3)],
+])
+def test_parse_iso_string_returns_date_for_date_strings(string, expected):
+    assert parse_iso_string(string) == expected
+
+
+@parameterized.expand([
+    [''],
+    ['2020-05-15 16:45:20 Z'],
+    ['2020-05-15T16:45'],
+    ['2020-05-15T15:45:59.123-3:00'],
+    ['2020-02-30T00:00:00'],
+    ['May 15th, 2020'],
+])
+def test_parse_iso_string_does_not_parse_other_formats(string):
+    assert parse_iso_string(string) is None
+
+
+def test_lhs_strings_are_parsed_only_once():
+    value = DateTime('2020-05-15T16:45:20+00:00')
+    value.equal('2020-05-15T16:45:20.987654Z')
+
+    hits = parse_iso_string.cache_info().hits
+    assert value.greater_than('2020-05-15T16:45:20.987654Z') is False
+    assert value.less_than('2020-05-15T16:45:20.987654Z') is False
+    assert parse_iso_string.cache_info().hits == hits + 2
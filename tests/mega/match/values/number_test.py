@@ -5,7 +5,7 @@ import pytest
 from parameterized import parameterized
 
 from sqs_mega_python_zwap.match.values.number import Number
-from sqs_mega_python_zwap.match.values.value import RightHandSideTypeError, LeftHandSideTypeError
+from sqs_mega_python_zwap.match.values.value import RightHandSideTypeError, LeftHandSideTypeError, Value, ComparableValue
 
 
 @parameterized.expand([
@@ -286,3 +286,41 @@ def test_number_less_than_or_equal_should_not_accept_invalid_lhs(lhs):
         Number(5).less_than_or_equal(lhs)
     assert e.value.lhs == lhs
     assert e.value.function_type == Number.FunctionType.LESS_THAN_OR_EQUAL
+
+
+NUMBERS = [0, 1, -3, 2.5, 0.1, 10 ** 30, 2 ** 53 + 1, float(2 ** 53), float('inf'), Decimal('0.1'), Decimal('2.5'),
+           Decimal('-0'), Decimal('1e400'), Decimal('Infinity'), '5', '0.1']
+
+
+def _outcome(method, *args):
+    try:
+        return method(*args)
+    except Exception as e:
+        return type(e)
+
+
+@parameterized.expand([
+    [rhs, lhs]
+    for rhs in NUMBERS + [Decimal('NaN'), float('nan')]
+    for lhs in NUMBERS + [float('nan'), None, True, 'foo', [1]]
+])
+def test_number_comparisons_are_equivalent_to_generic_comparisons(rhs, lhs):
+    number = Number(rhs)
+
+    assert _outcome(number.equal, lhs) == _outcome(Value.equal, number, lhs)
+    assert _outcome(number.match, lhs) == _outcome(Value.match, number, lhs)
+    assert _outcome(number.less_than, lhs) == _outcome(ComparableValue.less_than, number, lhs)
+    assert _outcome(number.less_than_or_equal, lhs) == _outcome(ComparableValue.less_than_or_equal, number, lhs)
+    assert _outcome(number.greater_than, lhs) == _outcome(ComparableValue.greater_than, number, lhs)
+    assert _outcome(number.greater_than_or_equal, lhs) == _outcome(ComparableValue.greater_than_or_equal, number, lhs)
+
+
+@parameterized.expand([
+    [0.1, Decimal('0.1'), False],
+    [Decimal('0.1'), 0.1, False],
+    [Decimal(0.1), 0.1, True],
+    [2 ** 53 + 1, float(2 ** 53), False],
+    [Decimal(2 ** 53 + 1), 2 ** 53 + 1, True],
+])
+def test_number_comparisons_are_exact(lhs, rhs, expected):
+    assert Number(rhs).equal(lhs) is expected